@@ -0,0 +1,116 @@
+"""
+Per-variant cost of validated pydantic models vs slotted records on the review hot path.
+
+    python benchmarks/bench_records.py [N]
+
+"models" carries each variant and its evidence through the engines as validated
+pydantic models; "records" uses `VariantRec`/`EvidenceRec` for the same values.
+Both produce the same grounding hash for every variant. The second table shows
+construction time and retained size of individual objects, including
+`model_construct`, which is slower than validation with pydantic-core.
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from clinreport.core.models import (
+    AuthenticityAssessment,
+    TechnicalEvidence,
+    VariantRecordModel,
+)
+from clinreport.core.records import EvidenceRec, VariantRec
+from clinreport.evidence_mapping.engine import EvidenceMappingEngine
+from clinreport.llm.grounding import grounding_hash
+from clinreport.technical_review.authenticity_engine import TechnicalAuthenticityEngine
+
+ROWS = [
+    {"chrom": "chr1", "pos": 1000 + i, "ref": "A", "alt": "G", "dp": 5 + i % 60, "gq": i % 99, "vaf": (i % 50) / 100}
+    for i in range(2000)
+]
+AUTH = TechnicalAuthenticityEngine()
+MAPPER = EvidenceMappingEngine()
+
+
+def _variant(row: dict) -> VariantRecordModel:
+    return VariantRecordModel(
+        variant_id=f"{row['chrom']}-{row['pos']}-{row['ref']}-{row['alt']}",
+        chrom=row["chrom"],
+        pos=row["pos"],
+        ref=row["ref"],
+        alt=row["alt"],
+        dp=row["dp"],
+        gq=row["gq"],
+        clinvar="Pathogenic",
+    )
+
+
+VARIANTS = [_variant(r) for r in ROWS]
+ROW_VARIANTS = [v.model_dump() for v in VARIANTS]
+SAMPLE_AUTH = AUTH.assess(VARIANTS[0], EvidenceRec(dp=40, gq=99, vaf=0.5)).model_dump()
+
+
+def with_models(i: int) -> str:
+    row = ROWS[i]
+    variant = VariantRecordModel(**ROW_VARIANTS[i])
+    auth = AUTH.assess(variant, TechnicalEvidence(dp=row["dp"], gq=row["gq"], vaf=row["vaf"]))
+    emap = MAPPER.map(variant, {"consequence": "stop_gained"}, auth)
+    return grounding_hash(
+        {"variant": variant.model_dump(), "authenticity": auth.model_dump(), "evidence_map": emap.model_dump()}
+    )
+
+
+def with_records(i: int) -> str:
+    row = ROWS[i]
+    variant = VariantRec(**ROW_VARIANTS[i])
+    auth = AUTH.assess(variant, EvidenceRec(dp=row["dp"], gq=row["gq"], vaf=row["vaf"]))
+    emap = MAPPER.map(variant, {"consequence": "stop_gained"}, auth)
+    return grounding_hash(
+        {"variant": variant.as_dict(), "authenticity": auth.model_dump(), "evidence_map": emap.model_dump()}
+    )
+
+
+def construct_only(make: Callable[[int], object], n: int) -> tuple[float, float]:
+    start = time.perf_counter()
+    for i in range(n):
+        make(i % len(ROWS))
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    keep = [make(i % len(ROWS)) for i in range(n)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keep
+    return elapsed / n * 1e6, size / n
+
+
+def main(n: int) -> None:
+    assert all(with_models(i) == with_records(i) for i in range(len(ROWS))), "paths disagree"
+    print(f"{'path':<28}{'us/variant':>12}")
+    for name, fn in (("models", with_models), ("records", with_records)):
+        start = time.perf_counter()
+        for i in range(n):
+            fn(i % len(ROWS))
+        print(f"{name:<28}{(time.perf_counter() - start) / n * 1e6:>12.1f}")
+
+    print()
+    print("* = model_construct (no validation)")
+    print(f"{'held object':<28}{'us/object':>12}{'bytes/object':>16}")
+    for name, make in (
+        ("TechnicalEvidence", lambda i: TechnicalEvidence(dp=ROWS[i]["dp"], gq=ROWS[i]["gq"], vaf=ROWS[i]["vaf"])),
+        ("EvidenceRec", lambda i: EvidenceRec(dp=ROWS[i]["dp"], gq=ROWS[i]["gq"], vaf=ROWS[i]["vaf"])),
+        ("VariantRecordModel", lambda i: VariantRecordModel(**VARIANTS[i].model_dump())),
+        ("VariantRec", lambda i: VariantRec.from_model(VARIANTS[i])),
+        ("AuthenticityAssessment", lambda i: AuthenticityAssessment(**SAMPLE_AUTH)),
+        ("AuthenticityAssessment*", lambda i: AuthenticityAssessment.model_construct(**SAMPLE_AUTH)),
+    ):
+        us, size = construct_only(make, min(n, 20000))
+        print(f"{name:<28}{us:>12.2f}{size:>16.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
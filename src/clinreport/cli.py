@@ -1,36 +1,77 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-import re
+import signal
+import time
+from contextlib import ExitStack
+from dataclasses import replace
 from datetime import datetime, timezone
 from pathlib import Path
 
 import typer
 
-from .exceptions import InputValidationError
+from .config import settings
+from .exceptions import ExternalToolError, InputValidationError
 from .core.models import (
     AuditEvent,
     ReviewerDecision,
-    TechnicalEvidence,
-    VariantRecordModel,
 )
-from .evidence_mapping.engine import EvidenceMappingEngine
-from .igv.batch import IgvBatchParams, write_igv_batch
-from .igv.runner import run_igv_batch
+from .igv.batch import (
+    IgvBatchParams,
+    plan_snapshot_regions,
+    write_igv_batch_shards,
+    write_igv_regions_batch,
+)
+from .igv.cache import SnapshotCache, snapshot_inputs_fingerprint, snapshot_key
+from .igv.naming import index_snapshots, snapshot_name
+from .igv.pileup import PileupParams, render_regions
+from .igv.runner import run_igv_shards
+from .igv.session import IgvSession
 from .llm.report_interpretation import interpret_report_json
-from .llm.packet_generator import ReviewPacketGenerator
-from .llm.openai_triage import triage_snapshot
+from .llm.packet_generator import build_packet_request, packet_payload
+from .llm.async_triage import TriageItem, load_checkpoint, triage_many
+from .llm.batch_jobs import (
+    BatchEntry,
+    batch_custom_id,
+    ingest_batch,
+    review_packet_result,
+    triage_result,
+    write_batch_requests,
+)
+from .llm.cache import open_llm_cache
+from .llm.grounding import grounding_hash
+from .llm.image_prep import ImagePrepParams, prepare_snapshots
+from .llm.openai_triage import build_triage_request
 from .logging_utils import setup_logging
-from .provenance import collect_versions, write_provenance
-from .qc.fastq_qc import run_fastp
-from .qc.fastq_variants import call_variants_from_fastq
-from .report.render import html_to_pdf, render_html
-from .review.audit import append_audit_event
-from .review.routing import route_review_queue
-from .review.signoff import has_signoff, save_reviewer_decision
-from .technical_review.authenticity_engine import TechnicalAuthenticityEngine
-from .vcf.clinvar import ClinVarStreamMatcher
+from .pipeline import (
+    BATCH_SUMMARY,
+    RunOptions,
+    SampleInputs,
+    read_sample_sheet,
+    run_batch,
+    run_sample,
+    shared_resources,
+)
+from .review.audit import AuditWriter, commit_audit_events, verify_audit_chain
+from .review.export import file_digest, write_export_bundle, write_final_export
+from .review.packets import (
+    PreparedVariant,
+    generate_packets,
+    packet_stem,
+    prepare_variants,
+    report_loci,
+    report_variants,
+    variant_id,
+    write_queue_index,
+    write_review_packet,
+)
+from .review.signoff import has_signoff, iter_decisions, save_reviewer_decision
+from .review.store import ReviewStore
+from .server import JobServer, ServerClient, forward_to_server, make_server, server_url, serving
+from .technical_review.bam_evidence import BamEvidenceParams, extract_bam_evidence
+from .technical_review.sequence_context import ReferenceFasta, RepeatIndex, annotate_sequence_context
 from .vcf.io import iter_variants
 from .vcf.rules import low_confidence
 
@@ -38,22 +79,18 @@ app = typer.Typer(add_completion=False)
 log = logging.getLogger(__name__)
 
 
-def _read_css(template_dir: Path) -> str:
-    css_path = template_dir / "style.css"
-    return css_path.read_text(encoding="utf-8") if css_path.exists() else ""
+def _audit_path(review_dir: Path) -> Path:
+    return Path(settings.review_store_path) if settings.review_store_path else review_dir / "audit.jsonl"
+
 
+def _decisions_path(review_dir: Path) -> Path:
+    return Path(settings.review_store_path) if settings.review_store_path else review_dir / "signoff_decisions.json"
 
-def _is_clinvar_pathogenic(clnsig: str) -> bool:
-    if not clnsig:
-        return False
-    normalized = clnsig.replace(" ", "_")
-    labels = [p for p in re.split(r"[|,;/]+", normalized) if p]
-    accepted = {"Pathogenic", "Likely_pathogenic", "Pathogenic/Likely_pathogenic"}
-    if any(lbl in accepted for lbl in labels):
-        return True
-    if "Pathogenic/Likely_pathogenic" in normalized:
-        return True
-    return False
+
+def _record_queue(case_id: str, entries: list[dict]) -> None:
+    if settings.review_store_path:
+        with ReviewStore(Path(settings.review_store_path)) as store:
+            store.put_packets(case_id, entries)
 
 
 @app.callback()
@@ -92,161 +129,103 @@ def run(
         exists=True,
         help="Optional ClinVar VCF.gz for annotation (e.g. clinvar.vcf.gz GRCh38)",
     ),
+    gene_panel: Path | None = typer.Option(
+        None, exists=True, help="Gene list (one symbol per line); flags important variants on the panel."
+    ),
+    pdf_mode: str = typer.Option(
+        "full",
+        help="full: PDF of the whole report; summary: paginated PDF with top-N table rows; none: skip PDF.",
+    ),
+    pdf_summary_rows: int = typer.Option(50, min=1, help="Rows per table in the summary PDF."),
+    pdf_timeout_s: int | None = typer.Option(
+        None, min=1, help="Kill the PDF worker after this many seconds (default CLINREPORT_PDF_TIMEOUT_S)."
+    ),
+    pdf_max_memory_mb: int | None = typer.Option(
+        None, min=1, help="Address-space cap for the PDF worker (default CLINREPORT_PDF_MAX_MEMORY_MB)."
+    ),
 ):
-    if vcf is None and fastq1 is None:
-        raise InputValidationError("Provide at least one input source: --vcf or --fastq1.")
-    if vcf is not None and not vcf.exists():
-        raise InputValidationError(f"VCF file not found: {vcf}")
-    if fastq1 is not None and reference_fasta is None:
-        raise InputValidationError("--reference-fasta is required when --fastq1 is provided.")
-    if reference_fasta is not None and not reference_fasta.exists():
-        raise InputValidationError(f"Reference FASTA not found: {reference_fasta}")
-    if target_bed is not None and not target_bed.exists():
-        raise InputValidationError(f"Target BED not found: {target_bed}")
-
-    out_dir.mkdir(parents=True, exist_ok=True)
-    min_mapq = 20 if fast_call_preset else 0
-    min_baseq = 20 if fast_call_preset else 0
-    max_depth = 250 if fast_call_preset else 8000
-
-    fastq_called_vcf: Path | None = None
-    if fastq1 is not None:
-        fastq_call_dir = out_dir / "fastq_calling"
-        fastq_called_vcf = call_variants_from_fastq(
-            fastq1=str(fastq1),
-            fastq2=str(fastq2) if fastq2 else None,
-            reference_fasta=str(reference_fasta),
-            out_dir=fastq_call_dir,
-            threads=caller_threads,
-            target_bed=str(target_bed) if target_bed else None,
-            min_mapq=min_mapq,
-            min_baseq=min_baseq,
-            max_depth=max_depth,
-        )
-        log.info("FASTQ-derived variants written to %s", fastq_called_vcf)
-
-    analysis_vcf = vcf if vcf is not None else fastq_called_vcf
-    if analysis_vcf is None:
-        raise InputValidationError("No analyzable VCF available after FASTQ processing.")
-
-    versions = collect_versions()
-    prov_dir = out_dir / "metadata"
-    write_provenance(
-        prov_dir,
-        versions,
-        extra={
-            "assembly": assembly,
-            "vcf": str(analysis_vcf),
-            "input_vcf": str(vcf) if vcf else None,
-            "fastq_called_vcf": str(fastq_called_vcf) if fastq_called_vcf else None,
-            "target_bed": str(target_bed) if target_bed else None,
-            "fast_call_preset": fast_call_preset,
-        },
+    if forward_to_server("run", locals()):
+        return
+    options = RunOptions(
+        assembly=assembly,
+        reference_fasta=reference_fasta,
+        caller_threads=caller_threads,
+        target_bed=target_bed,
+        fast_call_preset=fast_call_preset,
+        skip_fastq_qc=skip_fastq_qc,
+        clinvar_vcf=clinvar_vcf,
+        gene_panel=gene_panel,
+        pdf_mode=pdf_mode,
+        pdf_summary_rows=pdf_summary_rows,
+        pdf_timeout_s=pdf_timeout_s,
+        pdf_max_memory_mb=pdf_max_memory_mb,
     )
+    # Inside `clinreport serve` the ClinVar index, panel and tool versions stay loaded between jobs.
+    resources = shared_resources(options) if serving() else None
+    outputs = run_sample(SampleInputs(vcf=vcf, fastq1=fastq1, fastq2=fastq2), out_dir, options, resources)
+
+    if outputs.pdf is None:
+        typer.echo(f"Wrote: {outputs.html}")
+        typer.echo(f"Wrote: {outputs.json}")
+        if outputs.pdf_error:
+            typer.echo(f"PDF not generated: {outputs.pdf_error}")
+    else:
+        typer.echo(f"Wrote: {outputs.pdf}")
 
-    qc = None
-    if fastq1 and not skip_fastq_qc:
-        qc = run_fastp(str(fastq1), str(fastq2) if fastq2 else None, out_dir / "qc")
-
-    important = []
-    lowc = []
-    clinvar_matcher = ClinVarStreamMatcher(str(clinvar_vcf)) if clinvar_vcf else None
-
-    for v in iter_variants(str(analysis_vcf)):
-        lc = low_confidence(v)
-        if lc.is_low_conf:
-            lowc.append(
-                {
-                    "chrom": v.chrom,
-                    "pos": v.pos,
-                    "ref": v.ref,
-                    "alt": v.alt,
-                    "gt": v.gt,
-                    "dp": v.dp,
-                    "gq": v.gq,
-                    "reasons": lc.reasons,
-                    "snapshot": None,
-                }
-            )
-
-        clinvar = str(v.info.get("CLNSIG", "")).strip()
-        gene = str(v.info.get("GENE", "")).strip()
-        if clinvar_matcher and (not clinvar or not gene):
-            hit = clinvar_matcher.match(v)
-            if hit:
-                if not clinvar:
-                    clinvar = hit.clnsig
-                if not gene:
-                    gene = hit.gene
-
-        if _is_clinvar_pathogenic(clinvar):
-            important.append(
-                {
-                    "gene": gene,
-                    "chrom": v.chrom,
-                    "pos": v.pos,
-                    "ref": v.ref,
-                    "alt": v.alt,
-                    "gt": v.gt,
-                    "dp": v.dp,
-                    "gq": v.gq,
-                    "clinvar": clinvar,
-                    "notes": "",
-                }
-            )
-
-    fastq_detected_variants = []
-    if fastq_called_vcf is not None:
-        for v in iter_variants(str(fastq_called_vcf)):
-            fastq_detected_variants.append(
-                {
-                    "chrom": v.chrom,
-                    "pos": v.pos,
-                    "ref": v.ref,
-                    "alt": v.alt,
-                    "gt": v.gt,
-                    "dp": v.dp,
-                    "gq": v.gq,
-                }
-            )
 
-    template_dir = Path(__file__).parent / "report" / "templates"
-    css = _read_css(template_dir)
-    context = {
-        "sample": "SAMPLE",
-        "assembly": assembly,
-        "generated_at": datetime.now(timezone.utc).isoformat(),
-        "provenance_json": (prov_dir / "tool_versions.json").read_text(encoding="utf-8"),
-        "analysis_vcf": str(analysis_vcf),
-        "clinvar_vcf": str(clinvar_vcf) if clinvar_vcf else None,
-        "fastq_called_vcf": str(fastq_called_vcf) if fastq_called_vcf else None,
-        "qc": qc,
-        "important_variants": important,
-        "fastq_detected_variants": fastq_detected_variants,
-        "low_confidence": lowc,
-        "css": css,
-    }
-
-    html_path = out_dir / "report.html"
-    pdf_path = out_dir / "report.pdf"
-    render_html(template_dir, context, html_path)
-    pdf_error = None
-    try:
-        html_to_pdf(html_path, pdf_path)
-    except Exception as exc:
-        pdf_error = str(exc)
-        log.warning("PDF generation failed; continuing with HTML/JSON outputs. Error: %s", exc)
-
-    if pdf_error:
-        context["pdf_error"] = pdf_error
-
-    (out_dir / "report.json").write_text(json.dumps(context, indent=2, default=str), encoding="utf-8")
-    if pdf_error:
-        typer.echo(f"Wrote: {html_path}")
-        typer.echo(f"Wrote: {out_dir / 'report.json'}")
-        typer.echo("PDF not generated due to missing WeasyPrint native dependencies.")
-    else:
-        typer.echo(f"Wrote: {pdf_path}")
+@app.command()
+def batch(
+    sample_sheet: Path = typer.Option(
+        ..., exists=True, help="TSV (or .csv) with a header of sample_id, vcf, fastq1, fastq2, bam."
+    ),
+    out_dir: Path = typer.Option(Path("out/batch"), help="Per-sample outputs go to <out-dir>/<sample_id>."),
+    workers: int = typer.Option(4, min=1, help="Worker processes; each loads ClinVar, panel and templates once."),
+    assembly: str = typer.Option("GRCh38", help="Reference build label for reports"),
+    reference_fasta: Path | None = typer.Option(None, help="Reference FASTA for samples given as FASTQ."),
+    caller_threads: int = typer.Option(1, min=1, help="Threads per sample for FASTQ variant calling."),
+    target_bed: Path | None = typer.Option(None, help="Optional BED restricting FASTQ variant calling."),
+    fast_call_preset: bool = typer.Option(False, help="Faster (less sensitive) FASTQ calling thresholds."),
+    skip_fastq_qc: bool = typer.Option(False, help="Skip fastp QC."),
+    clinvar_vcf: Path | None = typer.Option(None, exists=True, help="Optional ClinVar VCF.gz for annotation."),
+    clinvar_mode: str = typer.Option(
+        "index",
+        help="index: load ClinVar into memory once per worker; stream: sorted merge per sample (less memory).",
+    ),
+    gene_panel: Path | None = typer.Option(
+        None, exists=True, help="Gene list (one symbol per line); flags important variants on the panel."
+    ),
+    pdf_mode: str = typer.Option("full", help="full, summary or none (see `run`)."),
+    pdf_summary_rows: int = typer.Option(50, min=1, help="Rows per table in the summary PDF."),
+    pdf_timeout_s: int | None = typer.Option(None, min=1, help="Per-sample PDF worker timeout."),
+    pdf_max_memory_mb: int | None = typer.Option(
+        None, min=1, help="Per-sample PDF worker address-space cap."
+    ),
+):
+    """Run many samples from a sample sheet in a pool of warm worker processes."""
+    if clinvar_mode not in ("index", "stream"):
+        raise InputValidationError(f"Unknown --clinvar-mode {clinvar_mode!r}; expected index or stream.")
+    options = RunOptions(
+        assembly=assembly,
+        reference_fasta=reference_fasta,
+        caller_threads=caller_threads,
+        target_bed=target_bed,
+        fast_call_preset=fast_call_preset,
+        skip_fastq_qc=skip_fastq_qc,
+        clinvar_vcf=clinvar_vcf,
+        gene_panel=gene_panel,
+        pdf_mode=pdf_mode,
+        pdf_summary_rows=pdf_summary_rows,
+        pdf_timeout_s=pdf_timeout_s,
+        pdf_max_memory_mb=pdf_max_memory_mb,
+    )
+    samples = read_sample_sheet(sample_sheet)
+    summary = run_batch(samples, out_dir, options, workers=workers, clinvar_mode=clinvar_mode)
+    typer.echo(
+        f"Processed {summary['succeeded']} of {summary['samples']} sample(s) in {summary['wall_seconds']:.1f}s"
+    )
+    typer.echo(f"Wrote: {out_dir / BATCH_SUMMARY}")
+    if summary["failed"]:
+        typer.echo(f"{summary['failed']} sample(s) failed; see {out_dir / BATCH_SUMMARY}.")
 
 
 @app.command()
@@ -255,7 +234,31 @@ def igv(
     bam: Path = typer.Option(..., exists=True, help="BAM or CRAM"),
     genome: str = typer.Option(..., help="IGV genome id (hg38) or path to fasta"),
     out_dir: Path = typer.Option(Path("out/review"), help="Review bundle directory"),
+    shards: int = typer.Option(1, min=1, help="Split loci across this many IGV batch files."),
+    workers: int | None = typer.Option(None, min=1, help="Concurrent IGV processes (default: --shards)."),
+    retries: int = typer.Option(1, min=0, help="Retries for a failed or incomplete shard."),
+    igv_timeout_s: int | None = typer.Option(
+        None, min=1, help="Kill an IGV process after this many seconds."
+    ),
+    cluster_max_width: int | None = typer.Option(
+        None, min=1, help="Merge variants with overlapping windows into one snapshot up to this width (bp)."
+    ),
+    reuse_snapshots: bool = typer.Option(
+        True, help="Skip loci whose snapshot was already rendered from identical inputs."
+    ),
+    igv_port: int | None = typer.Option(
+        None,
+        help="Drive a persistent IGV on this batch port (launched and left running if absent) "
+        "instead of starting IGV per batch.",
+    ),
+    renderer: str = typer.Option(
+        "igv", help="igv: headless IGV snapshots; native: in-process pileup PNGs via samtools (no JVM)."
+    ),
 ):
+    if forward_to_server("igv", locals(), path_params=("genome",)):
+        return
+    if renderer not in ("igv", "native"):
+        raise InputValidationError(f"Unknown --renderer {renderer!r}; expected igv or native.")
     out_dir.mkdir(parents=True, exist_ok=True)
     snap_dir = out_dir / "snapshots"
     meta_dir = out_dir / "metadata"
@@ -275,12 +278,50 @@ def igv(
 
     params = IgvBatchParams(genome=genome, bam_or_cram=str(bam), snapshot_dir=snap_dir)
 
-    bat = out_dir / "igv_batch.igv"
-    write_igv_batch(bat, low_variants, params, sample_name=sample_name)
-    run_igv_batch(bat)
-
+    regions = plan_snapshot_regions(low_variants, params, sample_name, cluster_max_width=cluster_max_width)
+    cache = SnapshotCache(snap_dir)
+    fingerprint = snapshot_inputs_fingerprint(params, renderer=renderer)
+    keys = {r.filename: snapshot_key(fingerprint, r) for r in regions}
+    pending = [r for r in regions if not (reuse_snapshots and cache.is_fresh(r.filename, keys[r.filename]))]
+
+    if pending:
+        for r in pending:
+            # Never let a snapshot from stale inputs survive a failed rerun.
+            cache.forget(r.filename)
+            (snap_dir / r.filename).unlink(missing_ok=True)
+        try:
+            if renderer == "native":
+                pileup_params = PileupParams(
+                    bam_or_cram=str(bam),
+                    snapshot_dir=snap_dir,
+                    reference_fasta=genome if Path(genome).is_file() else None,
+                )
+                render_regions(pending, pileup_params, workers=workers or shards)
+            elif igv_port is not None:
+                bat = out_dir / "igv_batch.igv"
+                write_igv_regions_batch(bat, pending, params)
+                session = IgvSession(port=igv_port)
+                try:
+                    session.run_batch_file(bat, retries=retries)
+                finally:
+                    session.close()
+                missing = [r.filename for r in pending if not (snap_dir / r.filename).exists()]
+                if missing:
+                    raise ExternalToolError(f"IGV session produced no snapshot for {len(missing)} region(s)")
+            else:
+                igv_shards = write_igv_batch_shards(out_dir / "igv_batches", pending, params, n_shards=shards)
+                run_igv_shards(igv_shards, workers=workers or shards, retries=retries, timeout_s=igv_timeout_s)
+        finally:
+            for r in pending:
+                if (snap_dir / r.filename).exists():
+                    cache.record(r.filename, keys[r.filename])
+            cache.save()
+    typer.echo(f"Snapshots: {len(regions) - len(pending)} reused, {len(pending)} rendered.")
+
+    region_of = {id(v): r for r in regions for v in r.variants}
     manifest = []
     for v in low_variants:
+        region = region_of[id(v)]
         manifest.append(
             {
                 "chrom": v.chrom,
@@ -291,6 +332,10 @@ def igv(
                 "dp": v.dp,
                 "gq": v.gq,
                 "locus": f"{v.chrom}:{v.pos}",
+                "sample": sample_name,
+                "snapshot": region.filename,
+                "snapshot_locus": region.locus,
+                "snapshot_covers": [variant_id(x.chrom, x.pos, x.ref, x.alt) for x in region.variants],
             }
         )
     (out_dir / "low_confidence.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
@@ -301,40 +346,139 @@ def igv(
 def triage(
     review_dir: Path = typer.Option(Path("out/review"), exists=True),
     out_json: Path = typer.Option(Path("out/review/triage.json")),
+    concurrency: int | None = typer.Option(
+        None, min=1, help="Concurrent LLM requests (default CLINREPORT_LLM_CONCURRENCY)."
+    ),
+    requests_per_minute: int | None = typer.Option(None, min=1, help="Client-side request rate limit."),
+    tokens_per_minute: int | None = typer.Option(None, min=1, help="Client-side (estimated) token rate limit."),
+    max_retries: int | None = typer.Option(None, min=0, help="Retries on 429/5xx/connection errors."),
+    resume: bool = typer.Option(True, help="Reuse completed items from the checkpoint of an earlier run."),
+    llm_cache: Path | None = typer.Option(
+        None, help="SQLite LLM response cache (default CLINREPORT_LLM_CACHE_PATH; unset disables caching)."
+    ),
+    prep_images: bool = typer.Option(True, help="Crop, downscale and recompress snapshots before upload."),
+    image_max_px: int | None = typer.Option(
+        None, min=64, help="Longest side of uploaded images (default CLINREPORT_TRIAGE_IMAGE_MAX_PX)."
+    ),
+    image_format: str | None = typer.Option(None, help="png|webp|jpeg (default CLINREPORT_TRIAGE_IMAGE_FORMAT)."),
+    crop_top_px: int = typer.Option(0, min=0, help="Header rows (ruler/ideogram) to drop from each snapshot."),
+    prep_workers: int = typer.Option(4, min=1, help="Processes used for image preparation."),
+    batch_requests_out: Path | None = typer.Option(
+        None, help="Write a provider batch request JSONL instead of calling the API (see `ingest-batch`)."
+    ),
 ):
     snap_dir = review_dir / "snapshots"
     manifest_path = review_dir / "low_confidence.json"
     if not manifest_path.exists():
         raise InputValidationError("Missing low_confidence.json. Run `clinreport igv` first.")
+    # Built (and validated) up front so bad options fail before any worker process starts.
+    prep_params = (
+        ImagePrepParams(
+            max_width=image_max_px or settings.triage_image_max_px,
+            max_height=image_max_px or settings.triage_image_max_px,
+            crop_top_px=crop_top_px,
+            image_format=image_format or settings.triage_image_format,
+        )
+        if prep_images
+        else None
+    )
 
     manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
-    results = []
+    snapshots = index_snapshots(snap_dir)
+    results: list[dict | None] = []
+    items: list[tuple[int, TriageItem]] = []
 
     for item in manifest:
-        chrom = item["chrom"]
-        pos = item["pos"]
-        matches = sorted(snap_dir.glob(f"*_{chrom}_{pos}_*.png"))
-        if not matches:
-            matches = sorted(snap_dir.glob(f"*{chrom}*{pos}*.png"))
-        if not matches:
+        # Manifests from older `clinreport igv` runs carry no file name; derive the IGV one.
+        name = item.get("snapshot") or snapshot_name(
+            item.get("sample", "SAMPLE"), item["chrom"], int(item["pos"]), item["ref"], item["alt"]
+        )
+        snap = snapshots.get(name)
+        if snap is None:
             item["triage_error"] = "snapshot_not_found"
             results.append(item)
             continue
 
-        snap = matches[0]
         metadata = {
             "locus": item["locus"],
             "gt": item.get("gt"),
             "dp": item.get("dp"),
             "gq": item.get("gq"),
+            "snapshot_covers": item.get("snapshot_covers", []),
             "note": "Human review required. Do not use as sole basis for clinical decisions.",
         }
-        tri = triage_snapshot(snap, metadata)
-        results.append(tri.model_dump())
+        # Size and mtime tie checkpointed results to this rendering of the snapshot.
+        stat = snap.stat()
+        vid = variant_id(item["chrom"], int(item["pos"]), item["ref"], item["alt"])
+        key = f"{vid}|{name}|{stat.st_size}-{stat.st_mtime_ns}"
+        items.append((len(results), TriageItem(key=key, snapshot_path=snap, metadata=metadata, fallback=item)))
+        results.append(None)
+
+    checkpoint = out_json.with_suffix(".partial.jsonl")
+    if not resume:
+        checkpoint.unlink(missing_ok=True)
+
+    # Items already answered in the checkpoint are not uploaded again, so their images are not prepared.
+    checkpointed = load_checkpoint(checkpoint) if batch_requests_out is None else {}
+    to_prep = [pos for pos, (_, t) in enumerate(items) if t.key not in checkpointed]
+    if prep_params is not None and to_prep:
+        paths = [items[pos][1].snapshot_path for pos in to_prep]
+        prepared = prepare_snapshots(paths, prep_params, workers=prep_workers)
+        for pos, img in zip(to_prep, prepared, strict=True):
+            idx, t = items[pos]
+            items[pos] = (idx, replace(t, image=img))
+        done = [img for img in prepared if img is not None]
+        before = sum(img.original_bytes for img in done)
+        after = sum(img.prepared_bytes for img in done)
+        typer.echo(f"Snapshot upload size: {before / 1024:.1f} KiB -> {after / 1024:.1f} KiB")
+
+    if batch_requests_out is not None:
+        entries = []
+        pending = []
+        for idx, t in items:
+            vid = t.key.split("|", 1)[0]
+            request = build_triage_request(t.snapshot_path, t.metadata, t.image)
+            custom_id = batch_custom_id(vid, grounding_hash({"key": t.key, "metadata": t.metadata}))
+            entries.append(BatchEntry(custom_id=custom_id, request=request, context={"fallback": t.fallback}))
+            pending.append([idx, custom_id])
+        index_path = write_batch_requests(
+            batch_requests_out,
+            "triage",
+            entries,
+            meta={"out_json": str(out_json), "results": results, "pending": pending},
+        )
+        typer.echo(f"Wrote: {batch_requests_out} ({len(entries)} request(s))")
+        typer.echo(f"Wrote: {index_path}")
+        return
+
+    cache = open_llm_cache(llm_cache)
+    try:
+        triaged = asyncio.run(
+            triage_many(
+                [t for _, t in items],
+                checkpoint,
+                concurrency=concurrency or settings.llm_concurrency,
+                requests_per_minute=requests_per_minute or settings.llm_requests_per_minute,
+                tokens_per_minute=tokens_per_minute or settings.llm_tokens_per_minute,
+                max_retries=settings.llm_max_retries if max_retries is None else max_retries,
+                cache=cache,
+            )
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+    for (idx, _), result in zip(items, triaged, strict=True):
+        results[idx] = result
 
     out_json.parent.mkdir(parents=True, exist_ok=True)
     out_json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    failed = sum(1 for r in results if r and "triage_error" in r)
     typer.echo(f"Wrote: {out_json}")
+    if failed:
+        typer.echo(f"{failed} item(s) not triaged; rerun to retry them from {checkpoint}.")
+    if not any("triage_error" in r for r in triaged):
+        # Everything is in out_json now; a stale checkpoint must not outlive re-rendered snapshots.
+        checkpoint.unlink(missing_ok=True)
 
 
 @app.command("interpret-report")
@@ -343,22 +487,33 @@ def interpret_report(
     out_json: Path = typer.Option(Path("out/interpretation/interpretation.json")),
     out_md: Path = typer.Option(Path("out/interpretation/interpretation.md")),
     model: str | None = typer.Option(None, help="Override model (default CLINREPORT_OPENAI_MODEL)"),
+    llm_cache: Path | None = typer.Option(None, help="SQLite LLM response cache (default CLINREPORT_LLM_CACHE_PATH)."),
+    max_prompt_tokens: int | None = typer.Option(
+        None,
+        min=1000,
+        help="Per-request prompt budget; larger reports are chunked (default CLINREPORT_INTERPRETATION_MAX_PROMPT_TOKENS).",
+    ),
+    concurrency: int | None = typer.Option(None, min=1, help="Parallel chunk requests (default CLINREPORT_LLM_CONCURRENCY)."),
 ):
-    parsed = interpret_report_json(
-        report_path=report_json,
-        out_json=out_json,
-        out_md=out_md,
-        model=model,
-    )
+    cache = open_llm_cache(llm_cache)
+    try:
+        parsed = interpret_report_json(
+            report_path=report_json,
+            out_json=out_json,
+            out_md=out_md,
+            model=model,
+            cache=cache,
+            max_prompt_tokens=max_prompt_tokens,
+            workers=concurrency,
+        )
+    finally:
+        if cache is not None:
+            cache.close()
     typer.echo(f"Wrote: {out_json}")
     typer.echo(f"Wrote: {out_md}")
     typer.echo(f"Summary: {parsed.get('summary', '')[:200]}")
 
 
-def _variant_id(chrom: str, pos: int, ref: str, alt: str) -> str:
-    return f"{chrom}-{pos}-{ref}-{alt}"
-
-
 @app.command("review-packet")
 def review_packet(
     case_id: str = typer.Option(..., help="Case identifier"),
@@ -366,98 +521,251 @@ def review_packet(
     out_json: Path = typer.Option(Path("out/review/packet.json")),
     out_md: Path = typer.Option(Path("out/review/packet.md")),
     use_llm: bool = typer.Option(False, help="Use LLM for packet generation"),
+    llm_cache: Path | None = typer.Option(None, help="SQLite LLM response cache (default CLINREPORT_LLM_CACHE_PATH)."),
+    batch_requests_out: Path | None = typer.Option(
+        None, help="With --use-llm, write a provider batch request JSONL instead of calling the API."
+    ),
+    all_variants: bool = typer.Option(
+        False, help="One packet per report variant under --packets-dir, plus queue_index.json."
+    ),
+    packets_dir: Path | None = typer.Option(None, help="Packet directory for --all-variants (default: <out-json dir>/packets)."),
+    concurrency: int | None = typer.Option(
+        None, min=1, help="Parallel LLM packet requests (default CLINREPORT_LLM_CONCURRENCY)."
+    ),
+    bam: Path | None = typer.Option(
+        None, exists=True, help="BAM/CRAM for strand balance, MAPQ, BQ and duplicate rate at each variant."
+    ),
+    reference_fasta: Path | None = typer.Option(
+        None,
+        exists=True,
+        help="Reference FASTA (may be bgzipped): decodes CRAM for --bam and feeds --sequence-context.",
+    ),
+    sequence_context: bool = typer.Option(
+        False,
+        "--sequence-context",
+        help="Flag low-complexity/homopolymer sites from --reference-fasta (uncompressed, with a .fai index).",
+    ),
+    repeats_bed: Path | None = typer.Option(
+        None,
+        exists=True,
+        help="Repeat BED(.gz); variants inside an interval count as low complexity (implies --sequence-context).",
+    ),
+    bam_workers: int = typer.Option(4, min=1, help="Parallel samtools mpileup shards for --bam."),
 ):
+    if forward_to_server("packet", locals()):
+        return
+    if batch_requests_out is not None and not use_llm:
+        raise InputValidationError("--batch-requests-out requires --use-llm.")
     payload = json.loads(report_json.read_text(encoding="utf-8"))
-    variants = payload.get("important_variants") or payload.get("fastq_detected_variants") or []
+    variants = report_variants(payload)
     if not variants:
         raise InputValidationError("No variants found in report for packet generation.")
 
-    first = variants[0]
-    vid = _variant_id(first["chrom"], int(first["pos"]), first["ref"], first["alt"])
-    variant = VariantRecordModel(
-        variant_id=vid,
-        chrom=first["chrom"],
-        pos=int(first["pos"]),
-        ref=first["ref"],
-        alt=first["alt"],
-        gene=first.get("gene"),
-        clinvar=first.get("clinvar"),
-        gt=first.get("gt"),
-        dp=first.get("dp"),
-        gq=first.get("gq"),
-        filter=first.get("filter"),
-    )
-    evidence = TechnicalEvidence(
-        dp=first.get("dp"),
-        gq=first.get("gq"),
-        vaf=first.get("vaf"),
-    )
-
-    auth_engine = TechnicalAuthenticityEngine()
-    authenticity = auth_engine.assess(variant, evidence)
-
-    mapping_engine = EvidenceMappingEngine()
-    evidence_map = mapping_engine.map(
-        variant,
-        annotations={"clinvar": first.get("clinvar"), "consequence": first.get("consequence")},
-        authenticity=authenticity,
-    )
-    queue = route_review_queue(authenticity, evidence_map)
-
-    packet_gen = ReviewPacketGenerator()
-    packet = packet_gen.generate(variant, authenticity, evidence_map, use_llm=use_llm)
+    rows = variants if all_variants else variants[:1]
+    loci = report_loci(rows)
+    bam_evidence = None
+    if bam is not None:
+        bam_params = BamEvidenceParams(
+            bam_or_cram=str(bam), reference_fasta=str(reference_fasta) if reference_fasta else None
+        )
+        bam_evidence = extract_bam_evidence(loci, bam_params, workers=bam_workers)
+    site_context = None
+    if sequence_context or repeats_bed is not None:
+        if reference_fasta is None:
+            raise InputValidationError("--sequence-context and --repeats-bed require --reference-fasta.")
+        repeats = RepeatIndex.from_bed(repeats_bed) if repeats_bed is not None else None
+        with ReferenceFasta(reference_fasta) as fasta:
+            site_context = annotate_sequence_context(loci, fasta, repeats)
+    prepared = prepare_variants(rows, bam_evidence=bam_evidence, sequence_context=site_context)
+    review_dir = out_json.parent
+    packets_dir = packets_dir or review_dir / "packets"
+
+    def outputs(p: PreparedVariant) -> tuple[Path, Path]:
+        if not all_variants:
+            return out_json, out_md
+        stem = packet_stem(p.variant.variant_id)
+        return packets_dir / f"{stem}.json", packets_dir / f"{stem}.md"
+
+    if batch_requests_out is not None:
+        entries = []
+        for p in prepared:
+            request_payload = packet_payload(p.variant, p.authenticity, p.evidence_map)
+            ghash = grounding_hash(request_payload)
+            p_json, p_md = outputs(p)
+            entries.append(
+                BatchEntry(
+                    custom_id=batch_custom_id(p.variant.variant_id, ghash),
+                    request=build_packet_request(request_payload),
+                    context={
+                        "case_id": case_id,
+                        "queue": p.queue,
+                        "variant": p.variant.model_dump(),
+                        "authenticity": p.authenticity.model_dump(),
+                        "evidence_map": p.evidence_map.model_dump(),
+                        "grounding_hash": ghash,
+                        "out_json": str(p_json),
+                        "out_md": str(p_md),
+                        "audit_path": str(_audit_path(review_dir)),
+                    },
+                )
+            )
+        index_path = write_batch_requests(batch_requests_out, "review_packet", entries)
+        if all_variants:
+            write_queue_index(
+                review_dir / "queue_index.json",
+                case_id,
+                [
+                    {
+                        "variant_id": e.context["variant"]["variant_id"],
+                        "gene": e.context["variant"]["gene"],
+                        "queue": e.context["queue"],
+                        "packet_json": e.context["out_json"],
+                        "packet_md": e.context["out_md"],
+                    }
+                    for e in entries
+                ],
+            )
+        typer.echo(f"Wrote: {batch_requests_out} ({len(entries)} request(s))")
+        typer.echo(f"Wrote: {index_path}")
+        return
 
-    out_json.parent.mkdir(parents=True, exist_ok=True)
-    out_md.parent.mkdir(parents=True, exist_ok=True)
-    packet_payload = {
-        "case_id": case_id,
-        "queue": queue,
-        "variant": variant.model_dump(),
-        "authenticity": authenticity.model_dump(),
-        "evidence_map": evidence_map.model_dump(),
-        "packet": packet.model_dump(),
-    }
-    out_json.write_text(json.dumps(packet_payload, indent=2), encoding="utf-8")
-    out_md.write_text(
-        "\n".join(
+    cache = open_llm_cache(llm_cache) if use_llm else None
+    try:
+        packets = generate_packets(
+            prepared, use_llm=use_llm, cache=cache, workers=concurrency or settings.llm_concurrency
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+
+    if not all_variants:
+        packet = packets[0]
+        if isinstance(packet, Exception):
+            raise packet
+        p = prepared[0]
+        event = write_review_packet(
+            case_id,
+            p.queue,
+            p.variant.model_dump(),
+            p.authenticity.model_dump(),
+            p.evidence_map.model_dump(),
+            packet,
+            out_json,
+            out_md,
+            audit_payload={"use_llm": use_llm},
+        )
+        commit_audit_events(_audit_path(review_dir), [event])
+        _record_queue(
+            case_id,
             [
-                f"# Review Packet: {case_id}",
-                "",
-                f"Variant: `{vid}`",
-                f"Queue: `{queue}`",
-                "",
-                "## Summary",
-                packet.summary,
-                "",
-                "## Technical",
-                packet.technical_summary,
-                "",
-                "## Evidence",
-                packet.evidence_summary,
-                "",
-                "## Recommended Actions",
-                *[f"- {x}" for x in packet.recommended_actions],
-                "",
-                "## Draft Rationale",
-                packet.draft_rationale,
-            ]
+                {
+                    "variant_id": p.variant.variant_id,
+                    "gene": p.variant.gene,
+                    "queue": p.queue,
+                    "packet_json": str(out_json),
+                    "packet_md": str(out_md),
+                }
+            ],
         )
-        + "\n",
-        encoding="utf-8",
-    )
-
-    append_audit_event(
-        out_json.parent / "audit.jsonl",
-        AuditEvent(
-            event_type="review_packet_generated",
-            case_id=case_id,
-            variant_id=vid,
-            payload={"queue": queue, "use_llm": use_llm, "packet_path": str(out_json)},
-        ),
-    )
-    typer.echo(f"Wrote: {out_json}")
-    typer.echo(f"Wrote: {out_md}")
-    typer.echo(f"Queue: {queue}")
+        typer.echo(f"Wrote: {out_json}")
+        typer.echo(f"Wrote: {out_md}")
+        typer.echo(f"Queue: {p.queue}")
+        return
+
+    index_entries = []
+    # Events are group committed as packets are written (one sync per writer batch, not per packet).
+    with AuditWriter(_audit_path(review_dir)) as audit:
+        for p, packet in zip(prepared, packets, strict=True):
+            entry = {"variant_id": p.variant.variant_id, "gene": p.variant.gene, "queue": p.queue}
+            if isinstance(packet, Exception):
+                log.warning("Packet generation failed for %s: %s", p.variant.variant_id, packet)
+                index_entries.append({**entry, "error": f"{type(packet).__name__}: {packet}"})
+                continue
+            p_json, p_md = outputs(p)
+            audit.write(
+                write_review_packet(
+                    case_id,
+                    p.queue,
+                    p.variant.model_dump(),
+                    p.authenticity.model_dump(),
+                    p.evidence_map.model_dump(),
+                    packet,
+                    p_json,
+                    p_md,
+                    audit_payload={"use_llm": use_llm, "batch": True},
+                )
+            )
+            index_entries.append({**entry, "packet_json": str(p_json), "packet_md": str(p_md)})
+    queue_index = review_dir / "queue_index.json"
+    write_queue_index(queue_index, case_id, index_entries)
+    _record_queue(case_id, index_entries)
+
+    failed = sum(1 for e in index_entries if "error" in e)
+    typer.echo(f"Wrote: {audit.committed} packet(s) to {packets_dir}")
+    typer.echo(f"Wrote: {queue_index}")
+    if failed:
+        typer.echo(f"{failed} packet(s) failed; see {queue_index}.")
+
+
+@app.command("ingest-batch")
+def ingest_batch_results(
+    requests: Path = typer.Option(..., exists=True, help="Request JSONL written with --batch-requests-out"),
+    results: list[Path] = typer.Option(..., exists=True, help="Provider batch output (and error) JSONL files"),
+    out_json: Path | None = typer.Option(None, help="Override the triage output path recorded at request time."),
+    llm_cache: Path | None = typer.Option(
+        None, help="Also store responses in this LLM cache (default CLINREPORT_LLM_CACHE_PATH)."
+    ),
+):
+    """Validate offline batch results and merge them into triage or review-packet outputs."""
+    index, outcomes = ingest_batch(requests, results)
+    failed = 0
+    cache = open_llm_cache(llm_cache)
+    try:
+        if index["kind"] == "triage":
+            meta = index["meta"]
+            merged = list(meta["results"])
+            by_id = {o.custom_id: o for o in outcomes}
+            for idx, custom_id in meta["pending"]:
+                merged[idx] = triage_result(by_id[custom_id], cache=cache)
+            failed = sum(1 for r in merged if r and "triage_error" in r)
+            target = out_json or Path(meta["out_json"])
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(json.dumps(merged, indent=2), encoding="utf-8")
+            typer.echo(f"Wrote: {target}")
+        else:
+            # Entered writers are closed (committing buffered events) even if a later outcome fails.
+            with ExitStack() as stack:
+                writers: dict[Path, AuditWriter] = {}
+                for outcome in outcomes:
+                    ctx = outcome.context
+                    try:
+                        packet = review_packet_result(outcome, cache=cache)
+                    except InputValidationError as exc:
+                        failed += 1
+                        log.warning("Packet batch result rejected: %s", exc)
+                        continue
+                    event = write_review_packet(
+                        ctx["case_id"],
+                        ctx["queue"],
+                        ctx["variant"],
+                        ctx["authenticity"],
+                        ctx["evidence_map"],
+                        packet,
+                        Path(ctx["out_json"]),
+                        Path(ctx["out_md"]),
+                        audit_payload={"use_llm": True, "batch_custom_id": outcome.custom_id},
+                    )
+                    audit_path = Path(ctx.get("audit_path") or Path(ctx["out_json"]).parent / "audit.jsonl")
+                    if audit_path not in writers:
+                        writers[audit_path] = stack.enter_context(AuditWriter(audit_path))
+                    writers[audit_path].write(event)
+                    typer.echo(f"Wrote: {ctx['out_json']}")
+    finally:
+        if cache is not None:
+            cache.close()
+    typer.echo(f"Ingested {len(outcomes) - failed} of {len(outcomes)} batch result(s).")
+    if failed:
+        typer.echo(f"{failed} result(s) failed validation or were missing; see the log or output for details.")
 
 
 @app.command("signoff")
@@ -471,6 +779,8 @@ def signoff(
     escalation_reason: str | None = typer.Option(None, help="Reason for escalation"),
     out_dir: Path = typer.Option(Path("out/review"), help="Review output directory"),
 ):
+    if forward_to_server("signoff", locals()):
+        return
     out_dir.mkdir(parents=True, exist_ok=True)
     decision_obj = ReviewerDecision(
         case_id=case_id,
@@ -481,16 +791,18 @@ def signoff(
         override=override,
         escalation_reason=escalation_reason,
     )
-    decisions_path = out_dir / "signoff_decisions.json"
+    decisions_path = _decisions_path(out_dir)
     save_reviewer_decision(decisions_path, decision_obj)
-    append_audit_event(
-        out_dir / "audit.jsonl",
-        AuditEvent(
-            event_type="reviewer_signoff",
-            case_id=case_id,
-            variant_id=variant_id,
-            payload=decision_obj.model_dump(),
-        ),
+    commit_audit_events(
+        _audit_path(out_dir),
+        [
+            AuditEvent(
+                event_type="reviewer_signoff",
+                case_id=case_id,
+                variant_id=variant_id,
+                payload=decision_obj.model_dump(),
+            )
+        ],
     )
     typer.echo(f"Wrote: {decisions_path}")
     typer.echo("Sign-off recorded.")
@@ -501,9 +813,22 @@ def final_export(
     case_id: str = typer.Option(..., help="Case identifier"),
     report_json: Path = typer.Option(..., exists=True, help="Original report.json"),
     packet_json: Path = typer.Option(..., exists=True, help="Review packet JSON"),
-    decisions_json: Path = typer.Option(Path("out/review/signoff_decisions.json"), exists=True),
+    decisions_json: Path | None = typer.Option(
+        None,
+        help="Decisions log or review store "
+        "(default: CLINREPORT_REVIEW_STORE_PATH, else out/review/signoff_decisions.json).",
+    ),
     out_json: Path = typer.Option(Path("out/review/final_report.json")),
+    report_mode: str = typer.Option(
+        "embed", help="embed: copy report.json into the export; reference: record its SHA-256, size and path."
+    ),
+    bundle: Path | None = typer.Option(
+        None, help="Also write a .tar/.tar.gz with the export, the packet and the report stored by hash."
+    ),
 ):
+    decisions_json = decisions_json or _decisions_path(Path("out/review"))
+    if not decisions_json.exists():
+        raise InputValidationError(f"Decisions file not found: {decisions_json}")
     packet = json.loads(packet_json.read_text(encoding="utf-8"))
     variant_id = packet["variant"]["variant_id"]
     if not has_signoff(decisions_json, case_id, variant_id):
@@ -511,25 +836,140 @@ def final_export(
             f"No reviewer sign-off for case={case_id}, variant={variant_id}. Final export is blocked."
         )
 
-    report = json.loads(report_json.read_text(encoding="utf-8"))
-    decisions = json.loads(decisions_json.read_text(encoding="utf-8"))
-    out_payload = {
-        "case_id": case_id,
-        "generated_at": datetime.now(timezone.utc).isoformat(),
-        "variant_id": variant_id,
-        "report": report,
-        "review_packet": packet,
-        "reviewer_decisions": decisions.get("decisions", []),
-    }
-    out_json.parent.mkdir(parents=True, exist_ok=True)
-    out_json.write_text(json.dumps(out_payload, indent=2), encoding="utf-8")
-    append_audit_event(
-        out_json.parent / "audit.jsonl",
-        AuditEvent(
-            event_type="final_export_generated",
-            case_id=case_id,
-            variant_id=variant_id,
-            payload={"out_json": str(out_json)},
-        ),
+    digest = file_digest(report_json) if report_mode == "reference" or bundle is not None else None
+    write_final_export(
+        out_json,
+        {"case_id": case_id, "generated_at": datetime.now(timezone.utc).isoformat(), "variant_id": variant_id},
+        report_json,
+        packet,
+        iter_decisions(decisions_json, case_id, variant_id),
+        report_mode=report_mode,
+        report_sha256=digest,
+    )
+    payload: dict = {"out_json": str(out_json), "report_mode": report_mode}
+    if digest is not None:
+        payload["report_sha256"] = digest[0]
+    if bundle is not None:
+        write_export_bundle(bundle, out_json, report_json, packet_json, digest[0])
+        payload["bundle"] = str(bundle)
+    commit_audit_events(
+        _audit_path(out_json.parent),
+        [
+            AuditEvent(
+                event_type="final_export_generated",
+                case_id=case_id,
+                variant_id=variant_id,
+                payload=payload,
+            )
+        ],
     )
     typer.echo(f"Wrote: {out_json}")
+    if bundle is not None:
+        typer.echo(f"Wrote: {bundle}")
+
+
+def _store(store: Path | None) -> ReviewStore:
+    path = store or (Path(settings.review_store_path) if settings.review_store_path else None)
+    if path is None:
+        raise InputValidationError("Pass --store or set CLINREPORT_REVIEW_STORE_PATH.")
+    if not path.exists():
+        raise InputValidationError(f"Review store not found: {path}")
+    return ReviewStore(path)
+
+
+@app.command("review-queue")
+def review_queue(
+    store: Path | None = typer.Option(None, help="Review store (default CLINREPORT_REVIEW_STORE_PATH)."),
+    case_id: str | None = typer.Option(None, help="Only this case."),
+    queue: str | None = typer.Option(None, help="Only this queue, e.g. expert_review."),
+    unsigned: bool = typer.Option(True, help="Only variants without a reviewer decision."),
+):
+    with _store(store) as review_store:
+        entries = review_store.queue_entries(case_id=case_id, queue=queue, unsigned_only=unsigned)
+    typer.echo(json.dumps(entries, indent=2))
+
+
+@app.command("review-export")
+def review_export(
+    out_dir: Path = typer.Option(..., help="Directory for signoff_decisions.json, audit.jsonl and queue_index.json."),
+    store: Path | None = typer.Option(None, help="Review store (default CLINREPORT_REVIEW_STORE_PATH)."),
+    case_id: str | None = typer.Option(None, help="Only this case (also writes its queue_index.json)."),
+):
+    with _store(store) as review_store:
+        written = review_store.export_json(out_dir, case_id=case_id)
+    for path in written:
+        typer.echo(f"Wrote: {path}")
+
+
+@app.command("audit-verify")
+def audit_verify(
+    audit_path: Path = typer.Option(Path("out/review/audit.jsonl"), help="Active audit log"),
+    full: bool = typer.Option(False, help="Re-hash every segment instead of resuming from the checkpoint."),
+):
+    result = verify_audit_chain(audit_path, use_checkpoint=not full)
+    if not result.ok:
+        raise InputValidationError(f"Audit log {audit_path} failed verification: {result.error}")
+    typer.echo(f"Audit chain OK ({result.events_checked} new event(s) verified).")
+
+
+@app.command()
+def serve(
+    socket_path: Path = typer.Option(
+        Path("out/clinreport.sock"), "--socket", help="Unix socket to listen on (readable only by its owner)."
+    ),
+    port: int | None = typer.Option(
+        None, help="Listen on this TCP port instead of the socket; requires CLINREPORT_SERVER_TOKEN."
+    ),
+    host: str = typer.Option("127.0.0.1", help="Interface for --port."),
+    workers: int = typer.Option(4, min=1, help="Jobs run concurrently."),
+    queue_size: int = typer.Option(64, min=1, help="Jobs allowed to wait; further submissions get HTTP 503."),
+    clinvar_vcf: Path | None = typer.Option(None, exists=True, help="ClinVar VCF to index at startup."),
+    gene_panel: Path | None = typer.Option(None, exists=True, help="Gene panel to load with --clinvar-vcf."),
+):
+    """
+    Keep a warm process that runs run/igv/packet/signoff jobs from a bounded queue.
+
+    POST /jobs {"kind", "params"} queues a job; GET /jobs/<id>[?wait=s] and
+    GET /status report progress. With CLINREPORT_SERVER_URL pointing here,
+    those CLI commands submit jobs instead of running locally.
+    """
+    listen_socket = socket_path.absolute() if port is None else None
+    if listen_socket is None and not settings.server_token:
+        raise InputValidationError("--port requires CLINREPORT_SERVER_TOKEN; clients send it as a bearer token.")
+    if clinvar_vcf is not None or gene_panel is not None:
+        started = time.perf_counter()
+        shared_resources(RunOptions(clinvar_vcf=clinvar_vcf, gene_panel=gene_panel))
+        typer.echo(f"Loaded ClinVar/panel in {time.perf_counter() - started:.1f}s")
+    jobs = JobServer(workers=workers, queue_size=queue_size)
+    httpd = make_server(jobs, host, port or 0, listen_socket, token=settings.server_token)
+    jobs.start()
+
+    def stop(*_: object) -> None:
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    bound_port = httpd.server_address[1] if listen_socket is None else 0
+    typer.echo(f"Listening on {server_url(host, bound_port, listen_socket)}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        if listen_socket is not None:
+            listen_socket.unlink(missing_ok=True)
+        jobs.shutdown()
+
+
+@app.command("serve-status")
+def serve_status(
+    url: str | None = typer.Option(None, help="Server address (default CLINREPORT_SERVER_URL)."),
+):
+    """Print the status of a running `clinreport serve`."""
+    url = url or settings.server_url
+    if not url:
+        raise InputValidationError("Pass --url or set CLINREPORT_SERVER_URL.")
+    try:
+        typer.echo(json.dumps(ServerClient(url, token=settings.server_token).status(), indent=2))
+    except OSError as exc:
+        raise ExternalToolError(f"clinreport server at {url} is not reachable: {exc}") from exc
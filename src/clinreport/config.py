@@ -30,8 +30,31 @@ class AppSettings(BaseSettings):
     fastp_path: str = "fastp"
     igv_sh_path: str = "igv.sh"
 
+    pdf_timeout_s: int = 600
+    pdf_max_memory_mb: int = 4096
+
     openai_model: str = "gpt-5.2"
     openai_timeout_s: int = 120
+    llm_concurrency: int = 8
+    llm_requests_per_minute: int | None = None
+    llm_tokens_per_minute: int | None = None
+    llm_max_retries: int = 5
+    llm_cache_path: str | None = None
+    llm_cache_max_mb: int = 512
+    interpretation_max_prompt_tokens: int = 30000
+    triage_image_max_px: int = 1024
+    triage_image_format: str = "png"
+    # SQLite review store for decisions, audit events and packet queues (default: per-directory JSON files).
+    review_store_path: str | None = None
+    # Rotate audit.jsonl into numbered segments past this size (0 disables rotation).
+    audit_segment_max_mb: int = 64
+    # none | flush (fdatasync each audit write) | fsync (also metadata and directory entry).
+    audit_durability: str = "flush"
+    # `clinreport serve` address (http://host:port or unix:/path.sock); run/igv/review-packet/signoff
+    # are sent there as jobs when it answers.
+    server_url: str | None = None
+    # Bearer token for a TCP `clinreport serve` (required there; Unix sockets rely on file mode 0600).
+    server_token: str | None = None
 
 
 settings = AppSettings()
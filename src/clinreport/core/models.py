@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class VariantRecordModel(BaseModel):
@@ -48,6 +48,9 @@ class AuthenticityAssessment(BaseModel):
 
 
 class ClinicalEvidenceItem(BaseModel):
+    # Frozen: the evidence mapper shares identical items between EvidenceMaps.
+    model_config = ConfigDict(frozen=True)
+
     code: str
     strength: Literal["supporting", "moderate", "strong", "very_strong"]
     reason: str
@@ -74,6 +77,7 @@ class ReviewPacket(BaseModel):
     draft_rationale: str
     llm_model: str
     grounding_hash: str
+    llm_cache_hit: bool = False
 
 
 class ReviewerDecision(BaseModel):
@@ -95,3 +99,5 @@ class AuditEvent(BaseModel):
     variant_id: str | None = None
     timestamp: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     payload: dict = Field(default_factory=dict)
+    # Set by the audit log writer: SHA-256 of the previous log line.
+    prev_hash: str | None = None
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Any
+
+from .models import TechnicalEvidence, VariantRecordModel
+
+
+@dataclass(slots=True)
+class VariantRec:
+    """
+    Slotted, unvalidated mirror of `VariantRecordModel` for the pipeline interior.
+
+    The engines accept it wherever they accept the model. Build it only from
+    values that were already validated or computed internally.
+    """
+
+    variant_id: str
+    chrom: str
+    pos: int
+    ref: str
+    alt: str
+    gene: str | None = None
+    consequence: str | None = None
+    clinvar: str | None = None
+    gt: str | None = None
+    dp: int | None = None
+    gq: int | None = None
+    af: float | None = None
+    vaf: float | None = None
+    qual: float | None = None
+    filter: str | None = None
+
+    @classmethod
+    def from_model(cls, model: VariantRecordModel) -> VariantRec:
+        return cls(**{name: getattr(model, name) for name in _VARIANT_FIELDS})
+
+    def as_dict(self) -> dict[str, Any]:
+        """Equal to `VariantRecordModel.model_dump()` for the same values."""
+        return {name: getattr(self, name) for name in _VARIANT_FIELDS}
+
+    def to_model(self) -> VariantRecordModel:
+        return VariantRecordModel(**self.as_dict())
+
+
+@dataclass(slots=True)
+class EvidenceRec:
+    """Interior form of `TechnicalEvidence`."""
+
+    dp: int | None = None
+    ad_ref: int | None = None
+    ad_alt: int | None = None
+    vaf: float | None = None
+    gq: int | None = None
+    qual: float | None = None
+    strand_balance: float | None = None
+    mapping_quality: float | None = None
+    base_quality: float | None = None
+    in_low_complexity_region: bool = False
+    duplicate_rate: float | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in _EVIDENCE_FIELDS}
+
+    def to_model(self) -> TechnicalEvidence:
+        return TechnicalEvidence(**self.as_dict())
+
+
+_VARIANT_FIELDS = tuple(f.name for f in fields(VariantRec))
+_EVIDENCE_FIELDS = tuple(f.name for f in fields(EvidenceRec))
+
@@ -1,82 +1,66 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 
-from ..core.models import AuthenticityAssessment, ClinicalEvidenceItem, EvidenceMap, VariantRecordModel
+from ..core.models import (
+    AuthenticityAssessment,
+    ClinicalEvidenceItem,
+    EvidenceMap,
+    VariantRecordModel,
+)
+from ..core.records import VariantRec
+from ..exceptions import InputValidationError
+from .rules import RULE_TABLES, EvidenceRule
+
+
+@dataclass(frozen=True)
+class _Outcome:
+    # Rules whose reason embeds the AF value stay as EvidenceRule and are formatted per variant.
+    supports: tuple[ClinicalEvidenceItem | EvidenceRule, ...]
+    contradicts: tuple[ClinicalEvidenceItem | EvidenceRule, ...]
+    missing: tuple[str, ...]
+    state: str
 
 
 @dataclass
 class EvidenceMappingEngine:
     max_population_af: float = 0.01
     rules_version: str = "v1"
+    _memo: dict[tuple[str, str, str, str], _Outcome] = field(default_factory=dict, init=False, repr=False, compare=False)
 
-    def map(self, variant: VariantRecordModel, annotations: dict, authenticity: AuthenticityAssessment) -> EvidenceMap:
-        supports: list[ClinicalEvidenceItem] = []
-        contradicts: list[ClinicalEvidenceItem] = []
-        missing: list[str] = []
-
-        pop_af = annotations.get("gnomad_af", variant.af)
-        if pop_af is None:
-            missing.append("population_frequency")
-        elif pop_af <= self.max_population_af:
-            supports.append(
-                ClinicalEvidenceItem(
-                    code="LOW_FREQ",
-                    strength="moderate",
-                    reason=f"Population AF {pop_af:.5f} <= {self.max_population_af}",
-                )
-            )
-        else:
-            contradicts.append(
-                ClinicalEvidenceItem(
-                    code="HIGH_FREQ",
-                    strength="strong",
-                    reason=f"Population AF {pop_af:.5f} > {self.max_population_af}",
-                )
-            )
-
-        clnsig = (variant.clinvar or annotations.get("clinvar") or "").replace(" ", "_")
-        if not clnsig:
-            missing.append("clinvar_assertion")
-        elif "Pathogenic" in clnsig:
-            supports.append(
-                ClinicalEvidenceItem(
-                    code="CLINVAR_PATH",
-                    strength="moderate",
-                    reason=f"ClinVar assertion: {clnsig}",
-                )
-            )
-        elif "Benign" in clnsig:
-            contradicts.append(
-                ClinicalEvidenceItem(
-                    code="CLINVAR_BENIGN",
-                    strength="moderate",
-                    reason=f"ClinVar assertion: {clnsig}",
-                )
+    def __post_init__(self) -> None:
+        if self.rules_version not in RULE_TABLES:
+            raise InputValidationError(
+                f"Unknown evidence rules version {self.rules_version!r}; known: {sorted(RULE_TABLES)}"
             )
 
-        consequence = (variant.consequence or annotations.get("consequence") or "").lower()
-        if not consequence:
-            missing.append("consequence_annotation")
-        elif any(k in consequence for k in ("stop_gained", "frameshift", "splice_acceptor", "splice_donor")):
-            supports.append(
-                ClinicalEvidenceItem(
-                    code="HIGH_IMPACT_CONSEQUENCE",
-                    strength="supporting",
-                    reason=f"Consequence {consequence} suggests high impact",
-                )
-            )
+    def _outcome(self, af_side: str, clnsig: str, consequence: str, label: str) -> _Outcome:
+        key = (af_side, clnsig, consequence, label)
+        cached = self._memo.get(key)
+        if cached is not None:
+            return cached
 
-        if authenticity.label == "likely_artifact":
-            contradicts.append(
-                ClinicalEvidenceItem(
-                    code="LOW_TECH_CONF",
-                    strength="supporting",
-                    reason="Technical authenticity assessment indicates likely artifact",
+        values = {"af_side": af_side, "clnsig": clnsig, "consequence": consequence, "authenticity_label": label}
+        matched: set[str] = set()
+        supports: list[ClinicalEvidenceItem | EvidenceRule] = []
+        contradicts: list[ClinicalEvidenceItem | EvidenceRule] = []
+        missing: set[str] = set()
+        for rule in RULE_TABLES[self.rules_version]:
+            if rule.field in matched or not rule.matches(values[rule.field]):
+                continue
+            matched.add(rule.field)
+            if rule.missing:
+                missing.add(rule.missing)
+            if rule.code is None:
+                continue
+            if "{af}" in rule.reason:
+                item: ClinicalEvidenceItem | EvidenceRule = rule
+            else:
+                item = ClinicalEvidenceItem(
+                    code=rule.code, strength=rule.strength, reason=rule.reason.format(value=values[rule.field])
                 )
-            )
-        elif authenticity.label == "uncertain":
-            missing.append("orthogonal_confirmation")
+            (supports if rule.direction == "supports" else contradicts).append(item)
 
         if supports and contradicts:
             state = "conflicting_evidence"
@@ -86,12 +70,60 @@ class EvidenceMappingEngine:
             state = "supports_benign"
         else:
             state = "insufficient_evidence"
+        outcome = _Outcome(tuple(supports), tuple(contradicts), tuple(sorted(missing)), state)
+        self._memo[key] = outcome
+        return outcome
+
+    def _items(self, items: tuple[ClinicalEvidenceItem | EvidenceRule, ...], pop_af: float | None) -> list:
+        return [
+            ClinicalEvidenceItem(
+                code=x.code,
+                strength=x.strength,
+                reason=x.reason.format(af=f"{pop_af:.5f}", max_af=self.max_population_af),
+            )
+            if isinstance(x, EvidenceRule)
+            else x
+            for x in items
+        ]
 
+    def map(
+        self,
+        variant: VariantRecordModel | VariantRec,
+        annotations: dict,
+        authenticity: AuthenticityAssessment | str,
+    ) -> EvidenceMap:
+        pop_af = annotations.get("gnomad_af", variant.af)
+        if pop_af is None:
+            af_side = "missing"
+        elif pop_af <= self.max_population_af:
+            af_side = "low"
+        else:
+            af_side = "high"
+        clnsig = (variant.clinvar or annotations.get("clinvar") or "").replace(" ", "_")
+        consequence = (variant.consequence or annotations.get("consequence") or "").lower()
+        label = authenticity if isinstance(authenticity, str) else authenticity.label
+
+        outcome = self._outcome(af_side, clnsig, consequence, label)
         return EvidenceMap(
             variant_id=variant.variant_id,
-            supports=supports,
-            contradicts=contradicts,
-            missing=sorted(set(missing)),
-            state=state,
+            supports=self._items(outcome.supports, pop_af),
+            contradicts=self._items(outcome.contradicts, pop_af),
+            missing=list(outcome.missing),
+            state=outcome.state,
             rules_version=self.rules_version,
         )
+
+    def map_batch(
+        self,
+        variants: Sequence[VariantRecordModel | VariantRec],
+        authenticity: Sequence[AuthenticityAssessment | str],
+        annotations: Sequence[dict] | None = None,
+    ) -> list[EvidenceMap]:
+        """Map many variants; `authenticity` may be assessments or bare labels (e.g. `AuthenticityBatch.labels()`)."""
+        if len(authenticity) != len(variants) or (annotations is not None and len(annotations) != len(variants)):
+            raise InputValidationError("map_batch inputs must have one entry per variant")
+        empty: dict = {}
+        return [
+            self.map(v, annotations[i] if annotations is not None else empty, authenticity[i])
+            for i, v in enumerate(variants)
+        ]
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Literal
+
+# Inputs a rule can look at. `af_side` is "missing", "low" (<= max AF) or "high".
+RuleField = Literal["af_side", "clnsig", "consequence", "authenticity_label"]
+
+
+@dataclass(frozen=True)
+class EvidenceRule:
+    """
+    One row of a rule table.
+
+    Rules for the same field are tried in table order and the first match
+    wins, like an if/elif chain. A matching rule either adds an evidence item
+    (`code`, `strength`, `direction`, `reason`) or records a `missing` key.
+    `reason` may use {value}, {af} and {max_af}.
+    """
+
+    field: RuleField
+    match: Literal["empty", "equals", "contains", "contains_any"]
+    values: tuple[str, ...] = ()
+    code: str | None = None
+    strength: Literal["supporting", "moderate", "strong", "very_strong"] | None = None
+    direction: Literal["supports", "contradicts"] | None = None
+    reason: str = ""
+    missing: str | None = None
+
+    def matches(self, value: str) -> bool:
+        if self.match == "empty":
+            return not value
+        if not value:
+            return False
+        if self.match == "equals":
+            return value in self.values
+        if self.match == "contains":
+            return self.values[0] in value
+        return any(v in value for v in self.values)
+
+
+HIGH_IMPACT_CONSEQUENCES = ("stop_gained", "frameshift", "splice_acceptor", "splice_donor")
+
+RULES_V1: tuple[EvidenceRule, ...] = (
+    EvidenceRule("af_side", "equals", ("missing",), missing="population_frequency"),
+    EvidenceRule(
+        "af_side",
+        "equals",
+        ("low",),
+        code="LOW_FREQ",
+        strength="moderate",
+        direction="supports",
+        reason="Population AF {af} <= {max_af}",
+    ),
+    EvidenceRule(
+        "af_side",
+        "equals",
+        ("high",),
+        code="HIGH_FREQ",
+        strength="strong",
+        direction="contradicts",
+        reason="Population AF {af} > {max_af}",
+    ),
+    EvidenceRule("clnsig", "empty", missing="clinvar_assertion"),
+    EvidenceRule(
+        "clnsig",
+        "contains",
+        ("Pathogenic",),
+        code="CLINVAR_PATH",
+        strength="moderate",
+        direction="supports",
+        reason="ClinVar assertion: {value}",
+    ),
+    EvidenceRule(
+        "clnsig",
+        "contains",
+        ("Benign",),
+        code="CLINVAR_BENIGN",
+        strength="moderate",
+        direction="contradicts",
+        reason="ClinVar assertion: {value}",
+    ),
+    EvidenceRule("consequence", "empty", missing="consequence_annotation"),
+    EvidenceRule(
+        "consequence",
+        "contains_any",
+        HIGH_IMPACT_CONSEQUENCES,
+        code="HIGH_IMPACT_CONSEQUENCE",
+        strength="supporting",
+        direction="supports",
+        reason="Consequence {value} suggests high impact",
+    ),
+    EvidenceRule(
+        "authenticity_label",
+        "equals",
+        ("likely_artifact",),
+        code="LOW_TECH_CONF",
+        strength="supporting",
+        direction="contradicts",
+        reason="Technical authenticity assessment indicates likely artifact",
+    ),
+    EvidenceRule("authenticity_label", "equals", ("uncertain",), missing="orthogonal_confirmation"),
+)
+
+RULE_TABLES: dict[str, tuple[EvidenceRule, ...]] = {"v1": RULES_V1}
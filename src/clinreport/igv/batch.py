@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
 
 from ..vcf.io import VariantRecord
-from .naming import snapshot_name
+from .naming import region_snapshot_name, snapshot_name
+
+# Display commands issued before the first snapshot; part of the snapshot cache key.
+SNAPSHOT_PREFS = ("setSnapshotPrefs", "collapse", "sort position")
 
 
 @dataclass(frozen=True)
@@ -28,28 +31,156 @@ def locus_window(v: VariantRecord, params: IgvBatchParams) -> tuple[int, int]:
     return start, end
 
 
-def write_igv_batch(
-    out_bat: Path,
+@dataclass(frozen=True)
+class SnapshotRegion:
+    chrom: str
+    start: int
+    end: int
+    filename: str
+    variants: tuple[VariantRecord, ...]
+
+    @property
+    def locus(self) -> str:
+        return f"{self.chrom}:{self.start}-{self.end}"
+
+
+@dataclass(frozen=True)
+class IgvShard:
+    index: int
+    batch_file: Path
+    prefs_file: Path
+    snapshot_dir: Path
+    snapshots: tuple[str, ...]
+
+
+def plan_snapshot_regions(
     variants: Iterable[VariantRecord],
     params: IgvBatchParams,
     sample_name: str,
-) -> None:
+    cluster_max_width: int | None = None,
+) -> list[SnapshotRegion]:
+    """
+    Map variants to snapshot regions.
+
+    Without `cluster_max_width` every variant gets its own window, exactly as
+    `locus_window` defines it. With it, variants on the same chromosome whose
+    windows overlap are merged into one region as long as the merged region is
+    at most `cluster_max_width` bp wide; single-variant regions keep the
+    per-variant snapshot name.
+    """
+    windows = [(v, *locus_window(v, params)) for v in variants]
+    if cluster_max_width is not None:
+        chrom_order: dict[str, int] = {}
+        for v, _, _ in windows:
+            chrom_order.setdefault(v.chrom, len(chrom_order))
+        windows.sort(key=lambda w: (chrom_order[w[0].chrom], w[1], w[0].pos))
+
+    groups: list[list[tuple[VariantRecord, int, int]]] = []
+    for w in windows:
+        if cluster_max_width is not None and groups:
+            last = groups[-1]
+            g_start = min(x[1] for x in last)
+            g_end = max(x[2] for x in last)
+            same_chrom = last[0][0].chrom == w[0].chrom
+            if same_chrom and w[1] <= g_end and max(g_end, w[2]) - g_start + 1 <= cluster_max_width:
+                last.append(w)
+                continue
+        groups.append([w])
+
+    regions: list[SnapshotRegion] = []
+    for group in groups:
+        first = group[0][0]
+        start = min(x[1] for x in group)
+        end = max(x[2] for x in group)
+        if len(group) == 1:
+            fn = snapshot_name(sample_name, first.chrom, first.pos, first.ref, first.alt)
+        else:
+            fn = region_snapshot_name(sample_name, first.chrom, start, end)
+        regions.append(
+            SnapshotRegion(
+                chrom=first.chrom,
+                start=start,
+                end=end,
+                filename=fn,
+                variants=tuple(x[0] for x in group),
+            )
+        )
+    return regions
+
+
+def write_igv_regions_batch(out_bat: Path, regions: Iterable[SnapshotRegion], params: IgvBatchParams) -> list[str]:
     params.snapshot_dir.mkdir(parents=True, exist_ok=True)
+    snapshots: list[str] = []
     lines: list[str] = []
     lines.append("new")
     lines.append(f"genome {params.genome}")
     lines.append(f"load {params.bam_or_cram}")
     lines.append(f"snapshotDirectory {params.snapshot_dir.as_posix()}")
-    lines.append("setSnapshotPrefs")
-    lines.append("collapse")
-    lines.append("sort position")
+    lines.extend(SNAPSHOT_PREFS)
 
-    for v in variants:
-        start, end = locus_window(v, params)
-        locus = f"{v.chrom}:{start}-{end}"
-        lines.append(f"goto {locus}")
-        fn = snapshot_name(sample_name, v.chrom, v.pos, v.ref, v.alt)
-        lines.append(f"snapshot {fn}")
+    for region in regions:
+        lines.append(f"goto {region.locus}")
+        lines.append(f"snapshot {region.filename}")
+        snapshots.append(region.filename)
 
     lines.append("exit")
     out_bat.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return snapshots
+
+
+def write_igv_batch(
+    out_bat: Path,
+    variants: Iterable[VariantRecord],
+    params: IgvBatchParams,
+    sample_name: str,
+) -> list[str]:
+    return write_igv_regions_batch(out_bat, plan_snapshot_regions(variants, params, sample_name), params)
+
+
+def shard_regions(regions: Sequence[SnapshotRegion], n_shards: int) -> list[list[SnapshotRegion]]:
+    """Split regions into at most `n_shards` contiguous shards of near-equal size, keeping locus order."""
+    n = max(1, min(n_shards, len(regions)))
+    size, extra = divmod(len(regions), n)
+    shards: list[list[SnapshotRegion]] = []
+    start = 0
+    for i in range(n):
+        end = start + size + (1 if i < extra else 0)
+        shards.append(list(regions[start:end]))
+        start = end
+    return [s for s in shards if s]
+
+
+def write_igv_prefs(out_prefs: Path) -> None:
+    # Parallel IGV instances must not compete for the default batch port.
+    out_prefs.write_text("PORT_ENABLED=false\n", encoding="utf-8")
+
+
+def write_igv_batch_shards(
+    out_dir: Path,
+    regions: Sequence[SnapshotRegion],
+    params: IgvBatchParams,
+    n_shards: int,
+) -> list[IgvShard]:
+    """
+    Write one batch file and one preferences file per shard under `out_dir`.
+
+    Snapshot file names do not depend on the shard layout, so the review bundle
+    is identical whether it was produced by one IGV process or many.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    shards: list[IgvShard] = []
+    for i, chunk in enumerate(shard_regions(regions, n_shards)):
+        bat = out_dir / f"shard_{i:03d}.igv"
+        prefs = out_dir / f"shard_{i:03d}.prefs.properties"
+        snapshots = write_igv_regions_batch(bat, chunk, params)
+        write_igv_prefs(prefs)
+        shards.append(
+            IgvShard(
+                index=i,
+                batch_file=bat,
+                prefs_file=prefs,
+                snapshot_dir=params.snapshot_dir,
+                snapshots=tuple(snapshots),
+            )
+        )
+    return shards
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from .batch import SNAPSHOT_PREFS, IgvBatchParams, SnapshotRegion
+
+CACHE_INDEX_NAME = ".snapshot_cache.json"
+INDEX_SUFFIXES = (".bai", ".crai", ".csi")
+
+
+def _sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _alignment_index(path: Path) -> Path | None:
+    for suffix in INDEX_SUFFIXES:
+        for candidate in (Path(f"{path}{suffix}"), path.with_suffix(suffix)):
+            if candidate.exists():
+                return candidate
+    return None
+
+
+def file_identity(path: Path) -> dict:
+    st = path.stat()
+    return {"path": str(path.resolve()), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def alignment_identity(path: Path) -> dict:
+    """Identity of a BAM/CRAM: size and mtime of the file plus a checksum of its index."""
+    ident = file_identity(path)
+    index = _alignment_index(path)
+    ident["index_sha256"] = _sha256_file(index) if index is not None else None
+    return ident
+
+
+def snapshot_inputs_fingerprint(params: IgvBatchParams, renderer: str = "igv") -> dict:
+    """Everything outside the locus itself that changes how a snapshot is rendered."""
+    bam = Path(params.bam_or_cram)
+    genome = Path(params.genome)
+    return {
+        "renderer": renderer,
+        "alignments": alignment_identity(bam) if bam.exists() else {"path": params.bam_or_cram},
+        "genome": file_identity(genome) if genome.is_file() else params.genome,
+        "window_bp_snv": params.window_bp_snv,
+        "window_bp_indel": params.window_bp_indel,
+        "prefs": list(SNAPSHOT_PREFS),
+    }
+
+
+def snapshot_key(fingerprint: dict, region: SnapshotRegion) -> str:
+    payload = {"inputs": fingerprint, "locus": region.locus, "filename": region.filename}
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SnapshotCache:
+    """
+    Content-addressed record of rendered snapshots, stored next to the PNGs.
+
+    Maps each snapshot file name to the key of the inputs it was rendered from;
+    a snapshot is reusable only if the PNG exists and its recorded key matches.
+    """
+
+    def __init__(self, snapshot_dir: Path):
+        self.snapshot_dir = snapshot_dir
+        self.index_path = snapshot_dir / CACHE_INDEX_NAME
+        self._entries: dict[str, str] = {}
+        if self.index_path.exists():
+            self._entries = json.loads(self.index_path.read_text(encoding="utf-8"))
+
+    def is_fresh(self, filename: str, key: str) -> bool:
+        return self._entries.get(filename) == key and (self.snapshot_dir / filename).exists()
+
+    def record(self, filename: str, key: str) -> None:
+        self._entries[filename] = key
+
+    def forget(self, filename: str) -> None:
+        self._entries.pop(filename, None)
+
+    def save(self) -> None:
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._entries, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.index_path)
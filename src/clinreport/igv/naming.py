@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import os
 import re
+from pathlib import Path
 
 
 def safe_token(s: str) -> str:
@@ -10,3 +12,15 @@ def safe_token(s: str) -> str:
 
 def snapshot_name(sample: str, chrom: str, pos: int, ref: str, alt: str) -> str:
     return f"{safe_token(sample)}_{safe_token(chrom)}_{pos}_{safe_token(ref)}_{safe_token(alt)}.png"
+
+
+def region_snapshot_name(sample: str, chrom: str, start: int, end: int) -> str:
+    return f"{safe_token(sample)}_{safe_token(chrom)}_{start}-{end}.png"
+
+
+def index_snapshots(snapshot_dir: Path) -> dict[str, Path]:
+    """Map every PNG file name in `snapshot_dir` to its path with a single directory scan."""
+    if not snapshot_dir.is_dir():
+        return {}
+    with os.scandir(snapshot_dir) as entries:
+        return {e.name: Path(e.path) for e in entries if e.name.endswith(".png") and e.is_file()}
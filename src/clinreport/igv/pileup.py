@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import re
+import subprocess
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+from ..config import settings
+from ..exceptions import ExternalToolError
+from ..subprocess_utils import iter_output_lines
+from .batch import SnapshotRegion
+
+_CIGAR_RE = re.compile(r"(\d+)([MIDNSHP=X])")
+
+# Skip unmapped (0x4), secondary (0x100) and supplementary (0x800) records.
+EXCLUDE_FLAGS = "0x904"
+
+BASE_COLORS = {
+    "A": (0, 150, 0),
+    "C": (0, 0, 200),
+    "G": (209, 113, 5),
+    "T": (200, 0, 0),
+}
+FORWARD_COLOR = (231, 160, 160)
+REVERSE_COLOR = (160, 160, 231)
+DELETION_COLOR = (0, 0, 0)
+INSERTION_COLOR = (138, 43, 226)
+COVERAGE_COLOR = (150, 150, 150)
+MARKER_COLOR = (255, 215, 0)
+BACKGROUND = (255, 255, 255)
+
+
+@dataclass(frozen=True)
+class PileupParams:
+    bam_or_cram: str
+    snapshot_dir: Path
+    reference_fasta: str | None = None
+    width_px: int = 1000
+    row_height_px: int = 5
+    max_rows: int = 150
+    coverage_height_px: int = 40
+    full_shade_mapq: int = 20
+
+
+@dataclass(frozen=True)
+class AlignedRead:
+    pos: int
+    mapq: int
+    reverse: bool
+    cigar: tuple[tuple[str, int], ...]
+    seq: str
+
+    @property
+    def end(self) -> int:
+        return self.pos + sum(n for op, n in self.cigar if op in "MDN=X") - 1
+
+
+def parse_sam_line(line: str) -> AlignedRead | None:
+    fields = line.split("\t", 10)
+    if len(fields) < 10 or fields[5] == "*":
+        return None
+    cigar = tuple((op, int(n)) for n, op in _CIGAR_RE.findall(fields[5]))
+    return AlignedRead(
+        pos=int(fields[3]),
+        mapq=int(fields[4]),
+        reverse=bool(int(fields[1]) & 0x10),
+        cigar=cigar,
+        seq=fields[9].upper(),
+    )
+
+
+def iter_region_reads(bam_or_cram: str, locus: str, reference_fasta: str | None = None) -> Iterator[AlignedRead]:
+    cmd = [settings.samtools_path, "view", "-F", EXCLUDE_FLAGS]
+    if reference_fasta:
+        cmd += ["-T", reference_fasta]
+    cmd += [bam_or_cram, locus]
+    for line in iter_output_lines(cmd, f"samtools view for {locus}"):
+        read = parse_sam_line(line)
+        if read is not None:
+            yield read
+
+
+def fetch_reference(reference_fasta: str, locus: str) -> str:
+    p = subprocess.run(
+        [settings.samtools_path, "faidx", reference_fasta, locus], capture_output=True, text=True
+    )
+    if p.returncode != 0:
+        raise ExternalToolError(f"samtools faidx failed for {locus}:\n{p.stderr}")
+    return "".join(line.strip() for line in p.stdout.splitlines()[1:]).upper()
+
+
+def pack_rows(reads: Iterable[AlignedRead], max_rows: int) -> list[list[AlignedRead]]:
+    """Greedy first-fit packing of reads into display rows (IGV's expanded layout)."""
+    rows: list[list[AlignedRead]] = []
+    row_ends: list[int] = []
+    for read in sorted(reads, key=lambda r: r.pos):
+        for i, last_end in enumerate(row_ends):
+            if read.pos > last_end + 1:
+                rows[i].append(read)
+                row_ends[i] = read.end
+                break
+        else:
+            if len(rows) < max_rows:
+                rows.append([read])
+                row_ends.append(read.end)
+    return rows
+
+
+def _shade(color: tuple[int, int, int], mapq: int, full_shade_mapq: int) -> tuple[int, int, int]:
+    # Low-MAPQ reads fade toward the background, as in IGV.
+    alpha = 0.25 + 0.75 * min(1.0, mapq / full_shade_mapq) if full_shade_mapq > 0 else 1.0
+    return tuple(int(BACKGROUND[i] + (color[i] - BACKGROUND[i]) * alpha) for i in range(3))
+
+
+def render_reads_png(
+    reads: Sequence[AlignedRead],
+    start: int,
+    end: int,
+    out_png: Path,
+    params: PileupParams,
+    reference: str | None = None,
+    marker_positions: Iterable[int] = (),
+) -> None:
+    span = end - start + 1
+    px = max(1, params.width_px // span)
+    rows = pack_rows(reads, params.max_rows)
+    top = params.coverage_height_px + 4
+    img = Image.new("RGB", (span * px, top + max(1, len(rows)) * params.row_height_px), BACKGROUND)
+    draw = ImageDraw.Draw(img)
+
+    coverage = [0] * span
+    h = params.row_height_px
+    for row_idx, row in enumerate(rows):
+        y0 = top + row_idx * h
+        y1 = y0 + h - 2
+        for read in row:
+            body = _shade(REVERSE_COLOR if read.reverse else FORWARD_COLOR, read.mapq, params.full_shade_mapq)
+            ref_pos, qpos = read.pos, 0
+            for op, n in read.cigar:
+                if op in "M=X":
+                    a, b = max(ref_pos, start), min(ref_pos + n - 1, end)
+                    if a <= b:
+                        draw.rectangle([(a - start) * px, y0, (b - start + 1) * px - 1, y1], fill=body)
+                        for r in range(a, b + 1):
+                            coverage[r - start] += 1
+                            base = read.seq[qpos + r - ref_pos] if qpos + r - ref_pos < len(read.seq) else "N"
+                            mismatch = op == "X" or (
+                                op == "M" and reference is not None and base != reference[r - start]
+                            )
+                            if mismatch and base in BASE_COLORS:
+                                color = _shade(BASE_COLORS[base], read.mapq, params.full_shade_mapq)
+                                x = (r - start) * px
+                                draw.rectangle([x, y0, x + px - 1, y1], fill=color)
+                    ref_pos += n
+                    qpos += n
+                elif op in "DN":
+                    a, b = max(ref_pos, start), min(ref_pos + n - 1, end)
+                    if a <= b and op == "D":
+                        ymid = (y0 + y1) // 2
+                        draw.line([(a - start) * px, ymid, (b - start + 1) * px - 1, ymid], fill=DELETION_COLOR)
+                    ref_pos += n
+                elif op in "IS":
+                    if op == "I" and start <= ref_pos <= end:
+                        x = (ref_pos - start) * px
+                        draw.rectangle([max(0, x - 1), y0, x, y1], fill=INSERTION_COLOR)
+                    qpos += n
+
+    max_cov = max(coverage) if coverage else 0
+    if max_cov:
+        for i, depth in enumerate(coverage):
+            bar = int(params.coverage_height_px * depth / max_cov)
+            if bar:
+                draw.rectangle(
+                    [i * px, params.coverage_height_px - bar, (i + 1) * px - 1, params.coverage_height_px - 1],
+                    fill=COVERAGE_COLOR,
+                )
+
+    for mpos in marker_positions:
+        if start <= mpos <= end:
+            x = (mpos - start) * px
+            draw.rectangle([x, 0, x + px - 1, img.height - 1], outline=MARKER_COLOR)
+
+    out_png.parent.mkdir(parents=True, exist_ok=True)
+    img.save(out_png, format="PNG", optimize=False)
+
+
+def render_region(region: SnapshotRegion, params: PileupParams) -> Path:
+    reads = list(iter_region_reads(params.bam_or_cram, region.locus, params.reference_fasta))
+    reference = fetch_reference(params.reference_fasta, region.locus) if params.reference_fasta else None
+    if reference is not None and len(reference) != region.end - region.start + 1:
+        # Region runs past the contig end; mismatches cannot be placed reliably.
+        reference = None
+    out_png = params.snapshot_dir / region.filename
+    render_reads_png(
+        reads,
+        region.start,
+        region.end,
+        out_png,
+        params,
+        reference=reference,
+        marker_positions=[v.pos for v in region.variants],
+    )
+    return out_png
+
+
+def render_regions(regions: Sequence[SnapshotRegion], params: PileupParams, workers: int = 4) -> list[Path]:
+    """Render pileup snapshots for all regions in a process pool, using the same names as IGV snapshots."""
+    failures: list[str] = []
+    paths: list[Path] = []
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(render_region, r, params) for r in regions]
+        for region, fut in zip(regions, futures, strict=True):
+            try:
+                paths.append(fut.result())
+            except Exception as exc:
+                # One bad region (tool, parse or image error) must not abort the others.
+                failures.append(f"{region.locus}: {type(exc).__name__}: {exc}")
+    if failures:
+        raise ExternalToolError(
+            f"Pileup rendering failed for {len(failures)} of {len(regions)} region(s):\n" + "\n".join(failures)
+        )
+    return paths
@@ -1,15 +1,71 @@
 from __future__ import annotations
 
+import logging
 import subprocess
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from ..config import settings
 from ..exceptions import ExternalToolError
+from .batch import IgvShard
 
+log = logging.getLogger(__name__)
 
-def run_igv_batch(batch_file: Path, igv_sh_path: str | None = None) -> None:
+
+def run_igv_batch(
+    batch_file: Path,
+    igv_sh_path: str | None = None,
+    prefs_file: Path | None = None,
+    timeout_s: float | None = None,
+) -> None:
     igv = igv_sh_path or settings.igv_sh_path
     cmd = [igv, "--batch", batch_file.as_posix()]
-    p = subprocess.run(cmd, capture_output=True, text=True)
+    if prefs_file is not None:
+        cmd += ["--preferences", prefs_file.as_posix()]
+    try:
+        p = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout_s)
+    except subprocess.TimeoutExpired:
+        raise ExternalToolError(f"IGV batch timed out after {timeout_s}s: {batch_file}") from None
     if p.returncode != 0:
         raise ExternalToolError(f"IGV batch failed:\nSTDOUT:\n{p.stdout}\nSTDERR:\n{p.stderr}")
+
+
+def _run_shard(shard: IgvShard, retries: int, igv_sh_path: str | None, timeout_s: float | None) -> None:
+    attempt = 0
+    while True:
+        try:
+            run_igv_batch(shard.batch_file, igv_sh_path, prefs_file=shard.prefs_file, timeout_s=timeout_s)
+            missing = [fn for fn in shard.snapshots if not (shard.snapshot_dir / fn).exists()]
+            if missing:
+                raise ExternalToolError(
+                    f"IGV shard {shard.index} finished without {len(missing)} snapshot(s), e.g. {missing[0]}"
+                )
+            return
+        except ExternalToolError as exc:
+            if attempt >= retries:
+                raise
+            attempt += 1
+            log.warning("IGV shard %d failed (attempt %d/%d): %s", shard.index, attempt, retries + 1, exc)
+
+
+def run_igv_shards(
+    shards: Sequence[IgvShard],
+    workers: int = 4,
+    retries: int = 1,
+    igv_sh_path: str | None = None,
+    timeout_s: float | None = None,
+) -> None:
+    """Run shard batch files under a bounded pool of IGV processes, retrying failed shards."""
+    failures: list[str] = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(_run_shard, s, retries, igv_sh_path, timeout_s) for s in shards]
+        for shard, fut in zip(shards, futures, strict=True):
+            try:
+                fut.result()
+            except ExternalToolError as exc:
+                failures.append(f"shard {shard.index} ({shard.batch_file.name}): {exc}")
+    if failures:
+        raise ExternalToolError(
+            f"IGV failed for {len(failures)} of {len(shards)} shard(s):\n" + "\n".join(failures)
+        )
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import logging
+import queue
+import socket
+import subprocess
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from ..config import settings
+from ..exceptions import ExternalToolError
+
+log = logging.getLogger(__name__)
+
+DEFAULT_IGV_PORT = 60151
+
+
+class _Connection:
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.reader = sock.makefile("r", encoding="utf-8", newline="\n")
+
+    def send(self, command: str) -> str:
+        self.sock.sendall((command + "\n").encode("utf-8"))
+        response = self.reader.readline()
+        if not response:
+            raise ConnectionError("IGV closed the batch connection")
+        return response.strip()
+
+    def close(self) -> None:
+        try:
+            self.reader.close()
+        finally:
+            self.sock.close()
+
+
+def _healthy(conn: _Connection) -> bool:
+    try:
+        return conn.send("echo") == "echo"
+    except OSError:
+        return False
+
+
+class IgvSession:
+    """
+    Long-lived headless IGV driven over its batch port.
+
+    If nothing answers on `port`, IGV is launched in its own session so it
+    outlives the calling process and later `clinreport igv` runs can reuse the
+    already-warm JVM. IGV serves one batch connection at a time, so the pool
+    mainly keeps connections open across cases; each checkout is health-checked
+    over the pooled connection itself, and a connection that errors is
+    discarded and replaced (relaunching IGV if needed) before retrying.
+    """
+
+    def __init__(
+        self,
+        port: int = DEFAULT_IGV_PORT,
+        host: str = "127.0.0.1",
+        igv_sh_path: str | None = None,
+        pool_size: int = 1,
+        launch: bool = True,
+        startup_timeout_s: float = 120.0,
+        command_timeout_s: float = 600.0,
+    ):
+        self.port = port
+        self.host = host
+        self.igv_sh_path = igv_sh_path or settings.igv_sh_path
+        self.launch = launch
+        self.startup_timeout_s = startup_timeout_s
+        self.command_timeout_s = command_timeout_s
+        self._pool: queue.LifoQueue[_Connection | None] = queue.LifoQueue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._pool.put(None)
+        self._lock = threading.Lock()
+        self._process: subprocess.Popen | None = None
+        self._genome: str | None = None
+
+    def _connect(self, timeout_s: float) -> _Connection:
+        return _Connection(socket.create_connection((self.host, self.port), timeout=timeout_s))
+
+    def _open(self, timeout_s: float = 2.0) -> _Connection | None:
+        """Connect and health-check with `echo`; None if nothing healthy answers."""
+        try:
+            conn = self._connect(timeout_s)
+        except OSError:
+            return None
+        if _healthy(conn):
+            conn.sock.settimeout(self.command_timeout_s)
+            return conn
+        conn.close()
+        return None
+
+    def _drain_pool(self) -> None:
+        slots = []
+        while True:
+            try:
+                slots.append(self._pool.get_nowait())
+            except queue.Empty:
+                break
+        for conn in slots:
+            if conn is not None:
+                conn.close()
+            self._pool.put(None)
+
+    def _start(self) -> _Connection:
+        """Connect to IGV, launching (or relaunching) it if nothing healthy answers."""
+        with self._lock:
+            conn = self._open()
+            if conn is not None:
+                return conn
+            if not self.launch:
+                raise ExternalToolError(f"No IGV batch listener on {self.host}:{self.port}")
+            self._drain_pool()
+            self._genome = None
+            if self._process is not None and self._process.poll() is None:
+                self._process.kill()
+                self._process.wait()
+            log.info("Launching IGV on batch port %d", self.port)
+            self._process = subprocess.Popen(
+                [self.igv_sh_path, "--port", str(self.port)],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+            deadline = time.monotonic() + self.startup_timeout_s
+            while time.monotonic() < deadline:
+                if self._process.poll() is not None:
+                    raise ExternalToolError(f"IGV exited with code {self._process.returncode} during startup")
+                conn = self._open()
+                if conn is not None:
+                    return conn
+                time.sleep(0.5)
+            raise ExternalToolError(f"IGV did not open batch port {self.port} within {self.startup_timeout_s}s")
+
+    def _checkout(self) -> _Connection:
+        """
+        Take a pooled connection and health-check it in place.
+
+        IGV answers only one client at a time, so the check never opens a second
+        socket while a connection is held; a stale connection is replaced.
+        """
+        conn = self._pool.get()
+        try:
+            if conn is not None and _healthy(conn):
+                return conn
+            if conn is not None:
+                conn.close()
+            return self._start()
+        except BaseException:
+            self._pool.put(None)
+            raise
+
+    def _run_once(self, commands: list[str]) -> None:
+        conn = self._checkout()
+        try:
+            for command in commands:
+                if command.startswith("genome ") and command == self._genome:
+                    continue
+                response = conn.send(command)
+                if response.lower().startswith("error"):
+                    raise ExternalToolError(f"IGV rejected {command!r}: {response}")
+                if command.startswith("genome "):
+                    self._genome = command
+        except BaseException:
+            conn.close()
+            self._pool.put(None)
+            raise
+        self._pool.put(conn)
+
+    def run_commands(self, commands: Iterable[str], retries: int = 1) -> None:
+        """Send one case's batch commands, restarting an unhealthy IGV and retrying on failure."""
+        cmds = [c for c in commands if c and c != "exit"]
+        attempt = 0
+        while True:
+            try:
+                self._run_once(cmds)
+                return
+            except (OSError, ExternalToolError) as exc:
+                if attempt >= retries:
+                    raise ExternalToolError(f"IGV session failed: {exc}") from exc
+                attempt += 1
+                self._genome = None
+                log.warning("IGV session command failed (attempt %d/%d): %s", attempt, retries + 1, exc)
+
+    def run_batch_file(self, batch_file: Path, retries: int = 1) -> None:
+        # `exit` would shut the shared IGV down, so it is dropped from the stream.
+        lines = [line.strip() for line in batch_file.read_text(encoding="utf-8").splitlines()]
+        self.run_commands(lines, retries=retries)
+
+    def close(self, shutdown: bool = False) -> None:
+        self._drain_pool()
+        if shutdown and self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            self._process.wait()
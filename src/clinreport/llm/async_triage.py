@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI
+
+from ..config import settings
+from .cache import LlmResponseCache, request_cache_key
+from .image_prep import PreparedImage
+from .openai_triage import build_triage_request, extract_output_text, parse_triage_text
+from .schema import IgvTriageResult
+
+log = logging.getLogger(__name__)
+
+# Rough token cost of one snapshot image, used only for client-side rate limiting.
+IMAGE_TOKEN_ESTIMATE = 1000
+
+
+@dataclass(frozen=True)
+class TriageItem:
+    key: str
+    snapshot_path: Path
+    metadata: dict[str, Any]
+    fallback: dict[str, Any] = field(default_factory=dict)
+    image: PreparedImage | None = None
+
+
+class RateLimiter:
+    """Token buckets for requests per minute and estimated tokens per minute."""
+
+    def __init__(self, requests_per_minute: float | None = None, tokens_per_minute: float | None = None):
+        self._buckets: list[list[float]] = []
+        for per_minute in (requests_per_minute, tokens_per_minute):
+            # [capacity, refill per second, level, last refill]
+            self._buckets.append([per_minute, per_minute / 60.0, per_minute, time.monotonic()] if per_minute else [])
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int = 0) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                wait = 0.0
+                for bucket, amount in zip(self._buckets, (1, tokens), strict=True):
+                    if not bucket:
+                        continue
+                    capacity, rate, level, last = bucket
+                    level = min(capacity, level + (now - last) * rate)
+                    bucket[2], bucket[3] = level, now
+                    need = min(amount, capacity)
+                    if level < need:
+                        wait = max(wait, (need - level) / rate)
+                if wait <= 0:
+                    for bucket, amount in zip(self._buckets, (1, tokens), strict=True):
+                        if bucket:
+                            bucket[2] -= min(amount, bucket[0])
+                    return
+                await asyncio.sleep(wait)
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, APIStatusError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return isinstance(exc, APIConnectionError)
+
+
+def estimate_request_tokens(request: dict[str, Any]) -> int:
+    tokens = len(request.get("instructions", "")) // 4
+    for message in request.get("input", []):
+        for part in message.get("content", []):
+            if part.get("type") == "input_text":
+                tokens += len(part["text"]) // 4
+            elif part.get("type") == "input_image":
+                tokens += IMAGE_TOKEN_ESTIMATE
+    return tokens
+
+
+async def triage_snapshot_async(
+    client: AsyncOpenAI,
+    snapshot_path: Path,
+    metadata: dict[str, Any],
+    limiter: RateLimiter,
+    max_retries: int = 5,
+    base_delay_s: float = 1.0,
+    cache: LlmResponseCache | None = None,
+    image: PreparedImage | None = None,
+) -> IgvTriageResult:
+    request = build_triage_request(snapshot_path, metadata, image)
+    key = request_cache_key(request) if cache is not None else None
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        return parse_triage_text(cached)
+
+    tokens = estimate_request_tokens(request)
+    attempt = 0
+    while True:
+        await limiter.acquire(tokens)
+        try:
+            resp = await client.responses.create(**request, timeout=settings.openai_timeout_s)
+            text = extract_output_text(resp)
+            result = parse_triage_text(text)
+            if cache is not None:
+                cache.put(key, request["model"], text)
+            return result
+        except Exception as exc:
+            if attempt >= max_retries or not _is_retryable(exc):
+                raise
+            delay = base_delay_s * (2**attempt) * (1 + random.random() * 0.25)
+            attempt += 1
+            log.warning("Triage request for %s failed (%s); retry %d in %.1fs", snapshot_path.name, exc, attempt, delay)
+            await asyncio.sleep(delay)
+
+
+def load_checkpoint(path: Path) -> dict[str, dict]:
+    """Completed results from an earlier (possibly interrupted) run; failed items are retried."""
+    done: dict[str, dict] = {}
+    if not path.exists():
+        return done
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            # A run killed mid-write can leave a truncated final line.
+            continue
+        if "triage_error" in record["result"]:
+            done.pop(record["key"], None)
+        else:
+            done[record["key"]] = record["result"]
+    return done
+
+
+async def triage_many(
+    items: Sequence[TriageItem],
+    checkpoint_path: Path,
+    concurrency: int = 8,
+    requests_per_minute: float | None = None,
+    tokens_per_minute: float | None = None,
+    max_retries: int = 5,
+    client: AsyncOpenAI | None = None,
+    base_delay_s: float = 1.0,
+    cache: LlmResponseCache | None = None,
+) -> list[dict]:
+    """
+    Triage snapshots concurrently with one shared client.
+
+    Every finished item is appended to `checkpoint_path` as it completes, so an
+    interrupted run resumes with only the missing or failed items. A failing
+    item yields its `fallback` dict with a `triage_error` and does not affect
+    the others.
+    """
+    done = load_checkpoint(checkpoint_path)
+    pending = [item for item in items if item.key not in done]
+    if not pending:
+        return [done[item.key] for item in items]
+    own_client = client is None
+    client = client or AsyncOpenAI(max_retries=0, timeout=settings.openai_timeout_s)
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    sem = asyncio.Semaphore(max(1, concurrency))
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with checkpoint_path.open("a", encoding="utf-8") as fh:
+
+        async def run_one(item: TriageItem) -> None:
+            async with sem:
+                try:
+                    tri = await triage_snapshot_async(
+                        client,
+                        item.snapshot_path,
+                        item.metadata,
+                        limiter,
+                        max_retries=max_retries,
+                        base_delay_s=base_delay_s,
+                        cache=cache,
+                        image=item.image,
+                    )
+                    result = tri.model_dump()
+                except Exception as exc:
+                    log.warning("Triage failed for %s: %s", item.key, exc)
+                    result = {**item.fallback, "triage_error": f"{type(exc).__name__}: {exc}"}
+                fh.write(json.dumps({"key": item.key, "result": result}) + "\n")
+                fh.flush()
+                done[item.key] = result
+
+        try:
+            await asyncio.gather(*(run_one(item) for item in pending))
+        finally:
+            if own_client:
+                await client.close()
+
+    return [done[item.key] for item in items]
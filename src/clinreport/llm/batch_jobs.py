@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from pydantic import ValidationError
+
+from ..core.models import ReviewPacket
+from ..exceptions import InputValidationError
+from .cache import LlmResponseCache, request_cache_key
+from .packet_generator import packet_from_data
+from .schema import IgvTriageResult
+
+BATCH_ENDPOINT = "/v1/responses"
+BATCH_KINDS = ("triage", "review_packet")
+
+
+@dataclass(frozen=True)
+class BatchEntry:
+    """One request line plus the context needed to merge its result back."""
+
+    custom_id: str
+    request: dict[str, Any]
+    context: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class BatchOutcome:
+    custom_id: str
+    context: dict[str, Any]
+    model: str
+    cache_key: str
+    text: str | None = None
+    error: str | None = None
+
+    def remember(self, cache: LlmResponseCache | None) -> None:
+        """Store a validated response under the key the interactive path uses."""
+        if cache is not None and self.text is not None:
+            cache.put(self.cache_key, self.model, self.text)
+
+
+def batch_custom_id(variant_id: str, ghash: str) -> str:
+    return f"{variant_id}|{ghash[:16]}"
+
+
+def batch_index_path(requests_path: Path) -> Path:
+    return requests_path.with_suffix(".index.json")
+
+
+def write_batch_requests(
+    requests_path: Path, kind: str, entries: Sequence[BatchEntry], meta: dict[str, Any] | None = None
+) -> Path:
+    """
+    Write a provider batch input file (one `POST /v1/responses` per line) and its index.
+
+    The index sits next to the JSONL and maps each `custom_id` to its merge
+    context and cache key; `ingest_batch` needs both files plus the provider's
+    output file.
+    """
+    if kind not in BATCH_KINDS:
+        raise InputValidationError(f"Unknown batch kind {kind!r}")
+    seen: set[str] = set()
+    requests_path.parent.mkdir(parents=True, exist_ok=True)
+    with requests_path.open("w", encoding="utf-8") as fh:
+        for entry in entries:
+            if entry.custom_id in seen:
+                raise InputValidationError(f"Duplicate batch custom_id {entry.custom_id!r}")
+            seen.add(entry.custom_id)
+            line = {"custom_id": entry.custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": entry.request}
+            fh.write(json.dumps(line, separators=(",", ":")) + "\n")
+
+    index = {
+        "kind": kind,
+        "endpoint": BATCH_ENDPOINT,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "requests_file": requests_path.name,
+        "meta": meta or {},
+        "items": {
+            e.custom_id: {"context": e.context, "cache_key": request_cache_key(e.request), "model": e.request["model"]}
+            for e in entries
+        },
+    }
+    index_path = batch_index_path(requests_path)
+    index_path.write_text(json.dumps(index, indent=2), encoding="utf-8")
+    return index_path
+
+
+def load_batch_index(requests_path: Path) -> dict[str, Any]:
+    index_path = batch_index_path(requests_path)
+    if not index_path.exists():
+        raise InputValidationError(f"Missing batch index {index_path}; it is written alongside the request file.")
+    index = json.loads(index_path.read_text(encoding="utf-8"))
+    if index.get("kind") not in BATCH_KINDS:
+        raise InputValidationError(f"{index_path} has unknown batch kind {index.get('kind')!r}")
+    return index
+
+
+def response_body_text(body: dict[str, Any]) -> str:
+    """`output_text` of a Responses API object in its JSON (batch output) form."""
+    text = ""
+    for item in body.get("output") or []:
+        if item.get("type") == "message":
+            for c in item.get("content") or []:
+                if c.get("type") == "output_text":
+                    text += c.get("text", "")
+    return text
+
+
+def iter_batch_output(results_path: Path) -> Iterator[tuple[str, str | None, str | None]]:
+    """Yield `(custom_id, text, error)` for each line of a provider batch output or error file."""
+    with results_path.open("r", encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise InputValidationError(f"{results_path}:{line_no}: invalid JSON ({exc})") from exc
+            custom_id = record.get("custom_id")
+            if not custom_id:
+                raise InputValidationError(f"{results_path}:{line_no}: missing custom_id")
+            response = record.get("response") or {}
+            body = response.get("body") or {}
+            if record.get("error"):
+                err = record["error"]
+                yield custom_id, None, f"{err.get('code', 'error')}: {err.get('message', '')}"
+            elif response.get("status_code") != 200:
+                message = (body.get("error") or {}).get("message", "")
+                yield custom_id, None, f"HTTP {response.get('status_code')}: {message}"
+            else:
+                yield custom_id, response_body_text(body), None
+
+
+def ingest_batch(requests_path: Path, results_paths: Sequence[Path]) -> tuple[dict[str, Any], list[BatchOutcome]]:
+    """
+    Pair provider results with the request index, in request order.
+
+    Requests with no result line come back with error `batch_result_missing`.
+    """
+    index = load_batch_index(requests_path)
+    items: dict[str, dict[str, Any]] = index["items"]
+    received: dict[str, tuple[str | None, str | None]] = {}
+    for path in results_paths:
+        for custom_id, text, error in iter_batch_output(path):
+            if custom_id not in items:
+                raise InputValidationError(f"{path}: result {custom_id!r} does not belong to {requests_path.name}")
+            # A success in one file (output) wins over an error in another (errors).
+            if custom_id not in received or received[custom_id][0] is None:
+                received[custom_id] = (text, error)
+
+    outcomes: list[BatchOutcome] = []
+    for custom_id, item in items.items():
+        text, error = received.get(custom_id, (None, "batch_result_missing"))
+        outcomes.append(
+            BatchOutcome(
+                custom_id=custom_id,
+                context=item["context"],
+                model=item["model"],
+                cache_key=item["cache_key"],
+                text=text,
+                error=error,
+            )
+        )
+    return index, outcomes
+
+
+def triage_result(outcome: BatchOutcome, cache: LlmResponseCache | None = None) -> dict[str, Any]:
+    """Validated triage dict, or the manifest item with a `triage_error` (as in the interactive path)."""
+    fallback = outcome.context.get("fallback", {})
+    if outcome.error is not None:
+        return {**fallback, "triage_error": outcome.error}
+    try:
+        result = IgvTriageResult(**json.loads(outcome.text or ""))
+    except (json.JSONDecodeError, TypeError, ValidationError) as exc:
+        return {**fallback, "triage_error": f"{type(exc).__name__}: {exc}"}
+    outcome.remember(cache)
+    return result.model_dump()
+
+
+def review_packet_result(outcome: BatchOutcome, cache: LlmResponseCache | None = None) -> ReviewPacket:
+    """Validated ReviewPacket for a packet batch outcome; raises InputValidationError otherwise."""
+    ctx = outcome.context
+    if outcome.error is not None:
+        raise InputValidationError(f"{outcome.custom_id}: {outcome.error}")
+    try:
+        data = json.loads(outcome.text or "")
+    except json.JSONDecodeError as exc:
+        raise InputValidationError(f"{outcome.custom_id}: response is not JSON ({exc})") from exc
+    if not isinstance(data, dict):
+        raise InputValidationError(f"{outcome.custom_id}: response is not a JSON object")
+    try:
+        packet = packet_from_data(ctx["variant"]["variant_id"], data, ctx["grounding_hash"], outcome.model)
+    except ValidationError as exc:
+        raise InputValidationError(f"{outcome.custom_id}: {exc}") from exc
+    outcome.remember(cache)
+    return packet
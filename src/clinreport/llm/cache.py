@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from ..config import settings
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def request_cache_key(request: dict[str, Any]) -> str:
+    """
+    Key a `responses.create` request by model, instructions, prompt hash and image hash.
+
+    Text and image parts are hashed separately so the key stays small and an
+    image re-encode (different bytes) is a different entry.
+    """
+    prompt_parts: list[str] = []
+    image_parts: list[str] = []
+    for message in request.get("input", []):
+        for part in message.get("content", []):
+            if part.get("type") == "input_text":
+                prompt_parts.append(_sha256(part["text"]))
+            elif part.get("type") == "input_image":
+                image_parts.append(_sha256(part["image_url"]))
+    canonical = {
+        "model": request.get("model"),
+        "instructions_sha256": _sha256(request.get("instructions", "")),
+        "prompt_sha256": prompt_parts,
+        "image_sha256": image_parts,
+    }
+    return _sha256(json.dumps(canonical, sort_keys=True, separators=(",", ":")))
+
+
+class LlmResponseCache:
+    """
+    Content-addressed LLM response cache in a single SQLite file.
+
+    Entries are evicted least-recently-used first once the stored response
+    text exceeds `max_bytes`. Safe to share between threads.
+    """
+
+    def __init__(self, path: Path, max_bytes: int | None = None):
+        self.path = path
+        self.max_bytes = max_bytes if max_bytes is not None else settings.llm_cache_max_mb * 1024 * 1024
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT, response TEXT NOT NULL,"
+            " size INTEGER NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key: str, model: str | None, response: str) -> None:
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def open_llm_cache(path: Path | str | None = None) -> LlmResponseCache | None:
+    """Open the cache at `path` (or CLINREPORT_LLM_CACHE_PATH); None when caching is disabled."""
+    target = path or settings.llm_cache_path
+    return LlmResponseCache(Path(target)) if target else None
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import base64
+import io
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image, ImageChops
+
+from ..exceptions import InputValidationError
+
+IMAGE_FORMATS = {"png": "image/png", "webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+@dataclass(frozen=True)
+class ImagePrepParams:
+    max_width: int = 1024
+    max_height: int = 1024
+    crop_top_px: int = 0
+    image_format: str = "png"
+    png_colors: int = 64
+    quality: int = 80
+
+    def __post_init__(self) -> None:
+        if self.image_format not in IMAGE_FORMATS:
+            raise InputValidationError(
+                f"Unsupported image format {self.image_format!r}; expected one of {', '.join(IMAGE_FORMATS)}."
+            )
+        if self.max_width < 1 or self.max_height < 1:
+            raise InputValidationError(f"Image size limit must be positive, got {self.max_width}x{self.max_height}.")
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    data: bytes
+    mime: str
+    original_bytes: int
+    prepared_bytes: int
+
+    def data_url(self) -> str:
+        return f"data:{self.mime};base64,{base64.b64encode(self.data).decode('ascii')}"
+
+
+def prepare_snapshot(path: Path, params: ImagePrepParams) -> PreparedImage:
+    """
+    Shrink an IGV snapshot before upload.
+
+    Drops `crop_top_px` rows of header (ruler/ideogram), trims the uniform
+    background around the alignment track, downsamples to fit within
+    `max_width` x `max_height` and re-encodes (palette PNG, WebP or JPEG).
+    """
+    original = path.read_bytes()
+    with Image.open(io.BytesIO(original)) as src:
+        img = src.convert("RGB")
+
+    if 0 < params.crop_top_px < img.height:
+        img = img.crop((0, params.crop_top_px, img.width, img.height))
+    background = Image.new("RGB", img.size, img.getpixel((img.width - 1, img.height - 1)))
+    bbox = ImageChops.difference(img, background).getbbox()
+    if bbox:
+        img = img.crop(bbox)
+    img.thumbnail((params.max_width, params.max_height), Image.Resampling.LANCZOS)
+
+    out = io.BytesIO()
+    if params.image_format == "png":
+        img.quantize(colors=params.png_colors).save(out, format="PNG", optimize=True)
+    elif params.image_format == "webp":
+        img.save(out, format="WEBP", quality=params.quality, method=6)
+    else:
+        img.save(out, format="JPEG", quality=params.quality, optimize=True)
+    data = out.getvalue()
+    return PreparedImage(
+        data=data,
+        mime=IMAGE_FORMATS[params.image_format],
+        original_bytes=len(original),
+        prepared_bytes=len(data),
+    )
+
+
+def _prepare_or_none(path: Path, params: ImagePrepParams) -> PreparedImage | None:
+    try:
+        return prepare_snapshot(path, params)
+    except (OSError, ValueError):
+        # Unreadable images are uploaded unchanged and fail (or not) per item downstream.
+        return None
+
+
+def prepare_snapshots(
+    paths: Sequence[Path], params: ImagePrepParams, workers: int = 4
+) -> list[PreparedImage | None]:
+    if not paths:
+        return []
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(_prepare_or_none, paths, [params] * len(paths), chunksize=8))
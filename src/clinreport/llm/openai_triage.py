@@ -1,31 +1,46 @@
 from __future__ import annotations
 
 import base64
+import functools
 import json
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
 from openai import OpenAI
 
 from ..config import settings
+from .cache import LlmResponseCache, request_cache_key
+from .image_prep import PreparedImage
 from .schema import IgvTriageResult
 
+TRIAGE_INSTRUCTIONS = (
+    "You are assisting with variant review triage. "
+    "You MUST NOT provide a medical diagnosis. "
+    "You may describe visual signals in IGV that could suggest support or artifact, "
+    "but always require human review. Output must be valid JSON matching the schema."
+)
+
+
+@functools.lru_cache(maxsize=4)
+def shared_client(factory: Callable[[], OpenAI] = OpenAI) -> OpenAI:
+    """
+    One client per factory for the life of the process, so repeated calls (and
+    `clinreport serve` jobs) reuse its connection pool. The API key is read
+    when the client is first built.
+    """
+    return factory()
+
 
 def _b64_png(path: Path) -> str:
     data = path.read_bytes()
     return base64.b64encode(data).decode("ascii")
 
 
-def triage_snapshot(snapshot_path: Path, metadata: dict[str, Any]) -> IgvTriageResult:
-    client = OpenAI()
-
-    system_instructions = (
-        "You are assisting with variant review triage. "
-        "You MUST NOT provide a medical diagnosis. "
-        "You may describe visual signals in IGV that could suggest support or artifact, "
-        "but always require human review. Output must be valid JSON matching the schema."
-    )
-
+def build_triage_request(
+    snapshot_path: Path, metadata: dict[str, Any], image: PreparedImage | None = None
+) -> dict[str, Any]:
+    """Keyword arguments for `responses.create` shared by the sync, async and batch triage paths."""
     prompt = {
         "task": "IGV triage (human review required)",
         "metadata": metadata,
@@ -41,28 +56,54 @@ def triage_snapshot(snapshot_path: Path, metadata: dict[str, Any]) -> IgvTriageR
         },
     }
 
-    b64 = _b64_png(snapshot_path)
-    resp = client.responses.create(
-        model=settings.openai_model,
-        instructions=system_instructions,
-        input=[
+    image_url = image.data_url() if image is not None else f"data:image/png;base64,{_b64_png(snapshot_path)}"
+    return {
+        "model": settings.openai_model,
+        "instructions": TRIAGE_INSTRUCTIONS,
+        "input": [
             {
                 "role": "user",
                 "content": [
                     {"type": "input_text", "text": json.dumps(prompt)},
-                    {"type": "input_image", "image_url": f"data:image/png;base64,{b64}"},
+                    {"type": "input_image", "image_url": image_url},
                 ],
             }
         ],
-        timeout=settings.openai_timeout_s,
-    )
+    }
 
+
+def extract_output_text(resp: Any) -> str:
     text = ""
     for item in resp.output:
         if item.type == "message":
             for c in item.content:
                 if c.type == "output_text":
                     text += c.text
+    return text
+
 
+def parse_triage_text(text: str) -> IgvTriageResult:
     data = json.loads(text)
     return IgvTriageResult(**data)
+
+
+def triage_snapshot(
+    snapshot_path: Path,
+    metadata: dict[str, Any],
+    client: OpenAI | None = None,
+    cache: LlmResponseCache | None = None,
+    image: PreparedImage | None = None,
+) -> IgvTriageResult:
+    request = build_triage_request(snapshot_path, metadata, image)
+    key = request_cache_key(request) if cache is not None else None
+    text = cache.get(key) if cache is not None else None
+    if text is not None:
+        return parse_triage_text(text)
+
+    client = client or shared_client(OpenAI)
+    resp = client.responses.create(**request, timeout=settings.openai_timeout_s)
+    text = extract_output_text(resp)
+    result = parse_triage_text(text)
+    if cache is not None:
+        cache.put(key, request["model"], text)
+    return result
@@ -3,13 +3,88 @@ from __future__ import annotations
 import json
 
 from openai import OpenAI
+from pydantic import ValidationError
 
 from ..config import settings
 from ..core.models import AuthenticityAssessment, EvidenceMap, ReviewPacket, VariantRecordModel
 from ..exceptions import InputValidationError
+from .cache import LlmResponseCache, request_cache_key
 from .grounding import grounding_hash
+from .openai_triage import extract_output_text, shared_client
 from .validators import validate_packet
 
+PACKET_INSTRUCTIONS = (
+    "You summarize structured evidence for human variant review. "
+    "Never provide final sign-out decisions. "
+    "Output strict JSON with fields: summary, technical_summary, evidence_summary, "
+    "conflicts, recommended_actions, draft_rationale."
+)
+
+
+def packet_payload(
+    variant: VariantRecordModel, authenticity: AuthenticityAssessment, evidence_map: EvidenceMap
+) -> dict:
+    return {
+        "variant": variant.model_dump(),
+        "authenticity": authenticity.model_dump(),
+        "evidence_map": evidence_map.model_dump(),
+    }
+
+
+def build_packet_request(payload: dict) -> dict:
+    """Keyword arguments for `responses.create`, shared by the interactive and batch paths."""
+    prompt = {
+        "task": "Create reviewer packet",
+        "rules": [
+            "Use only provided evidence",
+            "Do not infer unstated facts",
+            "Mark uncertainty clearly",
+            "Human review is required",
+        ],
+        "payload": payload,
+    }
+    return {
+        "model": settings.openai_model,
+        "instructions": PACKET_INSTRUCTIONS,
+        "input": [{"role": "user", "content": [{"type": "input_text", "text": json.dumps(prompt)}]}],
+    }
+
+
+def packet_from_data(
+    variant_id: str, data: dict, ghash: str, llm_model: str, cache_hit: bool = False
+) -> ReviewPacket:
+    packet = ReviewPacket(
+        variant_id=variant_id,
+        summary=data.get("summary", ""),
+        technical_summary=data.get("technical_summary", ""),
+        evidence_summary=data.get("evidence_summary", ""),
+        conflicts=list(data.get("conflicts", [])),
+        recommended_actions=list(data.get("recommended_actions", [])),
+        draft_rationale=data.get("draft_rationale", ""),
+        llm_model=llm_model,
+        grounding_hash=ghash,
+        llm_cache_hit=cache_hit,
+    )
+    try:
+        validate_packet(packet)
+    except ValueError as exc:
+        raise InputValidationError(str(exc))
+    return packet
+
+
+def _packet_from_text(variant_id: str, text: str, ghash: str, cache_hit: bool = False) -> ReviewPacket:
+    """Parse and validate an LLM reply; raises InputValidationError if it is unusable."""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as exc:
+        raise InputValidationError(f"{variant_id}: packet response is not JSON ({exc})") from exc
+    if not isinstance(data, dict):
+        raise InputValidationError(f"{variant_id}: packet response is not a JSON object")
+    try:
+        return packet_from_data(variant_id, data, ghash, settings.openai_model, cache_hit=cache_hit)
+    except ValidationError as exc:
+        raise InputValidationError(f"{variant_id}: {exc}") from exc
+
 
 class ReviewPacketGenerator:
     def generate(
@@ -18,44 +93,27 @@ class ReviewPacketGenerator:
         authenticity: AuthenticityAssessment,
         evidence_map: EvidenceMap,
         use_llm: bool = False,
+        cache: LlmResponseCache | None = None,
     ) -> ReviewPacket:
-        payload = {
-            "variant": variant.model_dump(),
-            "authenticity": authenticity.model_dump(),
-            "evidence_map": evidence_map.model_dump(),
-        }
+        payload = packet_payload(variant, authenticity, evidence_map)
         ghash = grounding_hash(payload)
 
         if use_llm:
-            client = OpenAI()
-            prompt = {
-                "task": "Create reviewer packet",
-                "rules": [
-                    "Use only provided evidence",
-                    "Do not infer unstated facts",
-                    "Mark uncertainty clearly",
-                    "Human review is required",
-                ],
-                "payload": payload,
-            }
-            resp = client.responses.create(
-                model=settings.openai_model,
-                instructions=(
-                    "You summarize structured evidence for human variant review. "
-                    "Never provide final sign-out decisions. "
-                    "Output strict JSON with fields: summary, technical_summary, evidence_summary, "
-                    "conflicts, recommended_actions, draft_rationale."
-                ),
-                input=[{"role": "user", "content": [{"type": "input_text", "text": json.dumps(prompt)}]}],
-                timeout=settings.openai_timeout_s,
-            )
-            text = ""
-            for item in resp.output:
-                if item.type == "message":
-                    for c in item.content:
-                        if c.type == "output_text":
-                            text += c.text
-            data = json.loads(text)
+            request = build_packet_request(payload)
+            key = request_cache_key(request) if cache is not None else None
+            cached = cache.get(key) if cache is not None else None
+            if cached is not None:
+                try:
+                    return _packet_from_text(variant.variant_id, cached, ghash, cache_hit=True)
+                except InputValidationError:
+                    pass  # an entry that no longer validates is a miss; fetch a fresh reply
+            client = shared_client(OpenAI)
+            resp = client.responses.create(**request, timeout=settings.openai_timeout_s)
+            text = extract_output_text(resp)
+            packet = _packet_from_text(variant.variant_id, text, ghash)
+            if cache is not None:
+                cache.put(key, request["model"], text)
+            return packet
         else:
             supports = [f"{x.code}:{x.reason}" for x in evidence_map.supports]
             contradicts = [f"{x.code}:{x.reason}" for x in evidence_map.contradicts]
@@ -84,19 +142,4 @@ class ReviewPacketGenerator:
                 ),
             }
 
-        packet = ReviewPacket(
-            variant_id=variant.variant_id,
-            summary=data.get("summary", ""),
-            technical_summary=data.get("technical_summary", ""),
-            evidence_summary=data.get("evidence_summary", ""),
-            conflicts=list(data.get("conflicts", [])),
-            recommended_actions=list(data.get("recommended_actions", [])),
-            draft_rationale=data.get("draft_rationale", ""),
-            llm_model=settings.openai_model if use_llm else "deterministic-template",
-            grounding_hash=ghash,
-        )
-        try:
-            validate_packet(packet)
-        except ValueError as exc:
-            raise InputValidationError(str(exc))
-        return packet
+        return packet_from_data(variant.variant_id, data, ghash, "deterministic-template")
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable
+from typing import Any
+
+# Report lists the interpretation reads, in the order chunks are scheduled.
+VARIANT_LISTS = ("important_variants", "low_confidence", "fastq_detected_variants")
+VARIANT_FIELDS = ("gene", "chrom", "pos", "ref", "alt", "gt", "dp", "gq", "vaf", "clinvar", "consequence", "notes", "reasons")
+REPORT_FIELDS = ("sample", "assembly", "generated_at")
+# fastp JSON is mostly per-cycle curves; only the headline sections matter for quality notes.
+QC_FIELDS = ("summary", "filtering_result", "duplication")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), used only for budgeting prompts."""
+    return len(text) // 4 + 1
+
+
+def minified(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"), default=str)
+
+
+def compact_variant(row: dict[str, Any]) -> dict[str, Any]:
+    return {k: row[k] for k in VARIANT_FIELDS if row.get(k) not in (None, "", [])}
+
+
+def compact_report(report: dict[str, Any], include_variants: bool = True) -> dict[str, Any]:
+    """
+    Reduce a report.json to what the interpretation needs.
+
+    Drops the CSS, embedded provenance and file paths, keeps headline QC and
+    the variant fields listed in `VARIANT_FIELDS` (empty values omitted), and
+    records per-list counts so chunked prompts still see the full picture.
+    """
+    out: dict[str, Any] = {k: report[k] for k in REPORT_FIELDS if report.get(k)}
+    qc = report.get("qc")
+    if isinstance(qc, dict):
+        out["qc"] = {k: qc[k] for k in QC_FIELDS if k in qc}
+    out["variant_counts"] = {name: len(report.get(name) or []) for name in VARIANT_LISTS}
+    if include_variants:
+        for name in VARIANT_LISTS:
+            rows = report.get(name) or []
+            if rows:
+                out[name] = [compact_variant(r) for r in rows]
+    return out
+
+
+def chunk_rows(rows: Iterable[dict[str, Any]], max_tokens: int) -> list[list[dict[str, Any]]]:
+    """Greedily pack rows into chunks whose JSON (as embedded in a prompt) stays within `max_tokens`."""
+    chunks: list[list[dict[str, Any]]] = []
+    current: list[dict[str, Any]] = []
+    used = 0
+    for row in rows:
+        cost = estimate_tokens(json.dumps(row))
+        if current and used + cost > max_tokens:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(row)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import functools
 import json
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -9,6 +12,11 @@ from openai import OpenAI
 
 from ..config import settings
 from ..exceptions import InputValidationError
+from .cache import LlmResponseCache, request_cache_key
+from .openai_triage import shared_client
+from .report_compactor import VARIANT_LISTS, chunk_rows, compact_report, estimate_tokens, minified
+
+log = logging.getLogger(__name__)
 
 
 def _extract_text_output(resp: Any) -> str:
@@ -21,60 +29,183 @@ def _extract_text_output(resp: Any) -> str:
     return text
 
 
+INTERPRETATION_INSTRUCTIONS = (
+    "You are a genomics interpretation assistant. "
+    "You must not provide diagnosis or treatment decisions. "
+    "Provide a cautious interpretation summary for human review only. "
+    "Return strict JSON matching the provided schema."
+)
+REQUIREMENTS = [
+    "Do not provide a diagnosis.",
+    "Provide evidence-based interpretation and uncertainty.",
+    "Flag limitations and quality caveats clearly.",
+    "Human review is required for all findings.",
+]
+OUTPUT_SCHEMA = {
+    "summary": "string",
+    "key_findings": ["string"],
+    "priority_variants": [
+        {
+            "locus": "string",
+            "gene": "string",
+            "classification": "string",
+            "why_it_matters": "string",
+            "confidence": "low|medium|high",
+        }
+    ],
+    "quality_notes": ["string"],
+    "recommended_follow_up": ["string"],
+    "disclaimer": "string",
+}
+# Floor for the per-chunk variant budget when the fixed prompt parts are already large.
+MIN_CHUNK_TOKENS = 512
+
+
+def _request(prompt: dict[str, Any], model: str) -> dict[str, Any]:
+    return {
+        "model": model,
+        "instructions": INTERPRETATION_INSTRUCTIONS,
+        "input": [{"role": "user", "content": [{"type": "input_text", "text": json.dumps(prompt)}]}],
+    }
+
+
+def _single_prompt(compact: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "task": "Interpret variant report for clinician-facing review support",
+        "requirements": REQUIREMENTS,
+        "output_schema": OUTPUT_SCHEMA,
+        "report_json": minified(compact),
+    }
+
+
+def _map_prompt(context: dict[str, Any], list_name: str, part: str, rows: list[dict[str, Any]]) -> dict[str, Any]:
+    return {
+        "task": f"Interpret part {part} of the {list_name} list of a variant report",
+        "requirements": [
+            *REQUIREMENTS,
+            "Only report findings for the variants in this part; other parts are interpreted separately.",
+        ],
+        "output_schema": OUTPUT_SCHEMA,
+        "report_context": context,
+        "variant_list": list_name,
+        "variants": rows,
+    }
+
+
+def _reduce_prompt(context: dict[str, Any], partials: list[dict[str, Any]]) -> dict[str, Any]:
+    return {
+        "task": "Merge partial interpretations of one variant report into a single interpretation",
+        "requirements": [
+            *REQUIREMENTS,
+            "Use only the partial interpretations and report context provided.",
+            "Deduplicate findings; keep the lower confidence when partials disagree.",
+        ],
+        "output_schema": OUTPUT_SCHEMA,
+        "report_context": context,
+        "partial_interpretations": partials,
+    }
+
+
+def _parse_interpretation(text: str) -> dict[str, Any]:
+    """Parse a reply and check it against `OUTPUT_SCHEMA`; raises InputValidationError otherwise."""
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError as exc:
+        raise InputValidationError(f"Interpretation response is not JSON ({exc})") from exc
+    if not isinstance(parsed, dict):
+        raise InputValidationError("Interpretation response is not a JSON object")
+    if not isinstance(parsed.get("summary"), str):
+        raise InputValidationError("Interpretation response has no summary")
+    for field, kind in OUTPUT_SCHEMA.items():
+        if isinstance(kind, list) and not isinstance(parsed.get(field, []), list):
+            raise InputValidationError(f"Interpretation field {field!r} is not a list")
+    return parsed
+
+
+def _prompt_tokens(prompt: dict[str, Any]) -> int:
+    return estimate_tokens(INTERPRETATION_INSTRUCTIONS + json.dumps(prompt))
+
+
 def interpret_report_json(
     report_path: Path,
     out_json: Path,
     out_md: Path,
     model: str | None = None,
+    cache: LlmResponseCache | None = None,
+    max_prompt_tokens: int | None = None,
+    workers: int | None = None,
+    client: OpenAI | None = None,
 ) -> dict[str, Any]:
-    if "OPENAI_API_KEY" not in os.environ:
+    """
+    Interpret a report.json within a per-request token budget.
+
+    The report is compacted first. If it still exceeds `max_prompt_tokens`,
+    each variant list is split into chunks that are interpreted in parallel
+    (map) and the partial results are merged by further calls (reduce, in
+    rounds until one call fits). Output always follows `OUTPUT_SCHEMA`.
+    """
+    if cache is None and client is None and "OPENAI_API_KEY" not in os.environ:
         raise InputValidationError("OPENAI_API_KEY is not set.")
 
-    raw = report_path.read_text(encoding="utf-8")
-    report_data = json.loads(raw)
-    minified = json.dumps(report_data, separators=(",", ":"))
+    report_data = json.loads(report_path.read_text(encoding="utf-8"))
+    model = model or settings.openai_model
+    budget = max_prompt_tokens or settings.interpretation_max_prompt_tokens
+    workers = max(1, workers or settings.llm_concurrency)
 
-    prompt = {
-        "task": "Interpret variant report for clinician-facing review support",
-        "requirements": [
-            "Do not provide a diagnosis.",
-            "Provide evidence-based interpretation and uncertainty.",
-            "Flag limitations and quality caveats clearly.",
-            "Human review is required for all findings.",
-        ],
-        "output_schema": {
-            "summary": "string",
-            "key_findings": ["string"],
-            "priority_variants": [
-                {
-                    "locus": "string",
-                    "gene": "string",
-                    "classification": "string",
-                    "why_it_matters": "string",
-                    "confidence": "low|medium|high",
-                }
-            ],
-            "quality_notes": ["string"],
-            "recommended_follow_up": ["string"],
-            "disclaimer": "string",
-        },
-        "report_json": minified,
-    }
+    @functools.lru_cache(maxsize=1)
+    def get_client() -> OpenAI:
+        # With a cache the key is only needed on a miss, so it is checked here rather than up front.
+        if client is not None:
+            return client
+        if "OPENAI_API_KEY" not in os.environ:
+            raise InputValidationError("OPENAI_API_KEY is not set.")
+        return shared_client(OpenAI)
+
+    def call(prompt: dict[str, Any]) -> dict[str, Any]:
+        request = _request(prompt, model)
+        key = request_cache_key(request) if cache is not None else None
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            try:
+                return _parse_interpretation(cached)
+            except InputValidationError:
+                pass  # an entry that no longer validates is a miss; fetch a fresh reply
+        resp = get_client().responses.create(**request, timeout=settings.openai_timeout_s)
+        text = _extract_text_output(resp)
+        parsed = _parse_interpretation(text)
+        if cache is not None:
+            cache.put(key, request["model"], text)
+        return parsed
+
+    compact = compact_report(report_data)
+    single = _single_prompt(compact)
+    if _prompt_tokens(single) <= budget:
+        parsed = call(single)
+    else:
+        context = compact_report(report_data, include_variants=False)
+        prompts = []
+        for list_name in VARIANT_LISTS:
+            rows = compact.get(list_name) or []
+            if not rows:
+                continue
+            overhead = _prompt_tokens(_map_prompt(context, list_name, "000/000", []))
+            chunks = chunk_rows(rows, max(MIN_CHUNK_TOKENS, budget - overhead))
+            for i, chunk in enumerate(chunks, start=1):
+                prompts.append(_map_prompt(context, list_name, f"{i}/{len(chunks)}", chunk))
+        log.info("Report exceeds %d prompt tokens; interpreting in %d chunk(s)", budget, len(prompts))
 
-    client = OpenAI()
-    resp = client.responses.create(
-        model=model or settings.openai_model,
-        instructions=(
-            "You are a genomics interpretation assistant. "
-            "You must not provide diagnosis or treatment decisions. "
-            "Provide a cautious interpretation summary for human review only. "
-            "Return strict JSON matching the provided schema."
-        ),
-        input=[{"role": "user", "content": [{"type": "input_text", "text": json.dumps(prompt)}]}],
-        timeout=settings.openai_timeout_s,
-    )
-    text = _extract_text_output(resp)
-    parsed = json.loads(text)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(call, prompts))
+            reduce_budget = max(MIN_CHUNK_TOKENS, budget - _prompt_tokens(_reduce_prompt(context, [])))
+            while True:
+                groups = chunk_rows(partials, reduce_budget)
+                if len(groups) == len(partials) > 1:
+                    # Every partial alone fills the budget; merge pairwise so each round still halves the count.
+                    groups = [partials[i : i + 2] for i in range(0, len(partials), 2)]
+                if len(groups) == 1:
+                    parsed = call(_reduce_prompt(context, groups[0]))
+                    break
+                partials = list(pool.map(call, [_reduce_prompt(context, g) for g in groups]))
 
     out_json.parent.mkdir(parents=True, exist_ok=True)
     out_md.parent.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,500 @@
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Literal
+
+from .config import settings
+from .exceptions import ExternalToolError, InputValidationError
+from .provenance import ToolVersions, collect_versions, write_provenance
+from .qc.fastq_qc import run_fastp
+from .qc.fastq_variants import call_variants_from_fastq
+from .report.render import (
+    SUMMARY_TABLES,
+    render_html,
+    report_template,
+    start_pdf_job,
+    summary_context,
+    write_table_tsv,
+)
+from .vcf.clinvar import ClinVarIndex, ClinVarStreamMatcher, is_clinvar_pathogenic
+from .vcf.io import iter_variants
+from .vcf.panels import GenePanel
+from .vcf.rules import low_confidence
+
+log = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).parent / "report" / "templates"
+SAMPLE_SHEET_COLUMNS = ("sample_id", "vcf", "fastq1", "fastq2", "bam")
+BATCH_SUMMARY = "batch_summary.json"
+ClinVarMode = Literal["index", "stream"]
+
+
+@dataclass(frozen=True)
+class RunOptions:
+    """Settings shared by every sample of a `run` or `batch`."""
+
+    assembly: str = "GRCh38"
+    reference_fasta: Path | None = None
+    caller_threads: int = 4
+    target_bed: Path | None = None
+    fast_call_preset: bool = False
+    skip_fastq_qc: bool = False
+    clinvar_vcf: Path | None = None
+    gene_panel: Path | None = None
+    pdf_mode: str = "full"
+    pdf_summary_rows: int = 50
+    pdf_timeout_s: int | None = None
+    pdf_max_memory_mb: int | None = None
+
+
+@dataclass(frozen=True)
+class SampleInputs:
+    sample_id: str = "SAMPLE"
+    vcf: Path | None = None
+    fastq1: Path | None = None
+    fastq2: Path | None = None
+    bam: Path | None = None
+
+
+@dataclass
+class RunResources:
+    """Per-process state reused across samples: tool versions, compiled template, CSS, ClinVar and panel."""
+
+    versions: ToolVersions
+    css: str
+    clinvar_index: ClinVarIndex | None = None
+    gene_panel: GenePanel | None = None
+
+
+@dataclass
+class RunOutputs:
+    html: Path
+    json: Path
+    pdf: Path | None = None
+    pdf_error: str | None = None
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+def _read_css(template_dir: Path) -> str:
+    css_path = template_dir / "style.css"
+    return css_path.read_text(encoding="utf-8") if css_path.exists() else ""
+
+
+def load_resources(
+    options: RunOptions, versions: ToolVersions | None = None, clinvar_mode: ClinVarMode = "stream"
+) -> RunResources:
+    """
+    Load what every sample needs. With `clinvar_mode="index"` ClinVar is read
+    into memory once; "stream" opens a sorted-merge matcher per sample instead.
+    """
+    report_template(TEMPLATE_DIR)
+    clinvar_index = None
+    if options.clinvar_vcf is not None and clinvar_mode == "index":
+        clinvar_index = ClinVarIndex(str(options.clinvar_vcf))
+    return RunResources(
+        versions=versions or collect_versions(),
+        css=_read_css(TEMPLATE_DIR),
+        clinvar_index=clinvar_index,
+        gene_panel=GenePanel.from_file(options.gene_panel) if options.gene_panel else None,
+    )
+
+
+_shared_lock = threading.Lock()
+
+
+def _mtime(path: Path) -> int | None:
+    return path.stat().st_mtime_ns if path.exists() else None
+
+
+@lru_cache(maxsize=1)
+def _shared_versions() -> ToolVersions:
+    return collect_versions()
+
+
+# One ClinVar release per process: a changed file replaces the old index rather than adding a copy.
+@lru_cache(maxsize=1)
+def _shared_clinvar_index(clinvar_vcf: Path, mtime: int | None) -> ClinVarIndex:
+    return ClinVarIndex(str(clinvar_vcf))
+
+
+@lru_cache(maxsize=8)
+def _shared_gene_panel(gene_panel: Path, mtime: int | None) -> GenePanel:
+    return GenePanel.from_file(gene_panel)
+
+
+def shared_resources(options: RunOptions, clinvar_mode: ClinVarMode = "index") -> RunResources:
+    """
+    Resources kept for the life of the process (`clinreport serve`). ClinVar
+    and panels are cached separately, keyed by resolved path, and reloaded
+    only when the file changes on disk.
+    """
+    report_template(TEMPLATE_DIR)
+    with _shared_lock:
+        clinvar_index = None
+        if options.clinvar_vcf is not None and clinvar_mode == "index":
+            clinvar_vcf = options.clinvar_vcf.resolve()
+            clinvar_index = _shared_clinvar_index(clinvar_vcf, _mtime(clinvar_vcf))
+        gene_panel = None
+        if options.gene_panel is not None:
+            panel_path = options.gene_panel.resolve()
+            gene_panel = _shared_gene_panel(panel_path, _mtime(panel_path))
+        return RunResources(
+            versions=_shared_versions(),
+            css=_read_css(TEMPLATE_DIR),
+            clinvar_index=clinvar_index,
+            gene_panel=gene_panel,
+        )
+
+
+def warm_resources() -> dict[str, int]:
+    """How many ClinVar indexes and gene panels `shared_resources` holds."""
+    return {
+        "clinvar_indexes": _shared_clinvar_index.cache_info().currsize,
+        "gene_panels": _shared_gene_panel.cache_info().currsize,
+    }
+
+
+def validate_inputs(sample: SampleInputs, options: RunOptions) -> None:
+    if options.pdf_mode not in ("full", "summary", "none"):
+        raise InputValidationError(f"Unknown --pdf-mode {options.pdf_mode!r}; expected full, summary or none.")
+    if sample.vcf is None and sample.fastq1 is None:
+        raise InputValidationError("Provide at least one input source: --vcf or --fastq1.")
+    if sample.vcf is not None and not sample.vcf.exists():
+        raise InputValidationError(f"VCF file not found: {sample.vcf}")
+    if sample.fastq1 is not None and options.reference_fasta is None:
+        raise InputValidationError("--reference-fasta is required when --fastq1 is provided.")
+    for label, path in (("FASTQ", sample.fastq1), ("FASTQ", sample.fastq2), ("BAM", sample.bam)):
+        if path is not None and not path.exists():
+            raise InputValidationError(f"{label} file not found: {path}")
+    if options.reference_fasta is not None and not options.reference_fasta.exists():
+        raise InputValidationError(f"Reference FASTA not found: {options.reference_fasta}")
+    if options.target_bed is not None and not options.target_bed.exists():
+        raise InputValidationError(f"Target BED not found: {options.target_bed}")
+
+
+def run_sample(
+    sample: SampleInputs, out_dir: Path, options: RunOptions, resources: RunResources | None = None
+) -> RunOutputs:
+    """Write report.html/json (and the PDF) for one sample; the body of `clinreport run`."""
+    validate_inputs(sample, options)
+    resources = resources or load_resources(options)
+    timings: dict[str, float] = {}
+    clock = time.perf_counter()
+
+    def lap(stage: str) -> None:
+        nonlocal clock
+        now = time.perf_counter()
+        timings[stage] = round(now - clock, 4)
+        clock = now
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    min_mapq = 20 if options.fast_call_preset else 0
+    min_baseq = 20 if options.fast_call_preset else 0
+    max_depth = 250 if options.fast_call_preset else 8000
+
+    fastq_called_vcf: Path | None = None
+    if sample.fastq1 is not None:
+        fastq_call_dir = out_dir / "fastq_calling"
+        fastq_called_vcf = call_variants_from_fastq(
+            fastq1=str(sample.fastq1),
+            fastq2=str(sample.fastq2) if sample.fastq2 else None,
+            reference_fasta=str(options.reference_fasta),
+            out_dir=fastq_call_dir,
+            threads=options.caller_threads,
+            target_bed=str(options.target_bed) if options.target_bed else None,
+            min_mapq=min_mapq,
+            min_baseq=min_baseq,
+            max_depth=max_depth,
+        )
+        log.info("FASTQ-derived variants written to %s", fastq_called_vcf)
+        lap("fastq_calling")
+
+    analysis_vcf = sample.vcf if sample.vcf is not None else fastq_called_vcf
+    if analysis_vcf is None:
+        raise InputValidationError("No analyzable VCF available after FASTQ processing.")
+
+    prov_dir = out_dir / "metadata"
+    write_provenance(
+        prov_dir,
+        resources.versions,
+        extra={
+            "assembly": options.assembly,
+            "vcf": str(analysis_vcf),
+            "input_vcf": str(sample.vcf) if sample.vcf else None,
+            "fastq_called_vcf": str(fastq_called_vcf) if fastq_called_vcf else None,
+            "bam": str(sample.bam) if sample.bam else None,
+            "target_bed": str(options.target_bed) if options.target_bed else None,
+            "fast_call_preset": options.fast_call_preset,
+        },
+    )
+
+    qc = None
+    if sample.fastq1 and not options.skip_fastq_qc:
+        qc = run_fastp(str(sample.fastq1), str(sample.fastq2) if sample.fastq2 else None, out_dir / "qc")
+        lap("fastq_qc")
+
+    important = []
+    lowc = []
+    clinvar_matcher: ClinVarIndex | ClinVarStreamMatcher | None = resources.clinvar_index
+    if clinvar_matcher is None and options.clinvar_vcf:
+        clinvar_matcher = ClinVarStreamMatcher(str(options.clinvar_vcf))
+    panel = resources.gene_panel
+
+    for v in iter_variants(str(analysis_vcf)):
+        lc = low_confidence(v)
+        if lc.is_low_conf:
+            lowc.append(
+                {
+                    "chrom": v.chrom,
+                    "pos": v.pos,
+                    "ref": v.ref,
+                    "alt": v.alt,
+                    "gt": v.gt,
+                    "dp": v.dp,
+                    "gq": v.gq,
+                    "reasons": lc.reasons,
+                    "snapshot": None,
+                }
+            )
+
+        clinvar = str(v.info.get("CLNSIG", "")).strip()
+        gene = str(v.info.get("GENE", "")).strip()
+        if clinvar_matcher and (not clinvar or not gene):
+            hit = clinvar_matcher.match(v)
+            if hit:
+                if not clinvar:
+                    clinvar = hit.clnsig
+                if not gene:
+                    gene = hit.gene
+
+        if is_clinvar_pathogenic(clinvar):
+            row: dict[str, Any] = {
+                "gene": gene,
+                "chrom": v.chrom,
+                "pos": v.pos,
+                "ref": v.ref,
+                "alt": v.alt,
+                "gt": v.gt,
+                "dp": v.dp,
+                "gq": v.gq,
+                "clinvar": clinvar,
+                "notes": "",
+            }
+            if panel is not None:
+                row["in_panel"] = panel.contains(gene)
+            important.append(row)
+
+    fastq_detected_variants = []
+    if fastq_called_vcf is not None:
+        for v in iter_variants(str(fastq_called_vcf)):
+            fastq_detected_variants.append(
+                {
+                    "chrom": v.chrom,
+                    "pos": v.pos,
+                    "ref": v.ref,
+                    "alt": v.alt,
+                    "gt": v.gt,
+                    "dp": v.dp,
+                    "gq": v.gq,
+                }
+            )
+    lap("variants")
+
+    context = {
+        "sample": sample.sample_id,
+        "assembly": options.assembly,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "provenance_json": (prov_dir / "tool_versions.json").read_text(encoding="utf-8"),
+        "analysis_vcf": str(analysis_vcf),
+        "clinvar_vcf": str(options.clinvar_vcf) if options.clinvar_vcf else None,
+        "fastq_called_vcf": str(fastq_called_vcf) if fastq_called_vcf else None,
+        "qc": qc,
+        "important_variants": important,
+        "fastq_detected_variants": fastq_detected_variants,
+        "low_confidence": lowc,
+        "css": resources.css,
+    }
+    if panel is not None:
+        context["gene_panel"] = panel.name
+
+    html_path = out_dir / "report.html"
+    pdf_path = out_dir / "report.pdf"
+    json_path = out_dir / "report.json"
+    render_html(TEMPLATE_DIR, context, html_path)
+
+    # PDF rendering runs in a separate process so the JSON write does not wait on WeasyPrint.
+    pdf_job = None
+    if options.pdf_mode != "none":
+        pdf_source = html_path
+        if options.pdf_mode == "summary":
+            pdf_source = out_dir / "report_summary.html"
+            render_html(TEMPLATE_DIR, summary_context(context, options.pdf_summary_rows), pdf_source)
+            for key in SUMMARY_TABLES:
+                if context.get(key):
+                    write_table_tsv(context[key], out_dir / "tables" / f"{key}.tsv")
+        pdf_job = start_pdf_job(
+            pdf_source,
+            pdf_path,
+            timeout_s=settings.pdf_timeout_s if options.pdf_timeout_s is None else options.pdf_timeout_s,
+            max_memory_mb=(
+                settings.pdf_max_memory_mb if options.pdf_max_memory_mb is None else options.pdf_max_memory_mb
+            ),
+        )
+
+    json_path.write_text(json.dumps(context, indent=2, default=str), encoding="utf-8")
+    lap("render")
+
+    pdf_error = None
+    if pdf_job is not None:
+        try:
+            pdf_job.wait()
+        except ExternalToolError as exc:
+            pdf_error = str(exc)
+            log.warning("PDF generation failed; continuing with HTML/JSON outputs. Error: %s", exc)
+        lap("pdf")
+
+    if pdf_error:
+        context["pdf_error"] = pdf_error
+        json_path.write_text(json.dumps(context, indent=2, default=str), encoding="utf-8")
+
+    return RunOutputs(
+        html=html_path,
+        json=json_path,
+        pdf=pdf_path if pdf_job is not None and not pdf_error else None,
+        pdf_error=pdf_error,
+        timings=timings,
+    )
+
+
+def read_sample_sheet(path: Path) -> list[SampleInputs]:
+    """
+    Samples from a TSV (or `.csv`) sheet with a header row of `SAMPLE_SHEET_COLUMNS`;
+    only `sample_id` is required. Relative paths are resolved against the sheet's directory.
+    """
+    if not path.exists():
+        raise InputValidationError(f"Sample sheet not found: {path}")
+    delimiter = "," if path.suffix.lower() == ".csv" else "\t"
+    with path.open("r", encoding="utf-8", newline="") as fh:
+        reader = csv.DictReader((line for line in fh if not line.startswith("#")), delimiter=delimiter)
+        columns = [c.strip() for c in reader.fieldnames or []]
+        if "sample_id" not in columns:
+            raise InputValidationError(f"Sample sheet {path} has no sample_id column.")
+        unknown = sorted(set(columns) - set(SAMPLE_SHEET_COLUMNS))
+        if unknown:
+            raise InputValidationError(f"Sample sheet {path} has unknown column(s): {', '.join(unknown)}")
+        rows = [{k.strip(): (v or "").strip() for k, v in row.items() if k} for row in reader]
+
+    def resolve(value: str) -> Path | None:
+        return (path.parent / value) if value else None
+
+    samples: list[SampleInputs] = []
+    seen: set[str] = set()
+    for line_no, row in enumerate(rows, start=2):
+        sample_id = row.get("sample_id", "")
+        if not sample_id:
+            continue
+        if sample_id in seen:
+            raise InputValidationError(f"Duplicate sample_id {sample_id!r} in {path}.")
+        if sample_id in (".", "..") or "/" in sample_id or "\\" in sample_id:
+            raise InputValidationError(f"sample_id {sample_id!r} (row {line_no}) is not usable as a directory name.")
+        seen.add(sample_id)
+        samples.append(
+            SampleInputs(
+                sample_id=sample_id,
+                vcf=resolve(row.get("vcf", "")),
+                fastq1=resolve(row.get("fastq1", "")),
+                fastq2=resolve(row.get("fastq2", "")),
+                bam=resolve(row.get("bam", "")),
+            )
+        )
+    if not samples:
+        raise InputValidationError(f"Sample sheet {path} lists no samples.")
+    return samples
+
+
+# Set once per batch worker by `_init_worker`, then shared by every sample the worker runs.
+_worker_resources: RunResources | None = None
+
+
+def _init_worker(options: RunOptions, versions: ToolVersions, clinvar_mode: ClinVarMode) -> None:
+    global _worker_resources
+    _worker_resources = load_resources(options, versions, clinvar_mode)
+
+
+def _run_batch_sample(sample: SampleInputs, out_dir: Path, options: RunOptions) -> dict[str, Any]:
+    start = time.perf_counter()
+    result: dict[str, Any] = {"sample_id": sample.sample_id, "out_dir": str(out_dir), "worker_pid": os.getpid()}
+    try:
+        outputs = run_sample(sample, out_dir, options, _worker_resources)
+    except Exception as exc:
+        # One bad sample must not sink the batch; its error goes into the summary.
+        log.warning("Sample %s failed: %s", sample.sample_id, exc)
+        result.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+    else:
+        result.update(
+            status="ok",
+            outputs={"html": str(outputs.html), "json": str(outputs.json), "pdf": str(outputs.pdf) if outputs.pdf else None},
+            timings=outputs.timings,
+        )
+        if outputs.pdf_error:
+            result["pdf_error"] = outputs.pdf_error
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def run_batch(
+    samples: list[SampleInputs],
+    out_dir: Path,
+    options: RunOptions,
+    workers: int = 4,
+    clinvar_mode: ClinVarMode = "index",
+) -> dict[str, Any]:
+    """
+    Run every sample into `out_dir/<sample_id>` and write `out_dir/batch_summary.json`.
+
+    Tool versions are probed once; each worker process then loads the compiled
+    template, gene panel and ClinVar (indexed in memory with `clinvar_mode="index"`)
+    once and reuses them for all of its samples. Failed samples are recorded
+    in the summary rather than stopping the batch.
+    """
+    for sample in samples:
+        try:
+            validate_inputs(sample, options)
+        except InputValidationError as exc:
+            raise InputValidationError(f"Sample {sample.sample_id}: {exc}") from exc
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    versions = collect_versions()
+    workers = max(1, min(workers, len(samples)))
+    if workers == 1:
+        _init_worker(options, versions, clinvar_mode)
+        results = [_run_batch_sample(s, out_dir / s.sample_id, options) for s in samples]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(options, versions, clinvar_mode)
+        ) as pool:
+            futures = [pool.submit(_run_batch_sample, s, out_dir / s.sample_id, options) for s in samples]
+            results = [fut.result() for fut in futures]
+
+    summary = {
+        "samples": len(samples),
+        "succeeded": sum(1 for r in results if r["status"] == "ok"),
+        "failed": sum(1 for r in results if r["status"] != "ok"),
+        "workers": workers,
+        "clinvar_mode": clinvar_mode if options.clinvar_vcf else None,
+        "wall_seconds": round(time.perf_counter() - start, 4),
+        "results": results,
+    }
+    (out_dir / BATCH_SUMMARY).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return summary
@@ -1,17 +1,62 @@
 from __future__ import annotations
 
+import csv
+import multiprocessing
+from dataclasses import dataclass
+from functools import lru_cache
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
 from pathlib import Path
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
 
+from ..exceptions import ExternalToolError
 
-def render_html(template_dir: Path, context: dict, out_html: Path) -> None:
+# Report tables that are cut down to the top-N rows in summary PDFs.
+SUMMARY_TABLES = ("important_variants", "fastq_detected_variants", "low_confidence")
+
+
+@lru_cache(maxsize=8)
+def report_template(template_dir: Path) -> Template:
+    """Compiled report template, built once per process and template directory."""
     env = Environment(
         loader=FileSystemLoader(str(template_dir)),
         autoescape=select_autoescape(["html", "xml"]),
     )
-    tpl = env.get_template("report.html.j2")
-    out_html.write_text(tpl.render(**context), encoding="utf-8")
+    return env.get_template("report.html.j2")
+
+
+def render_html(template_dir: Path, context: dict, out_html: Path) -> None:
+    out_html.write_text(report_template(template_dir).render(**context), encoding="utf-8")
+
+
+def summary_context(context: dict, top_n: int) -> dict:
+    """Copy of a report context with every variant table limited to its first `top_n` rows."""
+    out = dict(context)
+    truncated: dict[str, int] = {}
+    for key in SUMMARY_TABLES:
+        rows = context.get(key) or []
+        if len(rows) > top_n:
+            truncated[key] = len(rows)
+        out[key] = rows[:top_n]
+    out["summary_mode"] = True
+    out["summary_rows"] = top_n
+    out["truncated_tables"] = truncated
+    return out
+
+
+def write_table_tsv(rows: list[dict], out_tsv: Path) -> None:
+    out_tsv.parent.mkdir(parents=True, exist_ok=True)
+    columns: list[str] = []
+    for row in rows:
+        for key in row:
+            if key not in columns:
+                columns.append(key)
+    with out_tsv.open("w", encoding="utf-8", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=columns, delimiter="\t", extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: "|".join(map(str, v)) if isinstance(v, list) else v for k, v in row.items()})
 
 
 def html_to_pdf(html_path: Path, out_pdf: Path) -> None:
@@ -19,3 +64,73 @@ def html_to_pdf(html_path: Path, out_pdf: Path) -> None:
     from weasyprint import HTML
 
     HTML(filename=str(html_path)).write_pdf(str(out_pdf))
+
+
+def _pdf_worker(html_path: str, out_pdf: str, max_memory_mb: int | None, conn: Connection) -> None:
+    try:
+        if max_memory_mb:
+            try:
+                import resource
+            except ImportError:  # pragma: no cover - non-POSIX platforms have no rlimits
+                resource = None
+            if resource is not None:
+                limit = max_memory_mb * 1024 * 1024
+                resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        html_to_pdf(Path(html_path), Path(out_pdf))
+    except BaseException as exc:
+        conn.send(f"{type(exc).__name__}: {exc}")
+    else:
+        conn.send(None)
+    finally:
+        conn.close()
+
+
+@dataclass
+class PdfJob:
+    """Handle for a PDF render running in a separate worker process."""
+
+    process: BaseProcess
+    conn: Connection
+    out_pdf: Path
+    timeout_s: float | None
+
+    def wait(self) -> None:
+        self.process.join(self.timeout_s)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+            self.conn.close()
+            self.out_pdf.unlink(missing_ok=True)
+            raise ExternalToolError(f"PDF generation timed out after {self.timeout_s}s")
+
+        error = self.conn.recv() if self.conn.poll() else None
+        self.conn.close()
+        if error is None and self.process.exitcode != 0:
+            error = f"worker exited with code {self.process.exitcode}"
+        if error:
+            self.out_pdf.unlink(missing_ok=True)
+            raise ExternalToolError(f"PDF generation failed: {error}")
+
+
+def start_pdf_job(
+    html_path: Path,
+    out_pdf: Path,
+    timeout_s: float | None = None,
+    max_memory_mb: int | None = None,
+) -> PdfJob:
+    """
+    Start WeasyPrint in a spawned worker process and return immediately.
+
+    The worker's address space is capped at `max_memory_mb` (where rlimits exist)
+    and `PdfJob.wait` kills it once `timeout_s` has elapsed.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    recv_conn, send_conn = ctx.Pipe(duplex=False)
+    proc = ctx.Process(
+        target=_pdf_worker,
+        args=(str(html_path), str(out_pdf), max_memory_mb, send_conn),
+        daemon=True,
+    )
+    proc.start()
+    send_conn.close()
+    return PdfJob(process=proc, conn=recv_conn, out_pdf=out_pdf, timeout_s=timeout_s)
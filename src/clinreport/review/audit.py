@@ -1,22 +1,393 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import threading
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Literal
 
+from ..config import settings
 from ..core.models import AuditEvent
+from ..exceptions import InputValidationError
+from .locks import drop_torn_tail, file_lock
+from .store import ReviewStore, is_store_path
+
+# Each line carries `prev_hash`, the SHA-256 of the previous line's bytes (GENESIS_HASH
+# for the first line), so editing, dropping or reordering a line breaks the chain.
+# Lines written before chaining have no `prev_hash` and are accepted at the start only.
+GENESIS_HASH = "0" * 64
+
+Durability = Literal["none", "flush", "fsync"]
+DURABILITY_MODES: tuple[str, ...] = ("none", "flush", "fsync")
+
+
+def line_hash(line: bytes) -> str:
+    return hashlib.sha256(line.rstrip(b"\n")).hexdigest()
+
+
+def segment_index_path(audit_path: Path) -> Path:
+    return audit_path.with_name(audit_path.name + ".segments.json")
+
+
+def checkpoint_path(audit_path: Path) -> Path:
+    return audit_path.with_name(audit_path.name + ".checkpoint.json")
+
+
+def load_segment_index(audit_path: Path) -> list[dict[str, Any]]:
+    """Rotated segments, oldest first; the active `audit_path` follows the last one."""
+    index = segment_index_path(audit_path)
+    return json.loads(index.read_text(encoding="utf-8")) if index.exists() else []
+
+
+def _segments(audit_path: Path) -> list[tuple[dict[str, Any] | None, Path]]:
+    rotated = [(meta, audit_path.with_name(meta["file"])) for meta in load_segment_index(audit_path)]
+    return [*rotated, (None, audit_path)]
+
+
+def _last_line(fd: int) -> bytes | None:
+    size = os.fstat(fd).st_size
+    end = size
+    while end > 0:
+        start = max(0, end - 4096)
+        chunk = os.pread(fd, size - start, start)
+        nl = chunk.rfind(b"\n", 0, len(chunk) - 1)
+        if nl >= 0 or start == 0:
+            return chunk[nl + 1 :]
+        end = start
+    return None
+
+
+def _rotate(audit_path: Path) -> None:
+    """Seal the active log as a numbered segment and record its summary; caller holds the lock."""
+    index = load_segment_index(audit_path)
+    name = f"{audit_path.name}.{len(index) + 1:06d}"
+    cases: set[str] = set()
+    first_ts = last_ts = None
+    events = 0
+    last = GENESIS_HASH
+    with audit_path.open("rb") as fh:
+        for line in fh:
+            if not line.endswith(b"\n") or not line.strip():
+                continue
+            item = json.loads(line)
+            cases.add(item.get("case_id", ""))
+            ts = item.get("timestamp")
+            first_ts = first_ts or ts
+            last_ts = ts or last_ts
+            events += 1
+            last = line_hash(line)
+    os.replace(audit_path, audit_path.with_name(name))
+    index.append(
+        {
+            "file": name,
+            "events": events,
+            "first_timestamp": first_ts,
+            "last_timestamp": last_ts,
+            "case_ids": sorted(cases),
+            "last_hash": last,
+        }
+    )
+    tmp = segment_index_path(audit_path).with_suffix(".tmp")
+    tmp.write_text(json.dumps(index, indent=2), encoding="utf-8")
+    os.replace(tmp, segment_index_path(audit_path))
 
 
 def append_audit_event(audit_path: Path, event: AuditEvent) -> None:
+    append_audit_events(audit_path, [event])
+
+
+def append_audit_events(
+    audit_path: Path,
+    events: Sequence[AuditEvent],
+    max_segment_bytes: int | None = None,
+    durability: Durability | None = None,
+) -> None:
+    """
+    Append a group of events with a single write, so the group lands together.
+
+    The log is rotated into a numbered segment first once it exceeds
+    `max_segment_bytes` (default CLINREPORT_AUDIT_SEGMENT_MAX_MB).
+    `durability` (default CLINREPORT_AUDIT_DURABILITY) is applied to the write:
+    "none" leaves it to the OS, "flush" forces the data to disk (fdatasync),
+    "fsync" also syncs file metadata and the directory entry.
+    """
+    if not events:
+        return
+    if is_store_path(audit_path):
+        with ReviewStore(audit_path) as store:
+            store.append_events(events)
+        return
+    if max_segment_bytes is None:
+        max_segment_bytes = settings.audit_segment_max_mb * 1024 * 1024
+    durability = durability or settings.audit_durability
+    if durability not in DURABILITY_MODES:
+        raise InputValidationError(f"Unknown audit durability {durability!r}; expected one of {DURABILITY_MODES}.")
     audit_path.parent.mkdir(parents=True, exist_ok=True)
-    with audit_path.open("a", encoding="utf-8") as fh:
-        fh.write(event.model_dump_json() + "\n")
+    with file_lock(audit_path):
+        created = not audit_path.exists()
+        if not created and max_segment_bytes > 0 and audit_path.stat().st_size >= max_segment_bytes:
+            _rotate(audit_path)
+            created = True
+        fd = os.open(audit_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            drop_torn_tail(fd)
+            last = _last_line(fd)
+            if last is not None:
+                prev = line_hash(last)
+            else:
+                index = load_segment_index(audit_path)
+                prev = index[-1]["last_hash"] if index else GENESIS_HASH
+            lines = []
+            for event in events:
+                line = event.model_copy(update={"prev_hash": prev}).model_dump_json().encode("utf-8")
+                prev = line_hash(line)
+                lines.append(line + b"\n")
+            os.write(fd, b"".join(lines))
+            if durability == "flush":
+                _fdatasync(fd)
+            elif durability == "fsync":
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        if durability == "fsync" and created:
+            _fsync_dir(audit_path.parent)
+
+
+def _fdatasync(fd: int) -> None:
+    # macOS/Windows have no fdatasync.
+    (getattr(os, "fdatasync", None) or os.fsync)(fd)
+
+
+def _fsync_dir(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # Windows cannot open directories
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AuditWriter:
+    """
+    Buffer audit events and append them in batches (group commit).
+
+    Events are committed with `append_audit_events` once `batch_size` are
+    buffered, on `flush()`, and on `close()`/context exit; until then a crash
+    loses the buffered events. Safe to share between threads: commits happen
+    one at a time and keep the order events were written in.
+    """
+
+    def __init__(
+        self,
+        audit_path: Path,
+        durability: Durability | None = None,
+        batch_size: int = 500,
+        max_segment_bytes: int | None = None,
+    ):
+        self.audit_path = audit_path
+        self.durability = durability or settings.audit_durability
+        if self.durability not in DURABILITY_MODES:
+            raise InputValidationError(
+                f"Unknown audit durability {self.durability!r}; expected one of {DURABILITY_MODES}."
+            )
+        self.batch_size = max(1, batch_size)
+        self.max_segment_bytes = max_segment_bytes
+        self.committed = 0
+        self._buffer: list[AuditEvent] = []
+        self._buffer_lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+
+    def write(self, event: AuditEvent) -> None:
+        self.write_many([event])
+
+    def write_many(self, events: Sequence[AuditEvent]) -> None:
+        with self._buffer_lock:
+            self._buffer.extend(events)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Commit everything buffered so far. A thread that waits here while
+        another commits usually finds its events already written, so
+        concurrent flushes share one write and sync.
+        """
+        with self._commit_lock:
+            with self._buffer_lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return
+            try:
+                append_audit_events(self.audit_path, batch, self.max_segment_bytes, self.durability)
+            except BaseException:
+                # Keep the events (in order) so the next flush retries them instead of dropping them.
+                with self._buffer_lock:
+                    self._buffer[:0] = batch
+                raise
+            self.committed += len(batch)
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> AuditWriter:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+_shared_writers: dict[Path, AuditWriter] = {}
+_shared_writers_lock = threading.Lock()
+
+
+def commit_audit_events(audit_path: Path, events: Sequence[AuditEvent]) -> None:
+    """
+    Append events and return once they are committed.
+
+    Uses one `AuditWriter` per log for the whole process, so commands that
+    record events at the same time (`clinreport serve` jobs) are group
+    committed instead of paying one fdatasync each.
+    """
+    key = audit_path.absolute()
+    with _shared_writers_lock:
+        writer = _shared_writers.get(key)
+        if writer is None:
+            writer = _shared_writers[key] = AuditWriter(key)
+    writer.write_many(events)
+    writer.flush()
+
+
+def iter_audit_events(
+    audit_path: Path,
+    case_id: str | None = None,
+    variant_id: str | None = None,
+    event_type: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Stream events across rotated segments in write order, filtered by case,
+    variant, event type and ISO timestamp range (`since` <= ts < `until`).
+
+    Segments whose summary rules out the case or time range are skipped
+    unread; lines that cannot match the case/variant are skipped unparsed.
+    """
+    if is_store_path(audit_path):
+        if not audit_path.exists():
+            return
+        with ReviewStore(audit_path) as store:
+            for item in store.iter_events(case_id=case_id, variant_id=variant_id, event_type=event_type):
+                ts = item.get("timestamp", "")
+                if (since is None or ts >= since) and (until is None or ts < until):
+                    yield item
+        return
+
+    # Events are written as raw UTF-8 JSON, so the needles must not escape non-ASCII.
+    needles = [
+        json.dumps(v, ensure_ascii=False).encode("utf-8") for v in (case_id, variant_id, event_type) if v is not None
+    ]
+    for meta, segment in _segments(audit_path):
+        if meta is not None:
+            if case_id is not None and case_id not in meta["case_ids"]:
+                continue
+            if since is not None and meta["last_timestamp"] and meta["last_timestamp"] < since:
+                continue
+            if until is not None and meta["first_timestamp"] and meta["first_timestamp"] >= until:
+                continue
+        if not segment.exists():
+            continue
+        with segment.open("rb") as fh:
+            for line in fh:
+                if not line.endswith(b"\n") or not line.strip():
+                    continue
+                if any(n not in line for n in needles):
+                    continue
+                item = json.loads(line)
+                if case_id is not None and item.get("case_id") != case_id:
+                    continue
+                if variant_id is not None and item.get("variant_id") != variant_id:
+                    continue
+                if event_type is not None and item.get("event_type") != event_type:
+                    continue
+                ts = item.get("timestamp", "")
+                if (since is not None and ts < since) or (until is not None and ts >= until):
+                    continue
+                yield item
 
 
 def load_audit_events(audit_path: Path) -> list[dict]:
-    if not audit_path.exists():
-        return []
-    events = []
-    for line in audit_path.read_text(encoding="utf-8").splitlines():
-        if line.strip():
-            events.append(json.loads(line))
-    return events
+    return list(iter_audit_events(audit_path))
+
+
+@dataclass(frozen=True)
+class AuditVerification:
+    ok: bool
+    events_checked: int
+    error: str | None = None
+
+
+def verify_audit_chain(audit_path: Path, use_checkpoint: bool = True) -> AuditVerification:
+    """
+    Check the hash chain across all segments.
+
+    With `use_checkpoint`, verification resumes after the last verified line
+    (whose hash is re-checked) and the checkpoint is advanced on success, so
+    routine checks only hash new events. Pass False for a full re-verification.
+    """
+    segments = _segments(audit_path)
+    start_seq, offset, prev, chained = 0, 0, None, False
+    cp_file = checkpoint_path(audit_path)
+    if use_checkpoint and cp_file.exists():
+        cp = json.loads(cp_file.read_text(encoding="utf-8"))
+        start_seq, offset, prev, chained = cp["segment"], cp["offset"], cp["last_hash"], cp["chained"]
+        seg = segments[start_seq][1] if start_seq < len(segments) else None
+        if seg is None or not seg.exists() or seg.stat().st_size < offset:
+            return AuditVerification(False, 0, f"checkpoint points past the end of segment {start_seq}")
+        if offset:
+            with seg.open("rb") as fh:
+                fh.seek(max(0, offset - 1_048_576))
+                tail = fh.read(offset - fh.tell())
+            if line_hash(tail[tail.rfind(b"\n", 0, len(tail) - 1) + 1 :]) != prev:
+                return AuditVerification(False, 0, f"last checkpointed line in segment {start_seq} was modified")
+
+    checked = 0
+    end_seq, end_offset = start_seq, offset
+    for seq in range(start_seq, len(segments)):
+        seg = segments[seq][1]
+        if not seg.exists():
+            if seq < len(segments) - 1:
+                return AuditVerification(False, checked, f"segment {seg.name} is missing")
+            continue
+        pos = offset if seq == start_seq else 0
+        with seg.open("rb") as fh:
+            fh.seek(pos)
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break
+                if line.strip():
+                    item = json.loads(line)
+                    stored = item.get("prev_hash")
+                    if stored is None:
+                        if chained:
+                            return AuditVerification(False, checked, f"unchained event in {seg.name} at byte {pos}")
+                    elif stored != (prev or GENESIS_HASH):
+                        return AuditVerification(False, checked, f"hash chain broken in {seg.name} at byte {pos}")
+                    else:
+                        chained = True
+                    prev = line_hash(line)
+                    checked += 1
+                pos += len(line)
+        end_seq, end_offset = seq, pos
+
+    if use_checkpoint and prev is not None:
+        cp_file.write_text(
+            json.dumps({"segment": end_seq, "offset": end_offset, "last_hash": prev, "chained": chained}),
+            encoding="utf-8",
+        )
+    return AuditVerification(True, checked)
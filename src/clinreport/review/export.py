@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, Literal, TextIO
+
+from ..exceptions import InputValidationError
+
+ReportMode = Literal["embed", "reference"]
+CHUNK_BYTES = 1 << 20
+
+
+def file_digest(path: Path) -> tuple[str, int]:
+    """SHA-256 and size of a file, read in chunks."""
+    h = hashlib.sha256()
+    size = 0
+    with path.open("rb") as fh:
+        while chunk := fh.read(CHUNK_BYTES):
+            h.update(chunk)
+            size += len(chunk)
+    return h.hexdigest(), size
+
+
+def report_object_name(sha256: str) -> str:
+    """Where a report is stored inside an export bundle."""
+    return f"objects/{sha256}.json"
+
+
+def _copy_report(src: Path, out: TextIO) -> None:
+    with src.open("r", encoding="utf-8") as fh:
+        head = fh.read(4096)
+        if not head.lstrip().startswith("{"):
+            raise InputValidationError(f"{src} is not a JSON object.")
+        out.write(head)
+        shutil.copyfileobj(fh, out, CHUNK_BYTES)
+
+
+def write_final_export(
+    out_json: Path,
+    header: dict[str, Any],
+    report_json: Path,
+    packet: dict[str, Any],
+    decisions: Iterable[dict[str, Any]],
+    report_mode: ReportMode = "embed",
+    report_sha256: tuple[str, int] | None = None,
+) -> None:
+    """
+    Stream the final export to `out_json` (written to a temp file, then renamed).
+
+    The report is copied through in chunks ("embed") or replaced by a content
+    hash reference ("reference"), so memory use does not grow with its size.
+    Decisions are written as they are read.
+    """
+    if report_mode not in ("embed", "reference"):
+        raise InputValidationError(f"Unknown report mode {report_mode!r}; expected embed or reference.")
+    out_json.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_json.with_name(out_json.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as out:
+        out.write("{\n")
+        for key, value in header.items():
+            out.write(f"  {json.dumps(key)}: {json.dumps(value)},\n")
+        out.write('  "report": ')
+        if report_mode == "embed":
+            _copy_report(report_json, out)
+        else:
+            sha256, size = report_sha256 or file_digest(report_json)
+            ref = {"sha256": sha256, "bytes": size, "path": str(report_json), "object": report_object_name(sha256)}
+            out.write(json.dumps(ref))
+        out.write(',\n  "review_packet": ')
+        out.write(json.dumps(packet, indent=2).replace("\n", "\n  "))
+        out.write(',\n  "reviewer_decisions": [')
+        for i, decision in enumerate(decisions):
+            out.write(("," if i else "") + "\n    " + json.dumps(decision))
+        out.write("\n  ]\n}\n")
+    os.replace(tmp, out_json)
+
+
+def write_export_bundle(
+    bundle: Path, out_json: Path, report_json: Path, packet_json: Path, report_sha256: str
+) -> Path:
+    """Tar the export with its packet and the report stored under its content hash."""
+    bundle.parent.mkdir(parents=True, exist_ok=True)
+    mode = "w:gz" if bundle.name.endswith((".tar.gz", ".tgz")) else "w"
+    with tarfile.open(bundle, mode) as tar:
+        tar.add(out_json, arcname=out_json.name)
+        tar.add(packet_json, arcname=f"packet/{packet_json.name}")
+        tar.add(report_json, arcname=report_object_name(report_sha256))
+    return bundle
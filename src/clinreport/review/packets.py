@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from pydantic import ValidationError
+
+from ..core.models import (
+    AuditEvent,
+    AuthenticityAssessment,
+    EvidenceMap,
+    ReviewPacket,
+    VariantRecordModel,
+)
+from ..core.records import EvidenceRec
+from ..evidence_mapping.engine import EvidenceMappingEngine
+from ..exceptions import InputValidationError
+from ..igv.naming import safe_token
+from ..llm.cache import LlmResponseCache
+from ..llm.packet_generator import ReviewPacketGenerator
+from ..technical_review.authenticity_engine import TechnicalAuthenticityEngine
+from ..technical_review.bam_evidence import BamEvidence, Locus
+from ..technical_review.sequence_context import SequenceContext
+from .routing import route_review_queue
+
+# Packet file stems longer than this (long indel alleles) are shortened with a hash suffix.
+MAX_STEM_LEN = 96
+
+
+@dataclass(frozen=True)
+class PreparedVariant:
+    """One report variant with its deterministic assessment, ready for packet generation."""
+
+    variant: VariantRecordModel
+    authenticity: AuthenticityAssessment
+    evidence_map: EvidenceMap
+    queue: str
+
+
+def variant_id(chrom: str, pos: int, ref: str, alt: str) -> str:
+    return f"{chrom}-{pos}-{ref}-{alt}"
+
+
+def report_variants(report: dict[str, Any]) -> list[dict[str, Any]]:
+    return report.get("important_variants") or report.get("fastq_detected_variants") or []
+
+
+def report_loci(rows: Sequence[dict[str, Any]]) -> list[Locus]:
+    return [
+        Locus(variant_id(r["chrom"], int(r["pos"]), r["ref"], r["alt"]), r["chrom"], int(r["pos"]), r["ref"], r["alt"])
+        for r in rows
+    ]
+
+
+def prepare_variants(
+    rows: Sequence[dict[str, Any]],
+    auth_engine: TechnicalAuthenticityEngine | None = None,
+    mapping_engine: EvidenceMappingEngine | None = None,
+    bam_evidence: Mapping[str, BamEvidence] | None = None,
+    sequence_context: Mapping[str, SequenceContext] | None = None,
+) -> list[PreparedVariant]:
+    """
+    Assess, map and route report rows with one pair of engines.
+
+    `bam_evidence` (from `extract_bam_evidence`) adds read-level metrics;
+    report DP and VAF take precedence over the BAM-derived depth and allele counts.
+    `sequence_context` (from `annotate_sequence_context`) flags low-complexity sites.
+    """
+    auth_engine = auth_engine or TechnicalAuthenticityEngine()
+    mapping_engine = mapping_engine or EvidenceMappingEngine()
+    prepared = []
+    for row in rows:
+        vid = variant_id(row["chrom"], int(row["pos"]), row["ref"], row["alt"])
+        try:
+            variant = VariantRecordModel(
+                variant_id=vid,
+                chrom=row["chrom"],
+                pos=int(row["pos"]),
+                ref=row["ref"],
+                alt=row["alt"],
+                gene=row.get("gene"),
+                clinvar=row.get("clinvar"),
+                gt=row.get("gt"),
+                dp=row.get("dp"),
+                gq=row.get("gq"),
+                vaf=row.get("vaf"),
+                filter=row.get("filter"),
+            )
+        except ValidationError as exc:
+            raise InputValidationError(f"{vid}: {exc}") from exc
+        # The row was validated into `variant` above; the evidence record reuses those values.
+        evidence = EvidenceRec(dp=variant.dp, gq=variant.gq, vaf=variant.vaf)
+        bam = bam_evidence.get(variant.variant_id) if bam_evidence else None
+        if bam is not None:
+            evidence.ad_ref = bam.ad_ref
+            evidence.ad_alt = bam.ad_alt
+            evidence.strand_balance = bam.strand_balance
+            evidence.mapping_quality = bam.mapping_quality
+            evidence.base_quality = bam.base_quality
+            evidence.duplicate_rate = bam.duplicate_rate
+            if evidence.dp is None:
+                evidence.dp = bam.dp
+        context = sequence_context.get(variant.variant_id) if sequence_context else None
+        if context is not None:
+            evidence.in_low_complexity_region = context.low_complexity
+        authenticity = auth_engine.assess(variant, evidence)
+        evidence_map = mapping_engine.map(
+            variant,
+            annotations={"clinvar": row.get("clinvar"), "consequence": row.get("consequence")},
+            authenticity=authenticity,
+        )
+        queue = route_review_queue(authenticity, evidence_map)
+        prepared.append(PreparedVariant(variant, authenticity, evidence_map, queue))
+    return prepared
+
+
+def generate_packets(
+    prepared: Sequence[PreparedVariant],
+    use_llm: bool = False,
+    cache: LlmResponseCache | None = None,
+    workers: int = 1,
+) -> list[ReviewPacket | Exception]:
+    """
+    Build one packet per variant, in input order.
+
+    LLM packets run in a thread pool; a failing variant yields its exception
+    instead of aborting the others.
+    """
+    generator = ReviewPacketGenerator()
+
+    def build(p: PreparedVariant) -> ReviewPacket | Exception:
+        try:
+            return generator.generate(p.variant, p.authenticity, p.evidence_map, use_llm=use_llm, cache=cache)
+        except Exception as exc:
+            return exc
+
+    if not use_llm or workers <= 1 or len(prepared) <= 1:
+        return [build(p) for p in prepared]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(build, prepared))
+
+
+def packet_stem(vid: str) -> str:
+    stem = safe_token(vid)
+    if len(stem) > MAX_STEM_LEN:
+        stem = f"{stem[:MAX_STEM_LEN - 17]}_{hashlib.sha256(vid.encode('utf-8')).hexdigest()[:16]}"
+    return stem
+
+
+def packet_markdown(case_id: str, queue: str, packet: ReviewPacket) -> str:
+    return (
+        "\n".join(
+            [
+                f"# Review Packet: {case_id}",
+                "",
+                f"Variant: `{packet.variant_id}`",
+                f"Queue: `{queue}`",
+                "",
+                "## Summary",
+                packet.summary,
+                "",
+                "## Technical",
+                packet.technical_summary,
+                "",
+                "## Evidence",
+                packet.evidence_summary,
+                "",
+                "## Recommended Actions",
+                *[f"- {x}" for x in packet.recommended_actions],
+                "",
+                "## Draft Rationale",
+                packet.draft_rationale,
+            ]
+        )
+        + "\n"
+    )
+
+
+def write_review_packet(
+    case_id: str,
+    queue: str,
+    variant: dict[str, Any],
+    authenticity: dict[str, Any],
+    evidence_map: dict[str, Any],
+    packet: ReviewPacket,
+    out_json: Path,
+    out_md: Path,
+    audit_payload: dict[str, Any] | None = None,
+) -> AuditEvent:
+    """Write the packet JSON/Markdown and return its audit event for the caller to append."""
+    out_json.parent.mkdir(parents=True, exist_ok=True)
+    out_md.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "case_id": case_id,
+        "queue": queue,
+        "variant": variant,
+        "authenticity": authenticity,
+        "evidence_map": evidence_map,
+        "packet": packet.model_dump(),
+    }
+    out_json.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    out_md.write_text(packet_markdown(case_id, queue, packet), encoding="utf-8")
+    return AuditEvent(
+        event_type="review_packet_generated",
+        case_id=case_id,
+        variant_id=packet.variant_id,
+        payload={
+            "queue": queue,
+            **(audit_payload or {}),
+            "llm_cache_hit": packet.llm_cache_hit,
+            "grounding_hash": packet.grounding_hash,
+            "packet_path": str(out_json),
+        },
+    )
+
+
+def write_queue_index(path: Path, case_id: str, entries: Sequence[dict[str, Any]]) -> None:
+    """Per-variant queue assignments plus per-queue counts, for reviewers picking up a case."""
+    counts: dict[str, int] = {}
+    for entry in entries:
+        counts[entry["queue"]] = counts.get(entry["queue"], 0) + 1
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps({"case_id": case_id, "queue_counts": counts, "variants": list(entries)}, indent=2),
+        encoding="utf-8",
+    )
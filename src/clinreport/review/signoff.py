@@ -1,28 +1,228 @@
 from __future__ import annotations
 
 import json
+import os
+import sqlite3
+from collections.abc import Callable, Iterator
 from pathlib import Path
+from typing import Any, TypeVar
 
 from ..core.models import ReviewerDecision
+from .locks import drop_torn_tail, file_lock
+from .store import ReviewStore, is_store_path, transaction
 
+# The decisions file is JSON Lines, one decision per line, only ever appended to
+# (or a `ReviewStore` when the path ends in .sqlite/.db).
+# `<path>.idx` is a small SQLite index of (case_id, variant_id) -> byte offsets of
+# its decisions, plus how many bytes of the log it covers.
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS offsets (
+    case_id TEXT NOT NULL,
+    variant_id TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    PRIMARY KEY (case_id, variant_id, offset)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
 
-def _read_json(path: Path) -> dict:
+
+T = TypeVar("T")
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+def _open_index(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(index_path(path), isolation_level=None)
+    conn.executescript(_INDEX_SCHEMA)
+    return conn
+
+
+def _indexed_bytes(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT value FROM meta WHERE key = 'offsets_bytes'").fetchone()
+    return row[0] if row else 0
+
+
+def _lookup(conn: sqlite3.Connection, case_id: str, variant_id: str) -> int | None:
+    row = conn.execute(
+        "SELECT MAX(offset) FROM offsets WHERE case_id = ? AND variant_id = ?", (case_id, variant_id)
+    ).fetchone()
+    return row[0]
+
+
+def _lookup_all(conn: sqlite3.Connection, case_id: str, variant_id: str | None) -> list[int]:
+    if variant_id is None:
+        cur = conn.execute("SELECT offset FROM offsets WHERE case_id = ? ORDER BY offset", (case_id,))
+    else:
+        cur = conn.execute(
+            "SELECT offset FROM offsets WHERE case_id = ? AND variant_id = ? ORDER BY offset", (case_id, variant_id)
+        )
+    return [r[0] for r in cur]
+
+
+def _is_legacy(path: Path) -> bool:
+    """
+    True for the original single-document `{"decisions": [...]}` format.
+
+    That format was written indented, so its first line is a lone `{`. Any other
+    unparsable first line is a torn JSON Lines append, left for `drop_torn_tail`.
+    """
     if not path.exists():
-        return {"decisions": []}
-    return json.loads(path.read_text(encoding="utf-8"))
+        return False
+    with path.open("rb") as fh:
+        first = fh.readline()
+    if first in (b"{\n", b"{\r\n"):
+        return True
+    try:
+        item = json.loads(first)
+    except json.JSONDecodeError:
+        return False
+    return isinstance(item, dict) and "decisions" in item
+
+
+def _read_legacy(path: Path) -> list[dict[str, Any]]:
+    return json.loads(path.read_text(encoding="utf-8")).get("decisions", [])
+
+
+def _migrate_legacy(path: Path) -> None:
+    """Rewrite a legacy decisions file as JSON Lines; caller holds the write lock."""
+    lines = "".join(json.dumps(d) + "\n" for d in _read_legacy(path))
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(lines, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _sync_index(path: Path, conn: sqlite3.Connection) -> None:
+    """Index log lines appended since the last sync; a log shorter than the index is reindexed."""
+    size = path.stat().st_size if path.exists() else 0
+    done = _indexed_bytes(conn)
+    if done == size:
+        return
+    rows = []
+    with transaction(conn):
+        if done > size:
+            conn.execute("DELETE FROM offsets")
+            done = 0
+        offset = done
+        with path.open("rb") as fh:
+            fh.seek(done)
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break
+                if line.strip():
+                    item = json.loads(line)
+                    rows.append((item["case_id"], item["variant_id"], offset))
+                offset += len(line)
+        conn.executemany("INSERT OR REPLACE INTO offsets VALUES (?, ?, ?)", rows)
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('offsets_bytes', ?)", (offset,))
 
 
 def save_reviewer_decision(path: Path, decision: ReviewerDecision) -> None:
-    payload = _read_json(path)
-    payload.setdefault("decisions", [])
-    payload["decisions"].append(decision.model_dump())
+    """Append one decision under an exclusive lock and update the index."""
+    if is_store_path(path):
+        with ReviewStore(path) as store:
+            store.add_decision(decision)
+        return
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    line = (decision.model_dump_json() + "\n").encode("utf-8")
+    with file_lock(path):
+        if _is_legacy(path):
+            _migrate_legacy(path)
+        fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            drop_torn_tail(fd)
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        conn = _open_index(path)
+        try:
+            _sync_index(path, conn)
+        finally:
+            conn.close()
+
+
+def _query_index(path: Path, query: Callable[[sqlite3.Connection], T]) -> T:
+    if index_path(path).exists():
+        with file_lock(path, shared=True):
+            conn = _open_index(path)
+            try:
+                if _indexed_bytes(conn) == path.stat().st_size:
+                    return query(conn)
+            finally:
+                conn.close()
+    # Index missing or behind the log (copied case directory, interrupted writer).
+    with file_lock(path):
+        conn = _open_index(path)
+        try:
+            _sync_index(path, conn)
+            return query(conn)
+        finally:
+            conn.close()
+
+
+def _indexed_offset(path: Path, case_id: str, variant_id: str) -> int | None:
+    return _query_index(path, lambda conn: _lookup(conn, case_id, variant_id))
+
+
+def latest_decision(path: Path, case_id: str, variant_id: str) -> dict[str, Any] | None:
+    if not path.exists():
+        return None
+    if is_store_path(path):
+        with ReviewStore(path) as store:
+            return store.latest_decision(case_id, variant_id)
+    if _is_legacy(path):
+        found = [d for d in _read_legacy(path) if d.get("case_id") == case_id and d.get("variant_id") == variant_id]
+        return found[-1] if found else None
+    offset = _indexed_offset(path, case_id, variant_id)
+    if offset is None:
+        return None
+    with path.open("rb") as fh:
+        fh.seek(offset)
+        return json.loads(fh.readline())
 
 
 def has_signoff(path: Path, case_id: str, variant_id: str) -> bool:
-    payload = _read_json(path)
-    for item in payload.get("decisions", []):
-        if item.get("case_id") == case_id and item.get("variant_id") == variant_id:
-            return True
-    return False
+    if not path.exists():
+        return False
+    if is_store_path(path) or _is_legacy(path):
+        return latest_decision(path, case_id, variant_id) is not None
+    return _indexed_offset(path, case_id, variant_id) is not None
+
+
+def iter_decisions(
+    path: Path, case_id: str | None = None, variant_id: str | None = None
+) -> Iterator[dict[str, Any]]:
+    """
+    Decisions in write order, optionally for one case (and variant); a torn final line is skipped.
+
+    Filtered reads of a JSON Lines log seek straight to the indexed lines.
+    """
+    if not path.exists():
+        return
+    if variant_id is not None and case_id is None:
+        raise ValueError("variant_id filter requires case_id")
+    if is_store_path(path):
+        with ReviewStore(path) as store:
+            yield from store.decisions(case_id=case_id, variant_id=variant_id)
+        return
+    if _is_legacy(path):
+        for item in _read_legacy(path):
+            if (case_id is None or item.get("case_id") == case_id) and (
+                variant_id is None or item.get("variant_id") == variant_id
+            ):
+                yield item
+        return
+    with path.open("rb") as fh:
+        if case_id is None:
+            for line in fh:
+                if line.endswith(b"\n") and line.strip():
+                    yield json.loads(line)
+            return
+        for offset in _query_index(path, lambda conn: _lookup_all(conn, case_id, variant_id)):
+            fh.seek(offset)
+            yield json.loads(fh.readline())
+
+
+def load_decisions(path: Path, case_id: str | None = None, variant_id: str | None = None) -> list[dict[str, Any]]:
+    return list(iter_decisions(path, case_id, variant_id))
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from ..core.models import AuditEvent, ReviewerDecision
+
+# Decision/audit paths with these suffixes are SQLite review stores instead of JSON Lines files.
+STORE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    id INTEGER PRIMARY KEY,
+    case_id TEXT NOT NULL,
+    variant_id TEXT NOT NULL,
+    decision TEXT NOT NULL,
+    reviewer TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS decisions_variant ON decisions (case_id, variant_id);
+CREATE TABLE IF NOT EXISTS audit_events (
+    id INTEGER PRIMARY KEY,
+    case_id TEXT NOT NULL,
+    variant_id TEXT,
+    event_type TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS audit_case ON audit_events (case_id, variant_id);
+CREATE INDEX IF NOT EXISTS audit_type ON audit_events (event_type);
+CREATE TABLE IF NOT EXISTS packets (
+    case_id TEXT NOT NULL,
+    variant_id TEXT NOT NULL,
+    gene TEXT,
+    queue TEXT NOT NULL,
+    packet_json TEXT,
+    packet_md TEXT,
+    error TEXT,
+    PRIMARY KEY (case_id, variant_id)
+);
+CREATE INDEX IF NOT EXISTS packets_queue ON packets (queue);
+"""
+
+
+def is_store_path(path: Path) -> bool:
+    return path.suffix.lower() in STORE_SUFFIXES
+
+
+@contextmanager
+def transaction(db: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    Write transaction on an autocommit (`isolation_level=None`) connection.
+
+    `with db:` does not open one in that mode, so BEGIN IMMEDIATE is explicit;
+    it also takes the write lock up front instead of upgrading mid-transaction.
+    """
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        yield db
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    db.execute("COMMIT")
+
+
+class ReviewStore:
+    """
+    Review decisions, audit events and packet queue assignments in one SQLite file.
+
+    WAL mode lets reviewers read while another process writes; writers wait
+    up to `timeout_s` for each other. Safe to share between threads.
+    """
+
+    def __init__(self, path: Path, timeout_s: float = 30.0):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), timeout=timeout_s, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> ReviewStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def add_decision(self, decision: ReviewerDecision) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO decisions (case_id, variant_id, decision, reviewer, timestamp, body)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    decision.case_id,
+                    decision.variant_id,
+                    decision.decision,
+                    decision.reviewer,
+                    decision.timestamp,
+                    decision.model_dump_json(),
+                ),
+            )
+
+    def latest_decision(self, case_id: str, variant_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body FROM decisions WHERE case_id = ? AND variant_id = ? ORDER BY id DESC LIMIT 1",
+                (case_id, variant_id),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def has_signoff(self, case_id: str, variant_id: str) -> bool:
+        return self.latest_decision(case_id, variant_id) is not None
+
+    def decisions(self, case_id: str | None = None, variant_id: str | None = None) -> list[dict[str, Any]]:
+        where, params = _filters(case_id=case_id, variant_id=variant_id)
+        with self._lock:
+            rows = self._db.execute(f"SELECT body FROM decisions{where} ORDER BY id", params).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def append_events(self, events: Sequence[AuditEvent]) -> None:
+        """Insert a group of events in one transaction."""
+        rows = [(e.case_id, e.variant_id, e.event_type, e.timestamp, e.model_dump_json()) for e in events]
+        with self._lock, transaction(self._db):
+            self._db.executemany(
+                "INSERT INTO audit_events (case_id, variant_id, event_type, timestamp, body) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def iter_events(
+        self, case_id: str | None = None, variant_id: str | None = None, event_type: str | None = None
+    ) -> Iterator[dict[str, Any]]:
+        where, params = _filters(case_id=case_id, variant_id=variant_id, event_type=event_type)
+        with self._lock:
+            rows = self._db.execute(f"SELECT body FROM audit_events{where} ORDER BY id", params).fetchall()
+        for (body,) in rows:
+            yield json.loads(body)
+
+    def put_packets(self, case_id: str, entries: Sequence[dict[str, Any]]) -> None:
+        """Record queue assignments (`write_queue_index` entries); a regenerated packet replaces the old row."""
+        rows = [
+            (
+                case_id,
+                e["variant_id"],
+                e.get("gene"),
+                e["queue"],
+                e.get("packet_json"),
+                e.get("packet_md"),
+                e.get("error"),
+            )
+            for e in entries
+        ]
+        with self._lock, transaction(self._db):
+            self._db.executemany("INSERT OR REPLACE INTO packets VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def queue_entries(
+        self, case_id: str | None = None, queue: str | None = None, unsigned_only: bool = False
+    ) -> list[dict[str, Any]]:
+        """Packet queue assignments, optionally only variants without any reviewer decision."""
+        where, params = _filters("p", case_id=case_id, queue=queue)
+        if unsigned_only:
+            where += (" AND" if where else " WHERE") + (
+                " NOT EXISTS (SELECT 1 FROM decisions d WHERE d.case_id = p.case_id AND d.variant_id = p.variant_id)"
+            )
+        with self._lock:
+            cur = self._db.execute(
+                "SELECT p.case_id, p.variant_id, p.gene, p.queue, p.packet_json, p.packet_md, p.error"
+                f" FROM packets p{where} ORDER BY p.case_id, p.queue, p.variant_id",
+                params,
+            )
+            names = [c[0] for c in cur.description]
+            rows = cur.fetchall()
+        return [{k: v for k, v in zip(names, row, strict=True) if v is not None} for row in rows]
+
+    def export_json(self, out_dir: Path, case_id: str | None = None) -> list[Path]:
+        """
+        Write the store back out in the file formats: `signoff_decisions.json`,
+        `audit.jsonl` and, for a single case, `queue_index.json`.
+        """
+        from .packets import write_queue_index
+
+        out_dir.mkdir(parents=True, exist_ok=True)
+        decisions_path = out_dir / "signoff_decisions.json"
+        audit_path = out_dir / "audit.jsonl"
+        with decisions_path.open("w", encoding="utf-8") as fh:
+            for item in self.decisions(case_id=case_id):
+                fh.write(json.dumps(item) + "\n")
+        with audit_path.open("w", encoding="utf-8") as fh:
+            for event in self.iter_events(case_id=case_id):
+                fh.write(json.dumps(event) + "\n")
+        written = [decisions_path, audit_path]
+        if case_id is not None:
+            entries = [
+                {k: v for k, v in e.items() if k != "case_id"} for e in self.queue_entries(case_id=case_id)
+            ]
+            write_queue_index(out_dir / "queue_index.json", case_id, entries)
+            written.append(out_dir / "queue_index.json")
+        return written
+
+
+def _filters(alias: str = "", **values: str | None) -> tuple[str, tuple[str, ...]]:
+    prefix = f"{alias}." if alias else ""
+    used = [(k, v) for k, v in values.items() if v is not None]
+    if not used:
+        return "", ()
+    return " WHERE " + " AND ".join(f"{prefix}{k} = ?" for k, _ in used), tuple(v for _, v in used)
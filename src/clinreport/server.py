@@ -0,0 +1,434 @@
+from __future__ import annotations
+
+import hmac
+import http.client
+import io
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, TextIO
+from urllib.parse import parse_qs, urlsplit
+
+import typer
+from typer.core import TyperCommand
+
+from .config import settings
+from .exceptions import ClinReportError, ExternalToolError, InputValidationError
+
+log = logging.getLogger(__name__)
+
+# Job kinds accepted by `clinreport serve` and the CLI command each one runs.
+JOB_COMMANDS = {"run": "run", "igv": "igv", "packet": "review-packet", "signoff": "signoff"}
+JOB_STATES = ("queued", "running", "done", "failed")
+
+_local = threading.local()
+
+
+def serving() -> bool:
+    """True inside a `clinreport serve` worker, where commands run locally instead of being forwarded."""
+    return getattr(_local, "output", None) is not None
+
+
+class _JobOutput(io.TextIOBase):
+    """sys.stdout replacement that sends each worker thread's output to its job."""
+
+    def __init__(self, stream: TextIO):
+        self._stream = stream
+
+    @property
+    def encoding(self) -> str:
+        return getattr(self._stream, "encoding", None) or "utf-8"
+
+    @property
+    def errors(self) -> str | None:
+        return getattr(self._stream, "errors", None)
+
+    def write(self, text: str) -> int:
+        out = getattr(_local, "output", None)
+        return (out if out is not None else self._stream).write(text)
+
+    def flush(self) -> None:
+        if getattr(_local, "output", None) is None:
+            self._stream.flush()
+
+
+def _capture_stdout() -> None:
+    # Re-applied per job in case something (a test runner, say) swapped sys.stdout since.
+    if not isinstance(sys.stdout, _JobOutput):
+        sys.stdout = _JobOutput(sys.stdout)
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    params: dict[str, Any]
+    status: str = "queued"
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    output: str = ""
+    error: str | None = None
+    error_type: str | None = None
+    finished: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "output": self.output,
+            "error": self.error,
+            "error_type": self.error_type,
+        }
+
+
+class QueueFullError(ClinReportError):
+    """Raised when the job queue is at capacity."""
+
+
+class JobServer:
+    """
+    Bounded job queue drained by `workers` threads that run CLI commands in this process.
+
+    Imports, compiled templates, ClinVar/panel resources and LLM clients are
+    loaded on first use and stay warm for every later job. `submit` refuses
+    new jobs once `queue_size` are waiting. The newest `max_history` finished
+    jobs are kept for status queries.
+    """
+
+    def __init__(self, workers: int = 4, queue_size: int = 64, max_history: int = 1000):
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.max_history = max_history
+        self.started_at = time.time()
+        self._queue: queue.Queue[Job | None] = queue.Queue(maxsize=self.queue_size)
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        _capture_stdout()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"clinreport-job-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def shutdown(self) -> None:
+        """Finish the queued and running jobs, then stop the workers."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+        self._threads = []
+        if isinstance(sys.stdout, _JobOutput):
+            sys.stdout = sys.stdout._stream
+
+    def submit(self, kind: str, params: dict[str, Any]) -> Job:
+        job = Job(id=uuid.uuid4().hex, kind=kind, params=_command_params(kind, params))
+        with self._lock:
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full as exc:
+                raise QueueFullError(f"Job queue is full ({self.queue_size} waiting); retry later.") from exc
+            self._jobs[job.id] = job
+            self._trim()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def status(self) -> dict[str, Any]:
+        from .pipeline import warm_resources
+        from .report.render import report_template
+
+        counts = dict.fromkeys(JOB_STATES, 0)
+        for job in self.jobs():
+            counts[job.status] += 1
+        return {
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "jobs": counts,
+            "warm": {"templates": report_template.cache_info().currsize, **warm_resources()},
+        }
+
+    def _trim(self) -> None:
+        finished = [j.id for j in self._jobs.values() if j.finished.is_set()]
+        for job_id in finished[: max(0, len(finished) - self.max_history)]:
+            del self._jobs[job_id]
+
+    def _work(self) -> None:
+        while (job := self._queue.get()) is not None:
+            self._execute(job)
+
+    def _execute(self, job: Job) -> None:
+        job.status, job.started_at = "running", time.time()
+        out = io.StringIO()
+        _capture_stdout()
+        _local.output = out
+        try:
+            _command(job.kind).callback(**job.params)
+        except typer.Exit as exc:
+            if exc.exit_code:
+                job.error, job.error_type = f"exited with code {exc.exit_code}", "Exit"
+        except Exception as exc:
+            # Failures stay with the job; the worker moves on to the next one.
+            log.warning("Job %s (%s) failed: %s", job.id, job.kind, exc, exc_info=not isinstance(exc, ClinReportError))
+            job.error, job.error_type = str(exc) or type(exc).__name__, type(exc).__name__
+        finally:
+            _local.output = None
+            job.output = out.getvalue()
+            job.status = "failed" if job.error_type else "done"
+            job.finished_at = time.time()
+            job.finished.set()
+
+
+@lru_cache(maxsize=len(JOB_COMMANDS))
+def _command(kind: str) -> TyperCommand:
+    from typer.main import get_command
+
+    from .cli import app
+
+    return get_command(app).commands[JOB_COMMANDS[kind]]
+
+
+def _command_params(kind: str, raw: dict[str, Any]) -> dict[str, Any]:
+    """Validate submitted values with the command's own option types, filling in defaults."""
+    if kind not in JOB_COMMANDS:
+        raise InputValidationError(f"Unknown job kind {kind!r}; expected one of {', '.join(JOB_COMMANDS)}.")
+    command = _command(kind)
+    names = {p.name for p in command.params}
+    unknown = sorted(set(raw) - names)
+    if unknown:
+        raise InputValidationError(f"Unknown parameter(s) for {kind}: {', '.join(unknown)}")
+    ctx = command.context_class(command)
+    params = {}
+    for p in command.params:
+        value = raw[p.name] if p.name in raw else p.get_default(ctx)
+        try:
+            params[p.name] = p.process_value(ctx, value)
+        except Exception as exc:
+            # Click usage errors (missing option, bad value, path does not exist).
+            if not hasattr(exc, "format_message"):
+                raise
+            raise InputValidationError(f"{kind}: {exc.format_message()}") from exc
+    return params
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "clinreport"
+    jobs: JobServer
+    token: str | None = None
+
+    def log_message(self, format: str, *args: Any) -> None:
+        log.debug(format, *args)
+
+    def _send(self, code: int, body: dict[str, Any] | list[Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self) -> bool:
+        if self.token is None:
+            return True
+        supplied = self.headers.get("Authorization", "")
+        if hmac.compare_digest(supplied.encode("utf-8"), f"Bearer {self.token}".encode()):
+            return True
+        self._send(401, {"error": "missing or wrong bearer token"})
+        return False
+
+    def do_GET(self) -> None:
+        if not self._authorized():
+            return
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if parts == ["status"]:
+            self._send(200, self.jobs.status())
+        elif parts == ["jobs"]:
+            self._send(200, [j.to_dict() | {"output": None} for j in self.jobs.jobs()])
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                self._send(404, {"error": f"no job {parts[1]}"})
+                return
+            wait = float(parse_qs(url.query).get("wait", ["0"])[0])
+            if wait > 0:
+                job.finished.wait(min(wait, 60.0))
+            self._send(200, job.to_dict())
+        else:
+            self._send(404, {"error": f"unknown path {url.path}"})
+
+    def do_POST(self) -> None:
+        if not self._authorized():
+            return
+        if urlsplit(self.path).path.rstrip("/") != "/jobs":
+            self._send(404, {"error": f"unknown path {self.path}"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            job = self.jobs.submit(str(body.get("kind")), dict(body.get("params") or {}))
+        except QueueFullError as exc:
+            self._send(503, {"error": str(exc)})
+        except (InputValidationError, ValueError, AttributeError) as exc:
+            self._send(400, {"error": str(exc)})
+        else:
+            self._send(202, job.to_dict())
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self) -> tuple[socket.socket, Any]:
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address.
+        return request, ("local", 0)
+
+
+def make_server(
+    jobs: JobServer,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Path | None = None,
+    token: str | None = None,
+) -> socketserver.BaseServer:
+    """
+    HTTP front end for `jobs` on a Unix socket (mode 0600) if `socket_path` is
+    given, else on a TCP port. Any local user can reach a TCP port, so TCP
+    requires `token`, which clients send as `Authorization: Bearer <token>`.
+    """
+    handler = type("Handler", (_Handler,), {"jobs": jobs, "token": token or None})
+    if socket_path is None:
+        if not token:
+            raise InputValidationError("A TCP listener requires a token (set CLINREPORT_SERVER_TOKEN).")
+        return ThreadingHTTPServer((host, port), handler)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    socket_path.unlink(missing_ok=True)
+    server = _UnixHTTPServer(str(socket_path), handler)
+    os.chmod(socket_path, 0o600)
+    return server
+
+
+def server_url(host: str, port: int, socket_path: Path | None) -> str:
+    return f"unix:{socket_path}" if socket_path is not None else f"http://{host}:{port}"
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+class ServerClient:
+    """Client for a running `clinreport serve` at `http://host:port` or `unix:/path/to.sock`."""
+
+    def __init__(self, url: str, timeout_s: float = 90.0, token: str | None = None):
+        self.url = url
+        self.timeout_s = timeout_s
+        self.token = token
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self.url.startswith("unix:"):
+            return _UnixHTTPConnection(self.url[len("unix:") :], self.timeout_s)
+        parts = urlsplit(self.url)
+        return http.client.HTTPConnection(parts.hostname or "127.0.0.1", parts.port or 80, timeout=self.timeout_s)
+
+    def request(self, method: str, path: str, body: dict[str, Any] | None = None) -> tuple[int, Any]:
+        conn = self._connection()
+        try:
+            data = json.dumps(body).encode("utf-8") if body is not None else None
+            headers = {"Content-Type": "application/json"} if data is not None else {}
+            if self.token:
+                headers["Authorization"] = f"Bearer {self.token}"
+            conn.request(method, path, body=data, headers=headers)
+            resp = conn.getresponse()
+            reply = json.loads(resp.read() or b"null")
+        finally:
+            conn.close()
+        if resp.status == 401:
+            raise InputValidationError(f"clinreport server at {self.url} rejected the request: {reply['error']}")
+        return resp.status, reply
+
+    def status(self) -> dict[str, Any]:
+        return self.request("GET", "/status")[1]
+
+    def submit(self, kind: str, params: dict[str, Any]) -> dict[str, Any]:
+        code, body = self.request("POST", "/jobs", {"kind": kind, "params": params})
+        if code == 400:
+            raise InputValidationError(body["error"])
+        if code != 202:
+            raise ExternalToolError(f"clinreport server refused the job: {body.get('error', code)}")
+        return body
+
+    def wait(self, job_id: str) -> dict[str, Any]:
+        while True:
+            code, job = self.request("GET", f"/jobs/{job_id}?wait=30")
+            if code != 200:
+                raise ExternalToolError(f"clinreport server lost job {job_id}: {job.get('error', code)}")
+            if job["status"] in ("done", "failed"):
+                return job
+
+
+def _client_value(value: Any, path_like: bool) -> Any:
+    # The daemon has its own working directory, so paths are sent absolute.
+    if isinstance(value, Path) or (path_like and isinstance(value, str) and os.path.exists(value)):
+        return str(Path(value).absolute())
+    return value
+
+
+def forward_to_server(kind: str, params: dict[str, Any], path_params: tuple[str, ...] = ()) -> bool:
+    """
+    Run a command as a `clinreport serve` job when CLINREPORT_SERVER_URL is set
+    and the daemon answers: print its output and raise if it failed.
+    `path_params` names string options that may hold a local file path.
+
+    Returns False (the caller runs the command itself) when no daemon is
+    configured or reachable, or when already running inside one.
+    """
+    if not settings.server_url or serving():
+        return False
+    client = ServerClient(settings.server_url, token=settings.server_token)
+    try:
+        job = client.submit(kind, {k: _client_value(v, k in path_params) for k, v in params.items()})
+    except OSError as exc:
+        log.info("clinreport server at %s not reachable (%s); running locally.", settings.server_url, exc)
+        return False
+    try:
+        job = client.wait(job["id"])
+    except OSError as exc:
+        raise ExternalToolError(f"Lost connection to clinreport server while waiting for job {job['id']}: {exc}") from exc
+    if job["output"]:
+        typer.echo(job["output"], nl=False)
+    if job["status"] == "failed":
+        error_cls = InputValidationError if job["error_type"] == "InputValidationError" else ExternalToolError
+        raise error_cls(f"Server job {job['id']} ({kind}) failed: {job['error']}")
+    return True
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import subprocess
+import tempfile
+from collections.abc import Iterator, Sequence
+
+from .exceptions import ExternalToolError
+
+
+def iter_output_lines(cmd: Sequence[str], description: str) -> Iterator[str]:
+    """
+    Yield a tool's stdout lines; raise ExternalToolError with its stderr if it exits non-zero.
+
+    stderr goes to a temporary file, not a pipe, so a tool that writes a lot of
+    warnings cannot block on a full stderr pipe while stdout is still being read.
+    A consumer that stops early gets the process killed and reaped.
+    """
+    with tempfile.TemporaryFile() as err:
+        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err, text=True)
+        assert p.stdout is not None
+        try:
+            yield from p.stdout
+            returncode = p.wait()
+        finally:
+            if p.poll() is None:
+                p.kill()
+            p.wait()
+            p.stdout.close()
+        if returncode != 0:
+            err.seek(0)
+            stderr = err.read().decode("utf-8", errors="replace")
+            raise ExternalToolError(f"{description} failed:\n{stderr}")
@@ -1,16 +1,101 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass
 
+import numpy as np
+
 from ..core.models import AuthenticityAssessment, TechnicalEvidence, VariantRecordModel
+from ..core.records import EvidenceRec, VariantRec
+
+LABELS = ("likely_real", "uncertain", "likely_artifact")
+# Bit i of a tag/reason mask is the i-th name; names are sorted so decoding yields sorted lists.
+TAG_BITS = ("duplicate_support", "low_complexity_region", "low_mapq", "low_vaf", "strand_bias", "weak_support")
+REASON_BITS = (
+    "adequate_vaf",
+    "failed_filter",
+    "good_depth",
+    "good_genotype_quality",
+    "high_duplicate_rate",
+    "low_base_quality",
+    "low_complexity_region",
+    "low_depth",
+    "low_genotype_quality",
+    "low_mapping_quality",
+    "low_vaf",
+    "strand_bias",
+    "very_low_vaf",
+)
+_TAG = {name: np.uint8(1 << i) for i, name in enumerate(TAG_BITS)}
+_REASON = {name: np.uint16(1 << i) for i, name in enumerate(REASON_BITS)}
+
+
+def filter_passes(value: str | None) -> bool:
+    return not value or value in ("PASS", ".", "")
+
+
+def decode_bits(mask: int, names: Sequence[str]) -> list[str]:
+    return [name for i, name in enumerate(names) if mask >> i & 1]
+
+
+@dataclass(frozen=True)
+class AuthenticityBatch:
+    """Column-wise assessments; `score`/`confidence` are rounded exactly as in `assess`."""
+
+    variant_ids: Sequence[str] | None
+    score: np.ndarray
+    confidence: np.ndarray
+    label_code: np.ndarray
+    tag_bits: np.ndarray
+    reason_bits: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.score)
+
+    def labels(self) -> np.ndarray:
+        return np.asarray(LABELS, dtype=object)[self.label_code]
+
+    def assessment(self, i: int) -> AuthenticityAssessment:
+        return AuthenticityAssessment(
+            variant_id=self.variant_ids[i] if self.variant_ids is not None else str(i),
+            authenticity_score=float(self.score[i]),
+            confidence=float(self.confidence[i]),
+            label=LABELS[self.label_code[i]],
+            artifact_tags=decode_bits(int(self.tag_bits[i]), TAG_BITS),
+            reason_codes=decode_bits(int(self.reason_bits[i]), REASON_BITS),
+        )
+
+    def to_models(self) -> list[AuthenticityAssessment]:
+        return [self.assessment(i) for i in range(len(self))]
+
+
+def _column(values: Sequence | np.ndarray | None, n: int) -> np.ndarray:
+    """Float column with NaN for missing values (None)."""
+    if values is None:
+        return np.full(n, np.nan)
+    if isinstance(values, np.ndarray):
+        return values.astype(float, copy=False)
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+def _round3(values: np.ndarray) -> np.ndarray:
+    # Python's round() is correctly rounded and np.round is not; scores take few distinct values.
+    uniq, inverse = np.unique(values, return_inverse=True)
+    return np.array([round(float(u), 3) for u in uniq])[inverse]
 
 
 @dataclass
 class TechnicalAuthenticityEngine:
     min_dp: int = 10
     min_gq: int = 20
+    min_strand_balance: float = 0.1
+    min_mapping_quality: float = 30.0
+    min_base_quality: float = 20.0
+    max_duplicate_rate: float = 0.3
 
-    def assess(self, variant: VariantRecordModel, context: TechnicalEvidence) -> AuthenticityAssessment:
+    def assess(
+        self, variant: VariantRecordModel | VariantRec, context: TechnicalEvidence | EvidenceRec
+    ) -> AuthenticityAssessment:
         score = 0.5
         reasons: list[str] = []
         tags: list[str] = []
@@ -57,11 +142,32 @@ class TechnicalAuthenticityEngine:
             reasons.append("low_complexity_region")
             tags.append("low_complexity_region")
 
-        if variant.filter and variant.filter not in ("PASS", ".", ""):
+        if not filter_passes(variant.filter):
             score -= 0.2
             reasons.append("failed_filter")
             tags.append("weak_support")
 
+        # Read-level terms; None when no BAM evidence was extracted.
+        if context.strand_balance is not None and context.strand_balance < self.min_strand_balance:
+            score -= 0.1
+            reasons.append("strand_bias")
+            tags.append("strand_bias")
+
+        if context.mapping_quality is not None and context.mapping_quality < self.min_mapping_quality:
+            score -= 0.1
+            reasons.append("low_mapping_quality")
+            tags.append("low_mapq")
+
+        if context.base_quality is not None and context.base_quality < self.min_base_quality:
+            score -= 0.05
+            reasons.append("low_base_quality")
+            tags.append("weak_support")
+
+        if context.duplicate_rate is not None and context.duplicate_rate > self.max_duplicate_rate:
+            score -= 0.1
+            reasons.append("high_duplicate_rate")
+            tags.append("duplicate_support")
+
         score = max(0.0, min(1.0, score))
 
         if score >= 0.7:
@@ -82,3 +188,81 @@ class TechnicalAuthenticityEngine:
             artifact_tags=sorted(set(tags)),
             reason_codes=sorted(set(reasons)),
         )
+
+    def assess_batch(
+        self,
+        n: int,
+        dp: Sequence | np.ndarray | None = None,
+        gq: Sequence | np.ndarray | None = None,
+        vaf: Sequence | np.ndarray | None = None,
+        ad_ref: Sequence | np.ndarray | None = None,
+        ad_alt: Sequence | np.ndarray | None = None,
+        filter_pass: Sequence[bool] | np.ndarray | None = None,
+        low_complexity: Sequence[bool] | np.ndarray | None = None,
+        strand_balance: Sequence | np.ndarray | None = None,
+        mapping_quality: Sequence | np.ndarray | None = None,
+        base_quality: Sequence | np.ndarray | None = None,
+        duplicate_rate: Sequence | np.ndarray | None = None,
+        variant_ids: Sequence[str] | None = None,
+    ) -> AuthenticityBatch:
+        """
+        Vectorized `assess` over `n` variants given as columns (None/NaN = missing).
+
+        Score terms are added in the same order as the scalar path, so results
+        match it exactly; build models with `AuthenticityBatch.to_models()`.
+        """
+        dp_c, gq_c, vaf_c = _column(dp, n), _column(gq, n), _column(vaf, n)
+        ad_ref_c, ad_alt_c = _column(ad_ref, n), _column(ad_alt, n)
+        passed = np.ones(n, dtype=bool) if filter_pass is None else np.asarray(filter_pass, dtype=bool)
+        low_cx = np.zeros(n, dtype=bool) if low_complexity is None else np.asarray(low_complexity, dtype=bool)
+
+        score = np.full(n, 0.5)
+        tags = np.zeros(n, dtype=np.uint8)
+        reasons = np.zeros(n, dtype=np.uint16)
+
+        def apply(mask: np.ndarray, delta: float, reason: str, tag: str | None = None) -> None:
+            np.add(score, delta, out=score, where=mask)
+            reasons[mask] |= _REASON[reason]
+            if tag is not None:
+                tags[mask] |= _TAG[tag]
+
+        has_dp = ~np.isnan(dp_c)
+        apply(has_dp & (dp_c >= self.min_dp), 0.15, "good_depth")
+        apply(has_dp & ~(dp_c >= self.min_dp), -0.2, "low_depth", "weak_support")
+
+        has_gq = ~np.isnan(gq_c)
+        apply(has_gq & (gq_c >= self.min_gq), 0.1, "good_genotype_quality")
+        apply(has_gq & ~(gq_c >= self.min_gq), -0.15, "low_genotype_quality", "weak_support")
+
+        denom = ad_ref_c + ad_alt_c
+        derive = np.isnan(vaf_c) & ~np.isnan(denom) & (denom > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vaf_c = np.where(derive, ad_alt_c / denom, vaf_c)
+        has_vaf = ~np.isnan(vaf_c)
+        apply(has_vaf & (vaf_c < 0.05), -0.2, "very_low_vaf", "low_vaf")
+        apply(has_vaf & (vaf_c >= 0.05) & (vaf_c < 0.2), -0.05, "low_vaf", "low_vaf")
+        apply(has_vaf & (vaf_c >= 0.2), 0.05, "adequate_vaf")
+
+        apply(low_cx, -0.15, "low_complexity_region", "low_complexity_region")
+        apply(~passed, -0.2, "failed_filter", "weak_support")
+
+        # NaN comparisons are False, so missing read-level metrics add nothing.
+        sb, mq = _column(strand_balance, n), _column(mapping_quality, n)
+        bq, dup = _column(base_quality, n), _column(duplicate_rate, n)
+        apply(sb < self.min_strand_balance, -0.1, "strand_bias", "strand_bias")
+        apply(mq < self.min_mapping_quality, -0.1, "low_mapping_quality", "low_mapq")
+        apply(bq < self.min_base_quality, -0.05, "low_base_quality", "weak_support")
+        apply(dup > self.max_duplicate_rate, -0.1, "high_duplicate_rate", "duplicate_support")
+
+        score = np.maximum(0.0, np.minimum(1.0, score))
+        label_code = np.where(score >= 0.7, 0, np.where(score <= 0.35, 2, 1)).astype(np.int8)
+        confidence = np.maximum(0.0, np.minimum(1.0, 0.5 + np.abs(score - 0.5)))
+
+        return AuthenticityBatch(
+            variant_ids=variant_ids,
+            score=_round3(score),
+            confidence=_round3(confidence),
+            label_code=label_code,
+            tag_bits=tags,
+            reason_bits=reasons,
+        )
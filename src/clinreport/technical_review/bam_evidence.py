@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import os
+import re
+import tempfile
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from ..config import settings
+from ..exceptions import ExternalToolError
+from ..subprocess_utils import iter_output_lines
+
+# mpileup drops duplicates by default; keep them so the duplicate rate can be measured.
+PILEUP_SKIP_FLAGS = "UNMAP,SECONDARY,QCFAIL"
+DUPLICATE_FLAG = 0x400
+
+_INDEL_RE = re.compile(r"[+-](\d+)")
+
+
+@dataclass(frozen=True)
+class Locus:
+    variant_id: str
+    chrom: str
+    pos: int
+    ref: str
+    alt: str
+
+
+@dataclass(frozen=True)
+class BamEvidenceParams:
+    bam_or_cram: str
+    reference_fasta: str | None = None
+    samtools_path: str | None = None  # default: CLINREPORT_SAMTOOLS_PATH
+    max_depth: int = 10000
+    # Loci further apart than this start a new `samtools mpileup` call.
+    max_gap: int = 10000
+    max_loci_per_shard: int = 500
+
+
+@dataclass(frozen=True)
+class PileupShard:
+    chrom: str
+    start: int
+    end: int
+    loci: tuple[Locus, ...]
+
+
+@dataclass(frozen=True)
+class BamEvidence:
+    """
+    Read-level metrics at one variant site (duplicates excluded unless noted).
+
+    `strand_balance` is min(forward, reverse) / total over alt-supporting reads
+    (0 = all alt reads on one strand, 0.5 = balanced); `base_quality` is the mean
+    base quality of those reads; `mapping_quality` is the mean MAPQ of all reads;
+    `duplicate_rate` is the duplicate fraction of all reads at the site.
+    """
+
+    dp: int
+    ad_ref: int
+    ad_alt: int
+    strand_balance: float | None
+    mapping_quality: float | None
+    base_quality: float | None
+    duplicate_rate: float | None
+
+
+@dataclass(frozen=True)
+class PileupEntry:
+    base: str  # "." for reference, an upper-case base, or "*" for a deleted base
+    reverse: bool
+    indel: str  # e.g. "+2AC" or "-1T" (upper-case), "" if none
+
+
+def parse_pileup_bases(bases: str) -> list[PileupEntry]:
+    """Split an mpileup base column into one entry per read."""
+    entries: list[PileupEntry] = []
+    i, n = 0, len(bases)
+    while i < n:
+        c = bases[i]
+        if c == "^":
+            i += 2
+            continue
+        if c == "$":
+            i += 1
+            continue
+        if c in "+-":
+            m = _INDEL_RE.match(bases, i)
+            if m is None:
+                i += 1
+                continue
+            length = int(m.group(1))
+            seq = bases[m.end() : m.end() + length]
+            if entries:
+                last = entries[-1]
+                entries[-1] = PileupEntry(last.base, last.reverse, f"{c}{length}{seq.upper()}")
+            i = m.end() + length
+            continue
+        if c in ".,":
+            entries.append(PileupEntry(".", c == ",", ""))
+        elif c in "*#":
+            entries.append(PileupEntry("*", c == "#", ""))
+        elif c in "<>":
+            entries.append(PileupEntry(">", c == "<", ""))
+        else:
+            entries.append(PileupEntry(c.upper(), c.islower(), ""))
+        i += 1
+    return entries
+
+
+def _supports_alt(entry: PileupEntry, ref: str, alt: str) -> bool:
+    if len(ref) == 1 and len(alt) == 1:
+        return entry.base == alt.upper()
+    if len(alt) > len(ref) and alt.upper().startswith(ref.upper()):
+        ins = alt[len(ref) :].upper()
+        return entry.indel == f"+{len(ins)}{ins}"
+    if len(ref) > len(alt) and ref.upper().startswith(alt.upper()):
+        deleted = ref[len(alt) :].upper()
+        return entry.indel == f"-{len(deleted)}{deleted}"
+    # Complex/MNV: count reads showing the first differing base.
+    for r, a in zip(ref.upper(), alt.upper(), strict=False):
+        if r != a:
+            return entry.base == a
+    return False
+
+
+def site_evidence(locus: Locus, bases: str, quals: str, mapqs: str, flags: str) -> BamEvidence:
+    entries = parse_pileup_bases(bases) if bases != "*" else []
+    flag_values = [int(f) for f in flags.split(",")] if entries and flags not in ("", "*") else []
+    if len(flag_values) != len(entries):
+        flag_values = [0] * len(entries)
+
+    ref_base = locus.ref[:1].upper()
+    dups = 0
+    ad_ref = ad_alt = fwd_alt = 0
+    mapq_sum = 0
+    alt_bq_sum = 0
+    kept = 0
+    for j, entry in enumerate(entries):
+        if flag_values[j] & DUPLICATE_FLAG:
+            dups += 1
+            continue
+        kept += 1
+        mapq_sum += ord(mapqs[j]) - 33 if j < len(mapqs) else 0
+        if _supports_alt(entry, locus.ref, locus.alt):
+            ad_alt += 1
+            fwd_alt += not entry.reverse
+            alt_bq_sum += ord(quals[j]) - 33 if j < len(quals) else 0
+        elif entry.base in (".", ref_base) and not entry.indel:
+            # Without `-f`, mpileup prints reference-matching reads as literal bases.
+            ad_ref += 1
+
+    return BamEvidence(
+        dp=kept,
+        ad_ref=ad_ref,
+        ad_alt=ad_alt,
+        strand_balance=round(min(fwd_alt, ad_alt - fwd_alt) / ad_alt, 4) if ad_alt else None,
+        mapping_quality=round(mapq_sum / kept, 2) if kept else None,
+        base_quality=round(alt_bq_sum / ad_alt, 2) if ad_alt else None,
+        duplicate_rate=round(dups / len(entries), 4) if entries else None,
+    )
+
+
+def plan_pileup_shards(loci: Iterable[Locus], max_gap: int, max_loci: int) -> list[PileupShard]:
+    """Sort loci and group neighbours on the same contig into shards, one mpileup call each."""
+    shards: list[PileupShard] = []
+    current: list[Locus] = []
+    for locus in sorted(loci, key=lambda x: (x.chrom, x.pos)):
+        if current and (
+            locus.chrom != current[-1].chrom or locus.pos - current[-1].pos > max_gap or len(current) >= max_loci
+        ):
+            shards.append(PileupShard(current[0].chrom, current[0].pos, current[-1].pos, tuple(current)))
+            current = []
+        current.append(locus)
+    if current:
+        shards.append(PileupShard(current[0].chrom, current[0].pos, current[-1].pos, tuple(current)))
+    return shards
+
+
+def pileup_shard(shard: PileupShard, params: BamEvidenceParams) -> dict[str, BamEvidence]:
+    """Run one `samtools mpileup` over the shard span, keeping only the variant positions."""
+    by_pos: dict[int, list[Locus]] = {}
+    for locus in shard.loci:
+        by_pos.setdefault(locus.pos, []).append(locus)
+
+    fd, bed_path = tempfile.mkstemp(suffix=".bed")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            for pos in sorted(by_pos):
+                fh.write(f"{shard.chrom}\t{pos - 1}\t{pos}\n")
+        cmd = [
+            params.samtools_path or settings.samtools_path,
+            "mpileup",
+            "-B",
+            "-Q",
+            "0",
+            "-d",
+            str(params.max_depth),
+            "--ff",
+            PILEUP_SKIP_FLAGS,
+            "--output-MAPQ",
+            "--output-extra",
+            "FLAG",
+            "-l",
+            bed_path,
+            "-r",
+            f"{shard.chrom}:{shard.start}-{shard.end}",
+        ]
+        if params.reference_fasta:
+            cmd += ["-f", params.reference_fasta]
+        cmd.append(params.bam_or_cram)
+
+        results: dict[str, BamEvidence] = {}
+        for line in iter_output_lines(cmd, f"samtools mpileup for {shard.chrom}:{shard.start}-{shard.end}"):
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 8:
+                continue
+            pos = int(fields[1])
+            for locus in by_pos.get(pos, ()):
+                results[locus.variant_id] = site_evidence(locus, fields[4], fields[5], fields[6], fields[7])
+    finally:
+        os.unlink(bed_path)
+
+    # Sites without any covering read produce no pileup line.
+    for locus in shard.loci:
+        results.setdefault(locus.variant_id, BamEvidence(0, 0, 0, None, None, None, None))
+    return results
+
+
+def extract_bam_evidence(
+    loci: Sequence[Locus], params: BamEvidenceParams, workers: int = 4
+) -> dict[str, BamEvidence]:
+    """Strand balance, MAPQ, BQ and duplicate rate for every locus, keyed by variant ID."""
+    shards = plan_pileup_shards(loci, params.max_gap, params.max_loci_per_shard)
+    results: dict[str, BamEvidence] = {}
+    failures: list[str] = []
+    if not shards:
+        return results
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(shards)))) as pool:
+        futures = [pool.submit(pileup_shard, s, params) for s in shards]
+        for shard, fut in zip(shards, futures, strict=True):
+            try:
+                results.update(fut.result())
+            except ExternalToolError as exc:
+                failures.append(f"{shard.chrom}:{shard.start}-{shard.end}: {exc}")
+    if failures:
+        raise ExternalToolError(
+            f"BAM evidence extraction failed for {len(failures)} of {len(shards)} shard(s):\n" + "\n".join(failures)
+        )
+    return results
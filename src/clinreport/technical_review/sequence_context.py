@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import gzip
+import mmap
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from ..exceptions import InputValidationError
+from .bam_evidence import Locus
+
+# Base → code (A=0, C=1, G=2, T=3, anything else=4); soft-masked lower case maps like upper case.
+N_CODE = 4
+_CODES = np.full(256, N_CODE, dtype=np.uint8)
+for _i, _b in enumerate(b"ACGT"):
+    _CODES[_b] = _i
+    _CODES[_b | 0x20] = _i
+
+
+@dataclass(frozen=True)
+class FaiEntry:
+    name: str
+    length: int
+    offset: int
+    line_bases: int
+    line_bytes: int
+
+    def byte_offset(self, pos0: int) -> int:
+        return self.offset + (pos0 // self.line_bases) * self.line_bytes + pos0 % self.line_bases
+
+
+def read_fai(path: Path) -> dict[str, FaiEntry]:
+    entries = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        name, length, offset, line_bases, line_bytes = line.split("\t")[:5]
+        entries[name] = FaiEntry(name, int(length), int(offset), int(line_bases), int(line_bytes))
+    return entries
+
+
+def index_fasta(fasta: Path) -> Path:
+    """Write `<fasta>.fai` in `samtools faidx` format (uncompressed FASTA, fixed line widths)."""
+    rows: list[str] = []
+    name: str | None = None
+    length = offset = line_bases = line_bytes = 0
+    pos = 0
+    with fasta.open("rb") as fh:
+        for raw in fh:
+            if raw.startswith(b">"):
+                if name is not None:
+                    rows.append(f"{name}\t{length}\t{offset}\t{line_bases}\t{line_bytes}")
+                name = raw[1:].split()[0].decode("utf-8")
+                length = line_bases = line_bytes = 0
+                offset = pos + len(raw)
+            elif name is not None:
+                bases = len(raw.rstrip(b"\r\n"))
+                if line_bases == 0:
+                    line_bases, line_bytes = bases, len(raw)
+                length += bases
+            pos += len(raw)
+    if name is not None:
+        rows.append(f"{name}\t{length}\t{offset}\t{line_bases}\t{line_bytes}")
+    fai = fasta.with_name(fasta.name + ".fai")
+    fai.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    return fai
+
+
+class ReferenceFasta:
+    """
+    Random access to an indexed, uncompressed FASTA through one read-only mmap.
+
+    Fetches slice the mapping directly; only the requested window is copied
+    when line breaks are removed.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        fai = self.path.with_name(self.path.name + ".fai")
+        if not fai.exists():
+            raise InputValidationError(f"FASTA index not found: {fai} (create it with `samtools faidx {self.path}`).")
+        if self.path.suffix in (".gz", ".bgz"):
+            raise InputValidationError(f"Compressed FASTA is not supported for sequence context: {self.path}")
+        self.index = read_fai(fai)
+        self._fh = self.path.open("rb")
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        self._mm.close()
+        self._fh.close()
+
+    def __enter__(self) -> ReferenceFasta:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def codes(self, chrom: str, start0: int, end0: int) -> np.ndarray:
+        """Base codes for the 0-based half-open interval, clipped to the contig."""
+        entry = self.index.get(chrom)
+        if entry is None:
+            raise InputValidationError(f"Contig {chrom!r} is not in {self.path}.fai")
+        start0, end0 = max(0, start0), min(entry.length, end0)
+        if end0 <= start0:
+            return np.empty(0, dtype=np.uint8)
+        first = entry.byte_offset(start0)
+        raw = np.frombuffer(self._mm, dtype=np.uint8, count=entry.byte_offset(end0 - 1) + 1 - first, offset=first)
+        return _CODES[raw[(raw != 10) & (raw != 13)]]
+
+    def fetch(self, chrom: str, start: int, end: int) -> str:
+        """Upper-case sequence of `chrom:start-end` (1-based, inclusive, like samtools regions)."""
+        return "".join("ACGTN"[c] for c in self.codes(chrom, start - 1, end))
+
+    def windows(self, loci: Sequence[Locus], flank: int) -> np.ndarray:
+        """(n, 2*flank+1) codes centred on each locus position, padded with N past contig ends."""
+        out = np.full((len(loci), 2 * flank + 1), N_CODE, dtype=np.uint8)
+        for i, locus in enumerate(loci):
+            start0 = locus.pos - 1 - flank
+            seq = self.codes(locus.chrom, start0, locus.pos + flank)
+            lead = max(0, -start0)
+            out[i, lead : lead + len(seq)] = seq
+        return out
+
+
+class RepeatIndex:
+    """Merged BED intervals per contig, queried with binary search."""
+
+    def __init__(self, intervals: dict[str, tuple[np.ndarray, np.ndarray]]):
+        self._intervals = intervals
+
+    @classmethod
+    def from_bed(cls, path: str | Path) -> RepeatIndex:
+        path = Path(path)
+        raw: dict[str, list[tuple[int, int]]] = {}
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip() or line.startswith(("#", "track", "browser")):
+                    continue
+                chrom, start, end = line.split("\t")[:3]
+                raw.setdefault(chrom, []).append((int(start), int(end)))
+        intervals = {}
+        for chrom, spans in raw.items():
+            spans.sort()
+            merged = [list(spans[0])]
+            for start, end in spans[1:]:
+                if start <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            arr = np.asarray(merged, dtype=np.int64)
+            intervals[chrom] = (arr[:, 0], arr[:, 1])
+        return cls(intervals)
+
+    def contains(self, chroms: Sequence[str], positions: Sequence[int]) -> np.ndarray:
+        """Whether each 1-based position lies inside a repeat interval."""
+        chrom_arr = np.asarray(chroms, dtype=object)
+        pos0 = np.asarray(positions, dtype=np.int64) - 1
+        hit = np.zeros(len(pos0), dtype=bool)
+        for chrom in set(chroms):
+            if chrom not in self._intervals:
+                continue
+            starts, ends = self._intervals[chrom]
+            rows = np.flatnonzero(chrom_arr == chrom)
+            j = np.searchsorted(starts, pos0[rows], side="right") - 1
+            hit[rows] = (j >= 0) & (pos0[rows] < ends[np.maximum(j, 0)])
+        return hit
+
+
+@dataclass(frozen=True)
+class ContextParams:
+    flank: int = 32
+    # DUST score (sum of c*(c-1)/2 over triplet counts, / (triplets - 1)); random sequence ~0.5.
+    max_dust_score: float = 2.0
+    min_homopolymer_run: int = 6
+
+
+@dataclass(frozen=True)
+class SequenceContext:
+    dust_score: float
+    homopolymer_run: int
+    in_repeat: bool
+    low_complexity: bool
+
+
+def dust_scores(windows: np.ndarray) -> np.ndarray:
+    """DUST score per row; triplets containing N are ignored."""
+    n, width = windows.shape
+    if width < 3:
+        return np.zeros(n)
+    w = windows.astype(np.int64)
+    triplets = w[:, :-2] * 16 + w[:, 1:-1] * 4 + w[:, 2:]
+    valid = (w[:, :-2] < N_CODE) & (w[:, 1:-1] < N_CODE) & (w[:, 2:] < N_CODE)
+    rows = np.broadcast_to(np.arange(n)[:, None], triplets.shape)
+    counts = np.bincount((rows * 64 + triplets)[valid], minlength=n * 64).reshape(n, 64)
+    total = valid.sum(axis=1)
+    pairs = (counts * (counts - 1) // 2).sum(axis=1)
+    return np.where(total > 1, pairs / np.maximum(total - 1, 1), 0.0)
+
+
+def _run_through(windows: np.ndarray, col: int) -> np.ndarray:
+    centre = windows[:, col : col + 1]
+    left = np.logical_and.accumulate(windows[:, col - 1 :: -1] == centre, axis=1).sum(axis=1) if col else 0
+    right = np.logical_and.accumulate(windows[:, col + 1 :] == centre, axis=1).sum(axis=1)
+    return np.where(centre[:, 0] < N_CODE, 1 + left + right, 0)
+
+
+def homopolymer_runs(windows: np.ndarray) -> np.ndarray:
+    """Longest run through the centre base or the base after it (where indels are placed)."""
+    col = windows.shape[1] // 2
+    runs = _run_through(windows, col)
+    if col + 1 < windows.shape[1]:
+        runs = np.maximum(runs, _run_through(windows, col + 1))
+    return runs
+
+
+def annotate_sequence_context(
+    loci: Sequence[Locus],
+    fasta: ReferenceFasta,
+    repeats: RepeatIndex | None = None,
+    params: ContextParams | None = None,
+) -> dict[str, SequenceContext]:
+    """Reference context around every locus, keyed by variant ID."""
+    params = params or ContextParams()
+    if not loci:
+        return {}
+    windows = fasta.windows(loci, params.flank)
+    dust = dust_scores(windows)
+    runs = homopolymer_runs(windows)
+    in_repeat = (
+        repeats.contains([x.chrom for x in loci], [x.pos for x in loci])
+        if repeats is not None
+        else np.zeros(len(loci), dtype=bool)
+    )
+    low = (dust > params.max_dust_score) | (runs >= params.min_homopolymer_run) | in_repeat
+    return {
+        locus.variant_id: SequenceContext(round(float(d), 3), int(r), bool(rep), bool(lc))
+        for locus, d, r, rep, lc in zip(loci, dust, runs, in_repeat, low, strict=True)
+    }
+
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import re
+import sys
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
 from typing import Optional
 
@@ -29,6 +32,19 @@ def _locus_key(chrom: str, pos: int) -> tuple[tuple[int, str], int]:
     return (_chrom_rank(chrom), pos)
 
 
+def is_clinvar_pathogenic(clnsig: str) -> bool:
+    if not clnsig:
+        return False
+    normalized = clnsig.replace(" ", "_")
+    labels = [p for p in re.split(r"[|,;/]+", normalized) if p]
+    accepted = {"Pathogenic", "Likely_pathogenic", "Pathogenic/Likely_pathogenic"}
+    if any(lbl in accepted for lbl in labels):
+        return True
+    if "Pathogenic/Likely_pathogenic" in normalized:
+        return True
+    return False
+
+
 @dataclass(frozen=True)
 class ClinVarHit:
     clnsig: str
@@ -73,31 +89,69 @@ class ClinVarStreamMatcher:
         if self._cached_locus != target_locus:
             self._read_locus_records(target_locus)
 
-        clnsigs: list[str] = []
-        genes: list[str] = []
-        for rec in self._cached_records:
-            if rec.REF != v.ref:
-                continue
-            if not rec.ALT:
-                continue
-            if v.alt not in rec.ALT:
+        records = (
+            (rec.REF, rec.ALT, str(rec.INFO.get("CLNSIG", "")), str(rec.INFO.get("GENEINFO", "")))
+            for rec in self._cached_records
+        )
+        return _hit(records, v)
+
+
+def _hit(records: Iterable[tuple[str, Sequence[str], str, str]], v: VariantRecord) -> Optional[ClinVarHit]:
+    """Merge the (REF, ALT, CLNSIG, GENEINFO) records at a locus that carry `v`'s allele."""
+    clnsigs: list[str] = []
+    genes: list[str] = []
+    for ref, alts, clnsig, geneinfo in records:
+        if ref != v.ref:
+            continue
+        if not alts:
+            continue
+        if v.alt not in alts:
+            continue
+        clnsig = clnsig.strip()
+        geneinfo = geneinfo.strip()
+        if clnsig:
+            clnsigs.append(clnsig)
+        if geneinfo:
+            # GENEINFO looks like: "CFTR:1080|ASZ1:..." -> keep gene symbols only.
+            symbols = []
+            for item in geneinfo.split("|"):
+                sym = item.split(":", 1)[0].strip()
+                if sym:
+                    symbols.append(sym)
+            genes.extend(symbols)
+
+    if not clnsigs and not genes:
+        return None
+
+    uniq_clnsig = sorted(set(clnsigs))
+    uniq_genes = sorted(set(genes))
+    return ClinVarHit(clnsig="|".join(uniq_clnsig), gene="|".join(uniq_genes))
+
+
+class ClinVarIndex:
+    """
+    In-memory ClinVar lookup keyed by locus, for matching many unsorted VCFs.
+
+    Loading reads the whole file once (records without CLNSIG or GENEINFO are
+    dropped); afterwards `match` is a dict lookup with the same result as
+    `ClinVarStreamMatcher.match`. Memory grows with the ClinVar release, so it
+    pays off when one process annotates many samples.
+    """
+
+    def __init__(self, clinvar_vcf_path: str):
+        self._records: dict[tuple[tuple[int, str], int], list[tuple[str, tuple[str, ...], str, str]]] = {}
+        for rec in VCF(clinvar_vcf_path):
+            clnsig = str(rec.INFO.get("CLNSIG", ""))
+            geneinfo = str(rec.INFO.get("GENEINFO", ""))
+            if not rec.ALT or not (clnsig.strip() or geneinfo.strip()):
                 continue
-            clnsig = str(rec.INFO.get("CLNSIG", "")).strip()
-            geneinfo = str(rec.INFO.get("GENEINFO", "")).strip()
-            if clnsig:
-                clnsigs.append(clnsig)
-            if geneinfo:
-                # GENEINFO looks like: "CFTR:1080|ASZ1:..." -> keep gene symbols only.
-                symbols = []
-                for item in geneinfo.split("|"):
-                    sym = item.split(":", 1)[0].strip()
-                    if sym:
-                        symbols.append(sym)
-                genes.extend(symbols)
-
-        if not clnsigs and not genes:
-            return None
+            key = _locus_key(rec.CHROM, int(rec.POS))
+            entry = (rec.REF, tuple(rec.ALT), sys.intern(clnsig), sys.intern(geneinfo))
+            self._records.setdefault(key, []).append(entry)
+
+    def __len__(self) -> int:
+        return len(self._records)
 
-        uniq_clnsig = sorted(set(clnsigs))
-        uniq_genes = sorted(set(genes))
-        return ClinVarHit(clnsig="|".join(uniq_clnsig), gene="|".join(uniq_genes))
+    def match(self, v: VariantRecord) -> Optional[ClinVarHit]:
+        records = self._records.get(_locus_key(v.chrom, v.pos))
+        return _hit(records, v) if records else None
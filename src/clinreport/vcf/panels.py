@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+from ..exceptions import InputValidationError
+
+
+@dataclass(frozen=True)
+class GenePanel:
+    """Gene symbols from a panel file (one per line, `#` comments), matched case-insensitively."""
+
+    name: str
+    genes: frozenset[str]
+
+    @classmethod
+    def from_file(cls, path: Path) -> GenePanel:
+        if not path.exists():
+            raise InputValidationError(f"Gene panel not found: {path}")
+        genes = set()
+        for line in path.read_text(encoding="utf-8").splitlines():
+            symbol = line.split("#", 1)[0].strip()
+            if symbol:
+                genes.add(symbol.upper())
+        return cls(name=path.stem, genes=frozenset(genes))
+
+    def contains(self, gene: str) -> bool:
+        """True if any symbol of a `|`-joined gene field (as ClinVar GENEINFO gives) is on the panel."""
+        return any(g.strip().upper() in self.genes for g in gene.split("|") if g.strip())
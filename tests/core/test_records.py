@@ -0,0 +1,31 @@
+from clinreport.core.models import TechnicalEvidence, VariantRecordModel
+from clinreport.core.records import EvidenceRec, VariantRec
+from clinreport.evidence_mapping.engine import EvidenceMappingEngine
+from clinreport.technical_review.authenticity_engine import TechnicalAuthenticityEngine
+
+
+def test_records_mirror_model_fields():
+    assert tuple(VariantRec.__slots__) == tuple(VariantRecordModel.model_fields)
+    assert tuple(EvidenceRec.__slots__) == tuple(TechnicalEvidence.model_fields)
+
+
+def test_record_round_trip_matches_validated_model():
+    model = VariantRecordModel(
+        variant_id="chr1-100-A-G", chrom="chr1", pos=100, ref="A", alt="G", clinvar="Pathogenic", af=0.001
+    )
+    rec = VariantRec.from_model(model)
+    assert rec.as_dict() == model.model_dump()
+    assert rec.to_model().model_dump() == model.model_dump()
+
+
+def test_engines_give_same_results_for_records_and_models():
+    model = VariantRecordModel(variant_id="chr1-100-A-G", chrom="chr1", pos=100, ref="A", alt="G", filter="LowQual")
+    evidence = TechnicalEvidence(dp=12, gq=30, ad_ref=10, ad_alt=2, in_low_complexity_region=True)
+    auth = TechnicalAuthenticityEngine()
+    from_models = auth.assess(model, evidence)
+    from_records = auth.assess(VariantRec.from_model(model), EvidenceRec(**evidence.model_dump()))
+    assert from_records == from_models
+
+    mapper = EvidenceMappingEngine()
+    assert mapper.map(VariantRec.from_model(model), {}, from_records) == mapper.map(model, {}, from_models)
+
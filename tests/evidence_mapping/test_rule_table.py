@@ -0,0 +1,74 @@
+import itertools
+
+import pytest
+
+from clinreport.core.models import VariantRecordModel
+from clinreport.evidence_mapping.engine import EvidenceMappingEngine
+from clinreport.exceptions import InputValidationError
+
+AFS = [None, 0.0, 0.001, 0.01, 0.010001, 0.3]
+CLNSIGS = [None, "", "Pathogenic", "Likely pathogenic", "Pathogenic/Likely_benign", "Benign", "Uncertain significance"]
+CONSEQUENCES = [None, "missense_variant", "stop_gained", "Frameshift_variant", "splice_donor_variant&intron"]
+LABELS = ["likely_real", "uncertain", "likely_artifact"]
+
+
+def _legacy(af, clnsig, consequence, label, max_af=0.01):
+    """The pre-table if/elif mapping, reduced to (supports, contradicts, missing, state)."""
+    supports, contradicts, missing = [], [], []
+    if af is None:
+        missing.append("population_frequency")
+    elif af <= max_af:
+        supports.append(("LOW_FREQ", "moderate", f"Population AF {af:.5f} <= {max_af}"))
+    else:
+        contradicts.append(("HIGH_FREQ", "strong", f"Population AF {af:.5f} > {max_af}"))
+    c = (clnsig or "").replace(" ", "_")
+    if not c:
+        missing.append("clinvar_assertion")
+    elif "Pathogenic" in c:
+        supports.append(("CLINVAR_PATH", "moderate", f"ClinVar assertion: {c}"))
+    elif "Benign" in c:
+        contradicts.append(("CLINVAR_BENIGN", "moderate", f"ClinVar assertion: {c}"))
+    q = (consequence or "").lower()
+    if not q:
+        missing.append("consequence_annotation")
+    elif any(k in q for k in ("stop_gained", "frameshift", "splice_acceptor", "splice_donor")):
+        supports.append(("HIGH_IMPACT_CONSEQUENCE", "supporting", f"Consequence {q} suggests high impact"))
+    if label == "likely_artifact":
+        contradicts.append(("LOW_TECH_CONF", "supporting", "Technical authenticity assessment indicates likely artifact"))
+    elif label == "uncertain":
+        missing.append("orthogonal_confirmation")
+    state = (
+        "conflicting_evidence"
+        if supports and contradicts
+        else "supports_pathogenic"
+        if supports
+        else "supports_benign"
+        if contradicts
+        else "insufficient_evidence"
+    )
+    return supports, contradicts, sorted(set(missing)), state
+
+
+def test_rule_table_matches_legacy_mapping_and_memoizes():
+    engine = EvidenceMappingEngine()
+    grid = list(itertools.product(AFS, CLNSIGS, CONSEQUENCES, LABELS))
+    variants = [
+        VariantRecordModel(
+            variant_id=f"chr1-{i}-A-G", chrom="chr1", pos=i, ref="A", alt="G", af=af, clinvar=c, consequence=q
+        )
+        for i, (af, c, q, _) in enumerate(grid)
+    ]
+    maps = engine.map_batch(variants, [g[3] for g in grid])
+    for m, args in zip(maps, grid, strict=True):
+        supports, contradicts, missing, state = _legacy(*args)
+        assert [(x.code, x.strength, x.reason) for x in m.supports] == supports
+        assert [(x.code, x.strength, x.reason) for x in m.contradicts] == contradicts
+        assert (m.missing, m.state, m.rules_version) == (missing, state, "v1")
+
+    # Outcomes are keyed by AF side, not by AF value.
+    assert len(engine._memo) < len(grid)
+
+
+def test_unknown_rules_version_rejected():
+    with pytest.raises(InputValidationError):
+        EvidenceMappingEngine(rules_version="v0")
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from openai import AsyncOpenAI
+
+from clinreport.llm.async_triage import RateLimiter, TriageItem, triage_many
+
+
+class StubResponses(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = json.loads(body["input"][0]["content"][0]["text"])
+        locus = prompt["metadata"]["locus"]
+        server = self.server
+        server.calls.append(locus)
+        attempts = server.calls.count(locus)
+
+        if locus == "chr1:100" and attempts == 1:
+            return self._send(429, {"error": {"message": "slow down", "type": "rate_limit"}})
+        if locus == "chr1:200" and attempts == 1:
+            return self._send(503, {"error": {"message": "unavailable", "type": "server_error"}})
+        text = "not json" if locus == "chr1:300" else json.dumps(
+            {
+                "locus": locus,
+                "snapshot_file": "x.png",
+                "triage": "uncertain",
+                "rationale": "stub",
+                "disclaimer": "Human review required.",
+            }
+        )
+        self._send(
+            200,
+            {
+                "id": "resp_1",
+                "object": "response",
+                "created_at": 0,
+                "model": body["model"],
+                "status": "completed",
+                "output": [
+                    {
+                        "type": "message",
+                        "id": "msg_1",
+                        "role": "assistant",
+                        "status": "completed",
+                        "content": [{"type": "output_text", "text": text, "annotations": []}],
+                    }
+                ],
+            },
+        )
+
+    def _send(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubResponses)
+    server.calls = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _items(tmp_path: Path) -> list[TriageItem]:
+    items = []
+    for pos in (100, 200, 300, 400):
+        snap = tmp_path / f"S_chr1_{pos}_A_G.png"
+        snap.write_bytes(b"png")
+        locus = f"chr1:{pos}"
+        items.append(TriageItem(key=locus, snapshot_path=snap, metadata={"locus": locus}, fallback={"locus": locus}))
+    return items
+
+
+def _client(server) -> AsyncOpenAI:
+    return AsyncOpenAI(base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", api_key="test", max_retries=0)
+
+
+def test_retries_isolation_and_resume(tmp_path: Path, stub_server):
+    items = _items(tmp_path)
+    checkpoint = tmp_path / "triage.partial.jsonl"
+
+    results = asyncio.run(
+        triage_many(items, checkpoint, concurrency=4, client=_client(stub_server), base_delay_s=0.01)
+    )
+    assert [r.get("triage") for r in results] == ["uncertain", "uncertain", None, "uncertain"]
+    assert "triage_error" in results[2]
+    assert stub_server.calls.count("chr1:100") == 2
+    assert stub_server.calls.count("chr1:200") == 2
+
+    stub_server.calls.clear()
+    again = asyncio.run(
+        triage_many(items, checkpoint, concurrency=4, client=_client(stub_server), base_delay_s=0.01)
+    )
+    # Only the failed item is retried on resume.
+    assert stub_server.calls == ["chr1:300"]
+    assert again[0] == results[0]
+
+
+def test_rate_limiter_waits_for_token_refill():
+    async def run() -> float:
+        limiter = RateLimiter(tokens_per_minute=6000)
+        loop = asyncio.get_running_loop()
+        await limiter.acquire(6000)
+        start = loop.time()
+        await limiter.acquire(50)
+        return loop.time() - start
+
+    # The bucket refills at 100 tokens/s, so 50 more tokens take about half a second.
+    assert 0.4 <= asyncio.run(run()) < 2.0
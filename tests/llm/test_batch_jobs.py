@@ -0,0 +1,170 @@
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from clinreport import cli
+from clinreport.cli import app
+from clinreport.llm.cache import LlmResponseCache
+
+runner = CliRunner()
+
+PACKET = {
+    "summary": "Routed for human review.",
+    "technical_summary": "Depth adequate.",
+    "evidence_summary": "ClinVar pathogenic.",
+    "conflicts": [],
+    "recommended_actions": ["Human review required before release"],
+    "draft_rationale": "Draft only.",
+}
+
+
+def _output_line(custom_id: str, text: str, status: int = 200) -> str:
+    body = {"output": [{"type": "message", "content": [{"type": "output_text", "text": text}]}]}
+    return json.dumps({"custom_id": custom_id, "response": {"status_code": status, "body": body}, "error": None})
+
+
+def test_review_packet_batch_round_trip(tmp_path: Path):
+    report = tmp_path / "report.json"
+    report.write_text(
+        json.dumps(
+            {"important_variants": [{"chrom": "chr12", "pos": 102840474, "ref": "T", "alt": "C", "clinvar": "Pathogenic"}]}
+        ),
+        encoding="utf-8",
+    )
+    requests = tmp_path / "batch" / "packets.jsonl"
+    packet_json = tmp_path / "review" / "packet.json"
+    r = runner.invoke(
+        app,
+        [
+            "review-packet",
+            "--case-id",
+            "caseB",
+            "--report-json",
+            str(report),
+            "--out-json",
+            str(packet_json),
+            "--out-md",
+            str(tmp_path / "review" / "packet.md"),
+            "--use-llm",
+            "--batch-requests-out",
+            str(requests),
+        ],
+    )
+    assert r.exit_code == 0, r.output
+    assert not packet_json.exists()
+    (line,) = [json.loads(x) for x in requests.read_text().splitlines()]
+    assert line["method"] == "POST" and line["url"] == "/v1/responses"
+    assert line["custom_id"].startswith("chr12-102840474-T-C|")
+
+    results = tmp_path / "batch" / "output.jsonl"
+    results.write_text(_output_line(line["custom_id"], json.dumps(PACKET)) + "\n", encoding="utf-8")
+    cache_path = tmp_path / "cache.sqlite"
+    r = runner.invoke(
+        app,
+        ["ingest-batch", "--requests", str(requests), "--results", str(results), "--llm-cache", str(cache_path)],
+    )
+    assert r.exit_code == 0, r.output
+    packet = json.loads(packet_json.read_text(encoding="utf-8"))
+    assert packet["packet"]["summary"] == PACKET["summary"]
+    assert packet["packet"]["grounding_hash"].startswith(line["custom_id"].split("|")[1])
+    events = [json.loads(x) for x in (tmp_path / "review" / "audit.jsonl").read_text().splitlines()]
+    assert events[-1]["payload"]["batch_custom_id"] == line["custom_id"]
+
+    # The validated response is now served from the cache by the interactive path.
+    cache = LlmResponseCache(cache_path)
+    index = json.loads(requests.with_suffix(".index.json").read_text())
+    assert cache.get(index["items"][line["custom_id"]]["cache_key"]) == json.dumps(PACKET)
+    cache.close()
+
+
+def test_triage_batch_ingest_validates_and_keeps_fallbacks(tmp_path: Path):
+    review = tmp_path / "review"
+    snaps = review / "snapshots"
+    snaps.mkdir(parents=True)
+    manifest = []
+    for pos in (100, 200, 300):
+        name = f"S_chr1_{pos}_A_G.png"
+        manifest.append(
+            {"chrom": "chr1", "pos": pos, "ref": "A", "alt": "G", "locus": f"chr1:{pos}", "sample": "S", "snapshot": name}
+        )
+        if pos != 300:
+            (snaps / name).write_bytes(b"\x89PNG fake")
+    (review / "low_confidence.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+    requests = tmp_path / "triage_requests.jsonl"
+    out_json = review / "triage.json"
+    r = runner.invoke(
+        app,
+        ["triage", "--review-dir", str(review), "--out-json", str(out_json), "--batch-requests-out", str(requests)],
+    )
+    assert r.exit_code == 0, r.output
+    ids = [json.loads(x)["custom_id"] for x in requests.read_text().splitlines()]
+    assert len(ids) == 2
+
+    good = {
+        "locus": "chr1:100",
+        "snapshot_file": "S_chr1_100_A_G.png",
+        "triage": "likely_supported",
+        "rationale": "balanced strands",
+        "disclaimer": "Human review required.",
+    }
+    results = tmp_path / "out.jsonl"
+    results.write_text(
+        _output_line(ids[0], json.dumps(good)) + "\n" + _output_line(ids[1], '{"triage": "definitely"}') + "\n",
+        encoding="utf-8",
+    )
+    r = runner.invoke(app, ["ingest-batch", "--requests", str(requests), "--results", str(results)])
+    assert r.exit_code == 0, r.output
+    merged = json.loads(out_json.read_text(encoding="utf-8"))
+    assert merged[0]["triage"] == "likely_supported"
+    assert merged[1]["pos"] == 200 and merged[1]["triage_error"].startswith("ValidationError")
+    assert merged[2]["triage_error"] == "snapshot_not_found"
+
+
+def test_packet_ingest_commits_audit_events_when_a_later_write_fails(tmp_path: Path, monkeypatch):
+    rows = [
+        {"chrom": "chr12", "pos": 102840474, "ref": "T", "alt": "C", "clinvar": "Pathogenic"},
+        {"chrom": "chr7", "pos": 117559590, "ref": "G", "alt": "A", "clinvar": "Pathogenic"},
+    ]
+    report = tmp_path / "report.json"
+    report.write_text(json.dumps({"important_variants": rows}), encoding="utf-8")
+    requests = tmp_path / "batch" / "packets.jsonl"
+    review = tmp_path / "review"
+    r = runner.invoke(
+        app,
+        [
+            "review-packet",
+            "--case-id",
+            "caseC",
+            "--report-json",
+            str(report),
+            "--out-json",
+            str(review / "packet.json"),
+            "--all-variants",
+            "--use-llm",
+            "--batch-requests-out",
+            str(requests),
+        ],
+    )
+    assert r.exit_code == 0, r.output
+    ids = [json.loads(x)["custom_id"] for x in requests.read_text().splitlines()]
+    results = tmp_path / "batch" / "output.jsonl"
+    results.write_text(
+        "".join(_output_line(i, json.dumps(PACKET)) + "\n" for i in ids), encoding="utf-8"
+    )
+
+    real_write = cli.write_review_packet
+    calls = []
+
+    def write_then_fail(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 2:
+            raise OSError("disk full")
+        return real_write(*args, **kwargs)
+
+    monkeypatch.setattr(cli, "write_review_packet", write_then_fail)
+    r = runner.invoke(app, ["ingest-batch", "--requests", str(requests), "--results", str(results)])
+    assert isinstance(r.exception, OSError)
+    events = [json.loads(x) for x in (review / "audit.jsonl").read_text().splitlines()]
+    assert [e["variant_id"] for e in events] == [ids[0].split("|")[0]]
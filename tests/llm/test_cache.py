@@ -0,0 +1,122 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from clinreport.core.models import AuthenticityAssessment, EvidenceMap, VariantRecordModel
+from clinreport.exceptions import InputValidationError
+from clinreport.llm import packet_generator
+from clinreport.llm.cache import LlmResponseCache, request_cache_key
+
+
+def _request(text: str, image: str | None = None, model: str = "m1") -> dict:
+    content = [{"type": "input_text", "text": text}]
+    if image:
+        content.append({"type": "input_image", "image_url": image})
+    return {"model": model, "instructions": "be careful", "input": [{"role": "user", "content": content}]}
+
+
+def test_key_depends_on_model_prompt_and_image():
+    base = request_cache_key(_request("p", "data:a"))
+    assert base == request_cache_key(_request("p", "data:a"))
+    assert base != request_cache_key(_request("p", "data:b"))
+    assert base != request_cache_key(_request("q", "data:a"))
+    assert base != request_cache_key(_request("p", "data:a", model="m2"))
+
+
+def test_lru_eviction_by_size(tmp_path: Path):
+    cache = LlmResponseCache(tmp_path / "llm.sqlite", max_bytes=25)
+    cache.put("a", "m", "x" * 10)
+    cache.put("b", "m", "y" * 10)
+    assert cache.get("a") == "x" * 10  # "a" is now the most recently used
+    cache.put("c", "m", "z" * 10)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    cache.close()
+
+
+def test_packet_generation_hits_cache_on_unchanged_inputs(tmp_path: Path, monkeypatch):
+    calls = []
+    reply = {
+        "summary": "s",
+        "technical_summary": "t",
+        "evidence_summary": "e",
+        "conflicts": [],
+        "recommended_actions": ["Human review required"],
+        "draft_rationale": "r",
+    }
+
+    class FakeOpenAI:
+        def __init__(self):
+            self.responses = SimpleNamespace(create=self.create)
+
+        def create(self, **kwargs):
+            calls.append(kwargs)
+            content = [SimpleNamespace(type="output_text", text=json.dumps(reply))]
+            return SimpleNamespace(output=[SimpleNamespace(type="message", content=content)])
+
+    monkeypatch.setattr(packet_generator, "OpenAI", FakeOpenAI)
+    cache = LlmResponseCache(tmp_path / "llm.sqlite")
+    args = dict(
+        variant=VariantRecordModel(variant_id="chr1-100-A-G", chrom="chr1", pos=100, ref="A", alt="G"),
+        authenticity=AuthenticityAssessment(
+            variant_id="chr1-100-A-G", authenticity_score=0.8, confidence=0.8, label="likely_real"
+        ),
+        evidence_map=EvidenceMap(variant_id="chr1-100-A-G"),
+        use_llm=True,
+        cache=cache,
+    )
+    gen = packet_generator.ReviewPacketGenerator()
+    first = gen.generate(**args)
+    second = gen.generate(**args)
+    cache.close()
+
+    assert len(calls) == 1
+    assert not first.llm_cache_hit
+    assert second.llm_cache_hit
+    assert first.model_dump(exclude={"llm_cache_hit"}) == second.model_dump(exclude={"llm_cache_hit"})
+
+
+def test_invalid_packet_reply_is_not_cached_or_reused(tmp_path: Path, monkeypatch):
+    replies = [
+        {"summary": "s", "recommended_actions": ["Release"], "draft_rationale": "r"},
+        {"summary": "s", "recommended_actions": ["Human review required"], "draft_rationale": "r"},
+    ]
+    calls = []
+
+    class FakeOpenAI:
+        def __init__(self):
+            self.responses = SimpleNamespace(create=self.create)
+
+        def create(self, **kwargs):
+            calls.append(kwargs)
+            content = [SimpleNamespace(type="output_text", text=json.dumps(replies[len(calls) - 1]))]
+            return SimpleNamespace(output=[SimpleNamespace(type="message", content=content)])
+
+    monkeypatch.setattr(packet_generator, "OpenAI", FakeOpenAI)
+    cache = LlmResponseCache(tmp_path / "llm.sqlite")
+    args = dict(
+        variant=VariantRecordModel(variant_id="chr1-100-A-G", chrom="chr1", pos=100, ref="A", alt="G"),
+        authenticity=AuthenticityAssessment(
+            variant_id="chr1-100-A-G", authenticity_score=0.8, confidence=0.8, label="likely_real"
+        ),
+        evidence_map=EvidenceMap(variant_id="chr1-100-A-G"),
+        use_llm=True,
+        cache=cache,
+    )
+    gen = packet_generator.ReviewPacketGenerator()
+    with pytest.raises(InputValidationError):
+        gen.generate(**args)
+    payload = packet_generator.packet_payload(args["variant"], args["authenticity"], args["evidence_map"])
+    key = request_cache_key(packet_generator.build_packet_request(payload))
+    assert cache.get(key) is None
+
+    cache.put(key, "m", json.dumps(replies[0]))  # e.g. written by an older release
+    packet = gen.generate(**args)
+    cache.close()
+
+    assert len(calls) == 2
+    assert not packet.llm_cache_hit
+    assert packet.recommended_actions == ["Human review required"]
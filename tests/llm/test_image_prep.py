@@ -0,0 +1,49 @@
+import io
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageDraw
+
+from clinreport.exceptions import InputValidationError
+from clinreport.llm.image_prep import ImagePrepParams, prepare_snapshot, prepare_snapshots
+
+
+def _snapshot(path: Path) -> None:
+    img = Image.new("RGB", (2000, 1500), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, 1999, 60], fill=(200, 200, 200))  # header/ruler
+    for row in range(40):
+        y = 120 + row * 10
+        draw.rectangle([100 + row * 7, y, 1400 + row * 7, y + 7], fill=(231, 160, 160))
+    img.save(path, format="PNG")
+
+
+def test_prepare_crops_downscales_and_shrinks(tmp_path: Path):
+    snap = tmp_path / "S_chr1_100_A_G.png"
+    _snapshot(snap)
+    out = prepare_snapshot(snap, ImagePrepParams(max_width=512, max_height=512, crop_top_px=80))
+
+    assert out.mime == "image/png"
+    assert out.prepared_bytes < out.original_bytes
+    img = Image.open(io.BytesIO(out.data))
+    assert max(img.size) <= 512
+    # Only the read area remains: the trimmed aspect ratio is wider than the 4:3 original.
+    assert img.width / img.height > 2000 / 1500
+    assert out.data_url().startswith("data:image/png;base64,")
+
+
+def test_prepare_snapshots_tolerates_unreadable_files(tmp_path: Path):
+    good = tmp_path / "good.png"
+    _snapshot(good)
+    bad = tmp_path / "bad.png"
+    bad.write_bytes(b"not a png")
+    results = prepare_snapshots([good, bad], ImagePrepParams(image_format="webp"), workers=2)
+    assert results[0] is not None and results[0].mime == "image/webp"
+    assert results[1] is None
+
+
+def test_params_are_validated_on_construction():
+    with pytest.raises(InputValidationError, match="gif"):
+        ImagePrepParams(image_format="gif")
+    with pytest.raises(InputValidationError, match="positive"):
+        ImagePrepParams(max_width=0)
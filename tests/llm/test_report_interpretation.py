@@ -0,0 +1,127 @@
+import json
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from clinreport.exceptions import InputValidationError
+from clinreport.llm.cache import LlmResponseCache
+from clinreport.llm.report_compactor import chunk_rows, compact_report, estimate_tokens
+from clinreport.llm.report_interpretation import interpret_report_json
+
+PARTIAL = {
+    "summary": "Partial interpretation.",
+    "key_findings": ["finding"],
+    "priority_variants": [],
+    "quality_notes": [],
+    "recommended_follow_up": [],
+    "disclaimer": "Human review required.",
+}
+
+
+class FakeClient:
+    """Records prompts and answers every request with the same JSON document (`reply`)."""
+
+    def __init__(self):
+        self.prompts: list[dict] = []
+        self.reply: object = PARTIAL
+        self._lock = threading.Lock()
+        self.responses = SimpleNamespace(create=self._create)
+
+    def _create(self, **request):
+        with self._lock:
+            self.prompts.append(json.loads(request["input"][0]["content"][0]["text"]))
+        content = [SimpleNamespace(type="output_text", text=json.dumps(self.reply))]
+        return SimpleNamespace(output=[SimpleNamespace(type="message", content=content)])
+
+
+def _report(n_variants: int) -> dict:
+    rows = [
+        {"chrom": "chr1", "pos": 1000 + i, "ref": "A", "alt": "G", "gt": "0/1", "dp": 30, "gq": None}
+        for i in range(n_variants)
+    ]
+    return {
+        "sample": "S1",
+        "assembly": "GRCh38",
+        "css": "body { color: black; }" * 500,
+        "provenance_json": json.dumps({"tools": {"samtools": "1.19"}}),
+        "qc": {"summary": {"before_filtering": {"total_reads": 10}}, "read1_before_filtering": {"quality_curves": []}},
+        "important_variants": [{"gene": "PAH", **rows[0], "clinvar": "Pathogenic", "notes": ""}],
+        "low_confidence": [],
+        "fastq_detected_variants": rows,
+    }
+
+
+def test_compact_report_drops_presentation_fields():
+    compact = compact_report(_report(3))
+    assert "css" not in compact and "provenance_json" not in compact
+    assert compact["qc"] == {"summary": {"before_filtering": {"total_reads": 10}}}
+    assert compact["variant_counts"] == {"important_variants": 1, "low_confidence": 0, "fastq_detected_variants": 3}
+    assert "gq" not in compact["fastq_detected_variants"][0]
+    assert "notes" not in compact["important_variants"][0]
+
+
+def test_chunk_rows_respects_budget():
+    rows = [{"pos": i, "ref": "A" * 40} for i in range(100)]
+    chunks = chunk_rows(rows, max_tokens=200)
+    assert [r for c in chunks for r in c] == rows
+    assert len(chunks) > 1 and all(estimate_tokens(json.dumps(c)) <= 200 for c in chunks)
+
+
+def test_small_report_uses_single_request(tmp_path: Path):
+    report = tmp_path / "report.json"
+    report.write_text(json.dumps(_report(5)), encoding="utf-8")
+    client = FakeClient()
+    parsed = interpret_report_json(report, tmp_path / "i.json", tmp_path / "i.md", client=client)
+    assert len(client.prompts) == 1
+    assert "body {" not in client.prompts[0]["report_json"]
+    assert parsed["summary"] == PARTIAL["summary"]
+
+
+def test_large_report_is_mapped_then_reduced_within_budget(tmp_path: Path):
+    report = tmp_path / "report.json"
+    report.write_text(json.dumps(_report(2000)), encoding="utf-8")
+    client = FakeClient()
+    parsed = interpret_report_json(
+        report, tmp_path / "i.json", tmp_path / "i.md", client=client, max_prompt_tokens=4000, workers=4
+    )
+    map_prompts = [p for p in client.prompts if "variants" in p]
+    reduce_prompts = [p for p in client.prompts if "partial_interpretations" in p]
+    assert len(map_prompts) > 2 and reduce_prompts
+    assert all(estimate_tokens(json.dumps(p)) <= 4000 for p in client.prompts)
+    mapped = sum(len(p["variants"]) for p in map_prompts if p["variant_list"] == "fastq_detected_variants")
+    assert mapped == 2000
+    assert set(parsed) == set(PARTIAL)
+    assert (tmp_path / "i.md").read_text().startswith("# GPT Interpretation")
+
+
+def test_invalid_reply_is_not_cached_or_reused(tmp_path: Path):
+    report = tmp_path / "report.json"
+    report.write_text(json.dumps(_report(5)), encoding="utf-8")
+    cache = LlmResponseCache(tmp_path / "llm.sqlite")
+    client = FakeClient()
+    client.reply = ["not", "an", "object"]
+    with pytest.raises(InputValidationError):
+        interpret_report_json(report, tmp_path / "i.json", tmp_path / "i.md", client=client, cache=cache)
+
+    client.reply = PARTIAL
+    parsed = interpret_report_json(report, tmp_path / "i.json", tmp_path / "i.md", client=client, cache=cache)
+    again = interpret_report_json(report, tmp_path / "i.json", tmp_path / "i.md", client=client, cache=cache)
+    cache.close()
+    assert len(client.prompts) == 2
+    assert parsed == again == PARTIAL
+
+
+def test_cache_miss_without_api_key_is_a_validation_error(tmp_path: Path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    report = tmp_path / "report.json"
+    report.write_text(json.dumps(_report(5)), encoding="utf-8")
+    cache = LlmResponseCache(tmp_path / "llm.sqlite")
+    with pytest.raises(InputValidationError, match="OPENAI_API_KEY"):
+        interpret_report_json(report, tmp_path / "i.json", tmp_path / "i.md", cache=cache)
+
+    interpret_report_json(report, tmp_path / "i.json", tmp_path / "i.md", client=FakeClient(), cache=cache)
+    parsed = interpret_report_json(report, tmp_path / "i.json", tmp_path / "i.md", cache=cache)
+    cache.close()
+    assert parsed == PARTIAL
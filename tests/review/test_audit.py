@@ -0,0 +1,173 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from clinreport.core.models import AuditEvent
+from clinreport.exceptions import InputValidationError
+from clinreport.review import audit
+from clinreport.review.audit import (
+    GENESIS_HASH,
+    AuditWriter,
+    append_audit_event,
+    append_audit_events,
+    commit_audit_events,
+    iter_audit_events,
+    load_audit_events,
+    load_segment_index,
+    verify_audit_chain,
+)
+
+
+def _event(i: int, case_id: str = "case1", event_type: str = "review_packet_generated") -> AuditEvent:
+    return AuditEvent(
+        event_type=event_type,
+        case_id=case_id,
+        variant_id=f"chr1-{i}-A-G",
+        timestamp=f"2026-01-{i % 28 + 1:02d}T00:00:00+00:00",
+    )
+
+
+def test_events_are_chained(tmp_path: Path):
+    log = tmp_path / "audit.jsonl"
+    append_audit_event(log, _event(1))
+    append_audit_events(log, [_event(2), _event(3)])
+    events = load_audit_events(log)
+    assert events[0]["prev_hash"] == GENESIS_HASH
+    assert len({e["prev_hash"] for e in events}) == 3
+    assert verify_audit_chain(log, use_checkpoint=False).ok
+
+
+def test_filters(tmp_path: Path):
+    log = tmp_path / "audit.jsonl"
+    append_audit_events(
+        log,
+        [_event(1), _event(2, case_id="case2"), _event(3, event_type="reviewer_signoff"), _event(4, case_id="case2")],
+    )
+    assert [e["variant_id"] for e in iter_audit_events(log, case_id="case2")] == ["chr1-2-A-G", "chr1-4-A-G"]
+    assert [e["variant_id"] for e in iter_audit_events(log, event_type="reviewer_signoff")] == ["chr1-3-A-G"]
+    assert [e["variant_id"] for e in iter_audit_events(log, variant_id="chr1-1-A-G")] == ["chr1-1-A-G"]
+    window = iter_audit_events(log, since="2026-01-03", until="2026-01-05")
+    assert [e["variant_id"] for e in window] == ["chr1-2-A-G", "chr1-3-A-G"]
+
+
+def test_filters_match_non_ascii_ids(tmp_path: Path):
+    log = tmp_path / "audit.jsonl"
+    append_audit_events(log, [_event(1, case_id="müller-01"), _event(2, case_id="muller-01")])
+    assert [e["variant_id"] for e in iter_audit_events(log, case_id="müller-01")] == ["chr1-1-A-G"]
+
+
+def test_tampering_is_detected(tmp_path: Path):
+    log = tmp_path / "audit.jsonl"
+    append_audit_events(log, [_event(i) for i in range(1, 6)])
+    lines = log.read_text(encoding="utf-8").splitlines(keepends=True)
+    edited = json.loads(lines[2])
+    edited["payload"] = {"decision": "approve"}
+    log.write_text("".join([*lines[:2], json.dumps(edited) + "\n", *lines[3:]]), encoding="utf-8")
+    result = verify_audit_chain(log, use_checkpoint=False)
+    assert not result.ok and result.events_checked == 3
+    log.write_text("".join([*lines[:2], *lines[3:]]), encoding="utf-8")
+    assert not verify_audit_chain(log, use_checkpoint=False).ok
+
+
+def test_checkpointed_verification_only_hashes_new_events(tmp_path: Path):
+    log = tmp_path / "audit.jsonl"
+    append_audit_events(log, [_event(i) for i in range(1, 4)])
+    assert verify_audit_chain(log).events_checked == 3
+    append_audit_events(log, [_event(4), _event(5)])
+    assert verify_audit_chain(log).events_checked == 2
+    assert verify_audit_chain(log).events_checked == 0
+
+    lines = log.read_text(encoding="utf-8").splitlines(keepends=True)
+    log.write_text("".join(lines[:-1]) + lines[-1].replace("case1", "case9"), encoding="utf-8")
+    assert not verify_audit_chain(log).ok
+
+
+def test_rotation_keeps_chain_and_skips_segments(tmp_path: Path):
+    log = tmp_path / "audit.jsonl"
+    for i in range(1, 13):
+        append_audit_events(log, [_event(i, case_id="old" if i <= 6 else "new")], max_segment_bytes=600)
+    segments = load_segment_index(log)
+    assert [s["case_ids"] for s in segments] == [["old"], ["old"], ["new"]]
+    assert sum(s["events"] for s in segments) + len(log.read_text(encoding="utf-8").splitlines()) == 12
+    assert len(load_audit_events(log)) == 12
+    assert [e["variant_id"] for e in iter_audit_events(log, case_id="old")][-1] == "chr1-6-A-G"
+    assert verify_audit_chain(log).ok
+
+    (tmp_path / segments[2]["file"]).unlink()
+    assert len(list(iter_audit_events(log, case_id="old"))) == 6
+    assert not verify_audit_chain(log, use_checkpoint=False).ok
+
+
+def test_unchained_legacy_prefix_is_accepted(tmp_path: Path):
+    log = tmp_path / "audit.jsonl"
+    log.write_text(_event(1).model_dump_json(exclude={"prev_hash"}) + "\n", encoding="utf-8")
+    append_audit_event(log, _event(2))
+    assert verify_audit_chain(log, use_checkpoint=False).ok
+    with log.open("a", encoding="utf-8") as fh:
+        fh.write(_event(3).model_dump_json(exclude={"prev_hash"}) + "\n")
+    assert not verify_audit_chain(log, use_checkpoint=False).ok
+
+
+def test_writer_commits_in_batches(tmp_path: Path):
+    log = tmp_path / "audit.jsonl"
+    with AuditWriter(log, durability="none", batch_size=4) as writer:
+        for i in range(1, 6):
+            writer.write(_event(i))
+        assert writer.committed == 4
+        assert len(load_audit_events(log)) == 4
+    assert writer.committed == 5
+    assert [e["variant_id"] for e in load_audit_events(log)] == [f"chr1-{i}-A-G" for i in range(1, 6)]
+    assert verify_audit_chain(log).ok
+
+
+@pytest.mark.parametrize("durability", ["none", "flush", "fsync"])
+def test_writer_is_thread_safe(tmp_path: Path, durability: str):
+    log = tmp_path / "audit.jsonl"
+    with AuditWriter(log, durability=durability, batch_size=16) as writer, ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: writer.write(_event(i)), range(400)))
+    events = load_audit_events(log)
+    assert sorted(int(e["variant_id"].split("-")[1]) for e in events) == list(range(400))
+    assert verify_audit_chain(log, use_checkpoint=False).ok
+
+
+def test_concurrent_commits_share_syncs(tmp_path: Path, monkeypatch):
+    log = tmp_path / "audit.jsonl"
+    syncs = []
+
+    def slow_sync(fd: int) -> None:
+        syncs.append(fd)
+        time.sleep(0.05)
+
+    monkeypatch.setattr(audit, "_fdatasync", slow_sync)
+    monkeypatch.setattr(audit.settings, "audit_durability", "flush")
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: commit_audit_events(log, [_event(i)]), range(16)))
+    assert len(load_audit_events(log)) == 16
+    assert 1 <= len(syncs) < 16
+    assert verify_audit_chain(log, use_checkpoint=False).ok
+
+
+def test_failed_flush_keeps_events(tmp_path: Path, monkeypatch):
+    log = tmp_path / "audit.jsonl"
+    writer = AuditWriter(log, durability="none")
+    writer.write(_event(1))
+    real = audit.append_audit_events
+
+    def fail_once(*args, **kwargs):
+        monkeypatch.setattr(audit, "append_audit_events", real)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(audit, "append_audit_events", fail_once)
+    with pytest.raises(OSError):
+        writer.flush()
+    writer.write(_event(2))
+    writer.close()
+    assert [e["variant_id"] for e in load_audit_events(log)] == ["chr1-1-A-G", "chr1-2-A-G"]
+
+
+def test_unknown_durability_is_rejected(tmp_path: Path):
+    with pytest.raises(InputValidationError):
+        AuditWriter(tmp_path / "audit.jsonl", durability="sometimes")
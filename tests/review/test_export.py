@@ -0,0 +1,79 @@
+import json
+import tarfile
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from clinreport.cli import app
+from clinreport.core.models import ReviewerDecision
+from clinreport.review.export import file_digest, write_final_export
+from clinreport.review.signoff import save_reviewer_decision
+
+runner = CliRunner()
+
+REPORT = {"sample": "S1", "important_variants": [{"chrom": "chr1", "pos": i} for i in range(2000)]}
+PACKET = {"variant": {"variant_id": "chr1-100-A-G"}, "packet": {"summary": "ok"}}
+
+
+def _inputs(tmp_path: Path) -> tuple[Path, Path, Path]:
+    report = tmp_path / "report.json"
+    report.write_text(json.dumps(REPORT, indent=2), encoding="utf-8")
+    packet = tmp_path / "packet.json"
+    packet.write_text(json.dumps(PACKET), encoding="utf-8")
+    decisions = tmp_path / "signoff_decisions.json"
+    for case_id, vid in [("case1", "chr1-100-A-G"), ("case1", "chr1-200-A-G"), ("case2", "chr1-100-A-G")]:
+        save_reviewer_decision(
+            decisions, ReviewerDecision(case_id=case_id, variant_id=vid, reviewer="r@example.com", decision="approve")
+        )
+    return report, packet, decisions
+
+
+def test_streamed_export_embeds_report(tmp_path: Path):
+    report, _, _ = _inputs(tmp_path)
+    out = tmp_path / "final.json"
+    decisions = [{"case_id": "case1", "decision": "approve"}, {"case_id": "case1", "decision": "defer"}]
+    write_final_export(out, {"case_id": "case1", "variant_id": "v"}, report, PACKET, iter(decisions))
+    doc = json.loads(out.read_text(encoding="utf-8"))
+    assert doc["report"] == REPORT
+    assert doc["review_packet"] == PACKET
+    assert doc["reviewer_decisions"] == decisions
+    assert doc["case_id"] == "case1"
+
+
+def test_final_export_references_report_and_filters_decisions(tmp_path: Path):
+    report, packet, decisions = _inputs(tmp_path)
+    out = tmp_path / "final.json"
+    bundle = tmp_path / "final.tar.gz"
+    result = runner.invoke(
+        app,
+        [
+            "final-export",
+            "--case-id",
+            "case1",
+            "--report-json",
+            str(report),
+            "--packet-json",
+            str(packet),
+            "--decisions-json",
+            str(decisions),
+            "--out-json",
+            str(out),
+            "--report-mode",
+            "reference",
+            "--bundle",
+            str(bundle),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    doc = json.loads(out.read_text(encoding="utf-8"))
+    sha256, size = file_digest(report)
+    assert doc["report"] == {
+        "sha256": sha256,
+        "bytes": size,
+        "path": str(report),
+        "object": f"objects/{sha256}.json",
+    }
+    assert [(d["case_id"], d["variant_id"]) for d in doc["reviewer_decisions"]] == [("case1", "chr1-100-A-G")]
+    with tarfile.open(bundle) as tar:
+        assert sorted(tar.getnames()) == ["final.json", f"objects/{sha256}.json", "packet/packet.json"]
+        assert json.load(tar.extractfile(f"objects/{sha256}.json")) == REPORT
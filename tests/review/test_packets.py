@@ -0,0 +1,106 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from clinreport.cli import app
+from clinreport.config import settings
+from clinreport.exceptions import InputValidationError
+from clinreport.review.packets import packet_stem, prepare_variants
+from clinreport.technical_review.bam_evidence import BamEvidence
+
+runner = CliRunner()
+
+ROWS = [
+    {"gene": "PAH", "chrom": "chr12", "pos": 102840474, "ref": "T", "alt": "C", "gt": "1/1", "clinvar": "Pathogenic"},
+    {"gene": "CFTR", "chrom": "chr7", "pos": 117559590, "ref": "ATCT", "alt": "A", "dp": 4, "clinvar": "Pathogenic"},
+    {"gene": "BRCA2", "chrom": "chr13", "pos": 32340300, "ref": "G", "alt": "T", "dp": 80, "gq": 99, "clinvar": "Benign"},
+]
+
+
+def test_prepare_variants_assesses_every_row():
+    prepared = prepare_variants(ROWS)
+    assert [p.variant.variant_id for p in prepared] == [
+        "chr12-102840474-T-C",
+        "chr7-117559590-ATCT-A",
+        "chr13-32340300-G-T",
+    ]
+    assert all(p.queue for p in prepared)
+
+
+def test_prepare_variants_uses_bam_evidence():
+    bam = {"chr13-32340300-G-T": BamEvidence(80, 70, 10, 0.0, 12.0, 30.0, 0.05)}
+    plain, with_bam = prepare_variants(ROWS[2:]), prepare_variants(ROWS[2:], bam_evidence=bam)
+    assert {"strand_bias", "low_mapping_quality"} <= set(with_bam[0].authenticity.reason_codes)
+    assert with_bam[0].authenticity.authenticity_score < plain[0].authenticity.authenticity_score
+
+
+def test_prepare_variants_validates_vaf():
+    [prepared] = prepare_variants([{**ROWS[2], "vaf": "0.12"}])
+    assert prepared.variant.vaf == 0.12
+    with pytest.raises(InputValidationError, match="chr13-32340300-G-T"):
+        prepare_variants([{**ROWS[2], "vaf": "n/a"}])
+
+
+def test_packet_stem_bounds_long_alleles():
+    stem = packet_stem("chr1-100-" + "A" * 500 + "-A")
+    assert len(stem) <= 96
+    assert stem != packet_stem("chr1-100-" + "A" * 499 + "-A")
+
+
+def test_all_variants_writes_packets_queue_index_and_grouped_audit(tmp_path: Path):
+    report = tmp_path / "report.json"
+    report.write_text(json.dumps({"important_variants": ROWS}), encoding="utf-8")
+    review = tmp_path / "review"
+    r = runner.invoke(
+        app,
+        [
+            "review-packet",
+            "--case-id",
+            "caseA",
+            "--report-json",
+            str(report),
+            "--out-json",
+            str(review / "packet.json"),
+            "--all-variants",
+        ],
+    )
+    assert r.exit_code == 0, r.output
+
+    index = json.loads((review / "queue_index.json").read_text(encoding="utf-8"))
+    assert [v["variant_id"] for v in index["variants"]] == [p.variant.variant_id for p in prepare_variants(ROWS)]
+    assert sum(index["queue_counts"].values()) == 3
+    for entry in index["variants"]:
+        packet = json.loads(Path(entry["packet_json"]).read_text(encoding="utf-8"))
+        assert packet["packet"]["variant_id"] == entry["variant_id"]
+        assert packet["queue"] == entry["queue"]
+        assert Path(entry["packet_md"]).exists()
+
+    events = [json.loads(x) for x in (review / "audit.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [e["variant_id"] for e in events] == [v["variant_id"] for v in index["variants"]]
+    assert all(e["payload"]["batch"] for e in events)
+
+
+def test_compressed_reference_only_needed_for_bam_unless_context_requested(tmp_path: Path, monkeypatch):
+    samtools = tmp_path / "samtools"
+    samtools.write_text(f"#!{sys.executable}\n", encoding="utf-8")  # mpileup with no covering reads
+    samtools.chmod(0o755)
+    monkeypatch.setattr(settings, "samtools_path", str(samtools))
+    report = tmp_path / "report.json"
+    report.write_text(json.dumps({"important_variants": ROWS}), encoding="utf-8")
+    bam = tmp_path / "sample.cram"
+    bam.write_bytes(b"")
+    ref = tmp_path / "ref.fa.gz"
+    ref.write_bytes(b"")
+    args = ["review-packet", "--case-id", "c", "--report-json", str(report), "--out-json", str(tmp_path / "p.json")]
+    args += ["--bam", str(bam), "--reference-fasta", str(ref)]
+
+    r = runner.invoke(app, args)
+    assert r.exit_code == 0, r.output
+
+    r = runner.invoke(app, [*args, "--sequence-context"])
+    assert isinstance(r.exception, InputValidationError)
+    r = runner.invoke(app, [a for a in args if a not in ("--reference-fasta", str(ref))] + ["--sequence-context"])
+    assert isinstance(r.exception, InputValidationError) and "require --reference-fasta" in str(r.exception)
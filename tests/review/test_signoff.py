@@ -1,7 +1,24 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from clinreport.core.models import ReviewerDecision
-from clinreport.review.signoff import has_signoff, save_reviewer_decision
+from clinreport.review.signoff import (
+    has_signoff,
+    index_path,
+    latest_decision,
+    load_decisions,
+    save_reviewer_decision,
+)
+
+
+def _decision(variant_id: str, decision: str = "approve", reviewer: str = "user@example.com") -> ReviewerDecision:
+    return ReviewerDecision(case_id="case1", variant_id=variant_id, reviewer=reviewer, decision=decision)
+
+
+def _save_many(path: str, worker: int) -> None:
+    for i in range(25):
+        save_reviewer_decision(Path(path), _decision(f"chr1-{worker * 100 + i}-A-G"))
 
 
 def test_signoff_persistence_and_lookup(tmp_path: Path):
@@ -16,3 +33,58 @@ def test_signoff_persistence_and_lookup(tmp_path: Path):
         ),
     )
     assert has_signoff(p, "case1", "chr1-100-A-G")
+
+
+def test_latest_decision_wins_and_log_is_append_only(tmp_path: Path):
+    p = tmp_path / "signoff.json"
+    save_reviewer_decision(p, _decision("chr1-100-A-G", "defer"))
+    first = p.read_bytes()
+    save_reviewer_decision(p, _decision("chr1-100-A-G", "approve"))
+    assert p.read_bytes().startswith(first)
+    assert latest_decision(p, "case1", "chr1-100-A-G")["decision"] == "approve"
+    assert [d["decision"] for d in load_decisions(p)] == ["defer", "approve"]
+    assert not has_signoff(p, "case1", "chr2-1-A-G")
+    assert not has_signoff(p, "case2", "chr1-100-A-G")
+
+
+def test_legacy_file_is_read_then_migrated(tmp_path: Path):
+    p = tmp_path / "signoff.json"
+    legacy = [_decision("chr1-100-A-G").model_dump()]
+    p.write_text(json.dumps({"decisions": legacy}, indent=2), encoding="utf-8")
+    assert has_signoff(p, "case1", "chr1-100-A-G")
+    assert load_decisions(p) == legacy
+    save_reviewer_decision(p, _decision("chr1-200-A-G"))
+    assert [d["variant_id"] for d in load_decisions(p)] == ["chr1-100-A-G", "chr1-200-A-G"]
+    assert has_signoff(p, "case1", "chr1-100-A-G")
+
+
+def test_index_rebuilt_and_torn_tail_dropped(tmp_path: Path):
+    p = tmp_path / "signoff.json"
+    save_reviewer_decision(p, _decision("chr1-100-A-G"))
+    for f in tmp_path.glob(index_path(p).name + "*"):
+        f.unlink()
+    with p.open("ab") as fh:
+        fh.write(b'{"case_id": "case1", "variant_id": "chr1-9')
+    assert has_signoff(p, "case1", "chr1-100-A-G")
+    assert len(load_decisions(p)) == 1
+    save_reviewer_decision(p, _decision("chr1-300-A-G"))
+    assert [d["variant_id"] for d in load_decisions(p)] == ["chr1-100-A-G", "chr1-300-A-G"]
+    assert has_signoff(p, "case1", "chr1-300-A-G")
+
+
+def test_torn_first_line_is_repaired_not_treated_as_legacy(tmp_path: Path):
+    p = tmp_path / "signoff.json"
+    p.write_bytes(b'{"case_id": "case1", "variant_id": "chr1-9')
+    assert not has_signoff(p, "case1", "chr1-100-A-G")
+    assert load_decisions(p) == []
+    save_reviewer_decision(p, _decision("chr1-100-A-G"))
+    assert [d["variant_id"] for d in load_decisions(p)] == ["chr1-100-A-G"]
+    assert has_signoff(p, "case1", "chr1-100-A-G")
+
+
+def test_concurrent_writers_do_not_lose_decisions(tmp_path: Path):
+    p = tmp_path / "signoff.json"
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_save_many, [str(p)] * 4, range(4)))
+    assert len(load_decisions(p)) == 100
+    assert all(has_signoff(p, "case1", f"chr1-{w * 100 + i}-A-G") for w in range(4) for i in range(25))
@@ -0,0 +1,96 @@
+import json
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from clinreport.cli import app
+from clinreport.core.models import AuditEvent, ReviewerDecision
+from clinreport.review.audit import append_audit_event, append_audit_events, load_audit_events
+from clinreport.review.signoff import has_signoff, load_decisions, save_reviewer_decision
+from clinreport.review.store import ReviewStore
+
+runner = CliRunner()
+
+ENTRIES = [
+    {"variant_id": "chr1-100-A-G", "gene": "PAH", "queue": "expert_review", "packet_json": "a.json"},
+    {"variant_id": "chr1-200-A-G", "gene": "CFTR", "queue": "expert_review", "packet_json": "b.json"},
+    {"variant_id": "chr1-300-A-G", "gene": "BRCA2", "queue": "fast_track", "packet_json": "c.json"},
+]
+
+
+def _decision(variant_id: str, case_id: str = "case1") -> ReviewerDecision:
+    return ReviewerDecision(case_id=case_id, variant_id=variant_id, reviewer="user@example.com", decision="approve")
+
+
+def _sign_many(path: str, worker: int) -> None:
+    for i in range(20):
+        save_reviewer_decision(Path(path), _decision(f"chr2-{worker * 100 + i}-A-G"))
+
+
+def test_signoff_and_audit_functions_use_store_paths(tmp_path: Path):
+    db = tmp_path / "review.sqlite"
+    save_reviewer_decision(db, _decision("chr1-100-A-G"))
+    append_audit_event(db, AuditEvent(event_type="reviewer_signoff", case_id="case1", variant_id="chr1-100-A-G"))
+    append_audit_events(db, [AuditEvent(event_type="final_export_generated", case_id="case2")])
+    assert has_signoff(db, "case1", "chr1-100-A-G")
+    assert not has_signoff(db, "case2", "chr1-100-A-G")
+    assert [d["variant_id"] for d in load_decisions(db)] == ["chr1-100-A-G"]
+    assert [e["event_type"] for e in load_audit_events(db)] == ["reviewer_signoff", "final_export_generated"]
+    with ReviewStore(db) as store:
+        assert [e["case_id"] for e in store.iter_events(event_type="final_export_generated")] == ["case2"]
+        assert store._db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_unsigned_queue_query(tmp_path: Path):
+    with ReviewStore(tmp_path / "review.sqlite") as store:
+        store.put_packets("case1", ENTRIES)
+        store.add_decision(_decision("chr1-100-A-G"))
+        store.add_decision(_decision("chr1-200-A-G", case_id="case2"))
+        unsigned = store.queue_entries(queue="expert_review", unsigned_only=True)
+        assert [e["variant_id"] for e in unsigned] == ["chr1-200-A-G"]
+        assert len(store.queue_entries(case_id="case1")) == 3
+
+
+def test_packet_writes_are_atomic(tmp_path: Path):
+    with ReviewStore(tmp_path / "review.sqlite") as store:
+        with pytest.raises(sqlite3.IntegrityError):
+            store.put_packets("case1", [ENTRIES[0], {**ENTRIES[1], "queue": None}])
+        assert store.queue_entries() == []
+        store.put_packets("case1", ENTRIES)
+        assert len(store.queue_entries()) == 3
+
+
+def test_export_round_trips_to_file_formats(tmp_path: Path):
+    db = tmp_path / "review.sqlite"
+    with ReviewStore(db) as store:
+        store.put_packets("case1", ENTRIES)
+        store.add_decision(_decision("chr1-100-A-G"))
+        store.add_decision(_decision("chr1-100-A-G", case_id="case2"))
+        store.append_events([AuditEvent(event_type="reviewer_signoff", case_id="case1")])
+        store.export_json(tmp_path / "out", case_id="case1")
+    out = tmp_path / "out"
+    assert has_signoff(out / "signoff_decisions.json", "case1", "chr1-100-A-G")
+    assert len(load_decisions(out / "signoff_decisions.json")) == 1
+    assert len(load_audit_events(out / "audit.jsonl")) == 1
+    index = json.loads((out / "queue_index.json").read_text(encoding="utf-8"))
+    assert index["queue_counts"] == {"expert_review": 2, "fast_track": 1}
+
+
+def test_concurrent_reviewers(tmp_path: Path):
+    db = tmp_path / "review.sqlite"
+    ReviewStore(db).close()
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_sign_many, [str(db)] * 4, range(4)))
+    assert len(load_decisions(db)) == 80
+
+
+def test_review_queue_command(tmp_path: Path):
+    db = tmp_path / "review.sqlite"
+    with ReviewStore(db) as store:
+        store.put_packets("case1", ENTRIES)
+    result = runner.invoke(app, ["review-queue", "--store", str(db), "--queue", "fast_track"])
+    assert result.exit_code == 0, result.output
+    assert [e["variant_id"] for e in json.loads(result.output)] == ["chr1-300-A-G"]
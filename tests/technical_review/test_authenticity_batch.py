@@ -0,0 +1,86 @@
+import itertools
+
+import numpy as np
+
+from clinreport.core.models import TechnicalEvidence, VariantRecordModel
+from clinreport.technical_review.authenticity_engine import (
+    TechnicalAuthenticityEngine,
+    filter_passes,
+)
+
+DP = [None, 0, 9, 10, 50]
+GQ = [None, 0, 19, 20, 99]
+VAF = [None, 0.0, 0.049, 0.05, 0.1, 0.19999, 0.2, 0.5, 1.0]
+AD = [(None, None), (0, 0), (None, 5), (97, 3), (90, 10), (80, 20), (10, 10)]
+FILTER = ["PASS", ".", "", None, "LowQual"]
+LOW_CX = [False, True]
+
+
+def test_assess_batch_matches_scalar_on_exhaustive_grid():
+    engine = TechnicalAuthenticityEngine()
+    grid = list(itertools.product(DP, GQ, VAF, AD, FILTER, LOW_CX))
+    ids = [f"chr1-{i}-A-G" for i in range(len(grid))]
+
+    batch = engine.assess_batch(
+        len(grid),
+        dp=[g[0] for g in grid],
+        gq=[g[1] for g in grid],
+        vaf=[g[2] for g in grid],
+        ad_ref=[g[3][0] for g in grid],
+        ad_alt=[g[3][1] for g in grid],
+        filter_pass=[filter_passes(g[4]) for g in grid],
+        low_complexity=[g[5] for g in grid],
+        variant_ids=ids,
+    )
+
+    for i, (dp, gq, vaf, (ad_ref, ad_alt), filt, low_cx) in enumerate(grid):
+        variant = VariantRecordModel(variant_id=ids[i], chrom="chr1", pos=i, ref="A", alt="G", filter=filt)
+        evidence = TechnicalEvidence(
+            dp=dp, gq=gq, vaf=vaf, ad_ref=ad_ref, ad_alt=ad_alt, in_low_complexity_region=low_cx
+        )
+        assert batch.assessment(i) == engine.assess(variant, evidence), grid[i]
+
+
+def test_assess_batch_accepts_numpy_columns_with_nan_as_missing():
+    engine = TechnicalAuthenticityEngine()
+    batch = engine.assess_batch(
+        3,
+        dp=np.array([40, np.nan, 5]),
+        gq=np.array([99, np.nan, 10]),
+        vaf=np.array([0.48, np.nan, 0.02]),
+        low_complexity=np.array([False, False, True]),
+    )
+    assert list(batch.labels()) == ["likely_real", "uncertain", "likely_artifact"]
+    assert batch.score[1] == 0.5 and batch.reason_bits[1] == 0
+    assert [m.variant_id for m in batch.to_models()] == ["0", "1", "2"]
+
+
+def test_assess_batch_matches_scalar_with_read_level_metrics():
+    engine = TechnicalAuthenticityEngine()
+    grid = list(
+        itertools.product(
+            [None, 9, 40],
+            [None, 0.02, 0.5],
+            [None, 0.0, 0.1, 0.5],
+            [None, 10.0, 30.0, 60.0],
+            [None, 12.5, 20.0, 37.0],
+            [None, 0.0, 0.3, 0.31],
+        )
+    )
+    batch = engine.assess_batch(
+        len(grid),
+        dp=[g[0] for g in grid],
+        vaf=[g[1] for g in grid],
+        strand_balance=[g[2] for g in grid],
+        mapping_quality=[g[3] for g in grid],
+        base_quality=[g[4] for g in grid],
+        duplicate_rate=[g[5] for g in grid],
+        variant_ids=[str(i) for i in range(len(grid))],
+    )
+    variant = VariantRecordModel(variant_id="0", chrom="chr1", pos=1, ref="A", alt="G")
+    for i, (dp, vaf, sb, mq, bq, dup) in enumerate(grid):
+        evidence = TechnicalEvidence(
+            dp=dp, vaf=vaf, strand_balance=sb, mapping_quality=mq, base_quality=bq, duplicate_rate=dup
+        )
+        expected = engine.assess(variant.model_copy(update={"variant_id": str(i)}), evidence)
+        assert batch.assessment(i) == expected, grid[i]
@@ -0,0 +1,130 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from clinreport.exceptions import ExternalToolError
+from clinreport.technical_review.bam_evidence import (
+    BamEvidence,
+    BamEvidenceParams,
+    Locus,
+    PileupEntry,
+    extract_bam_evidence,
+    parse_pileup_bases,
+    plan_pileup_shards,
+    site_evidence,
+)
+
+# Pileup lines keyed by (chrom, pos); the fake only prints positions listed in the -l BED.
+FAKE_SAMTOOLS = """#!{python}
+import sys
+
+PILEUP = {{
+    ("chr1", 100): "chr1\\t100\\tA\\t6\\t..GgGg\\tIIIIII\\t<<<<<<\\t0,0,0,0,1024,0",
+    ("chr1", 150): "chr1\\t150\\tC\\t3\\t.+2TT,+2tt.\\tIII\\t<<<\\t0,0,0",
+    ("chr2", 50): "chr2\\t50\\tT\\t2\\t.,\\tII\\t<<\\t0,0",
+}}
+# What mpileup prints without -f: literal bases, reference column N.
+LITERAL = {{
+    ("chr4", 10): "chr4\t10\tN\t6\tAaAGgG\tIIIIII\t<<<<<<\t0,0,0,0,0,0",
+}}
+args = sys.argv[1:]
+if "-f" not in args:
+    PILEUP.update(LITERAL)
+if {noisy}:
+    # More than a pipe buffer of warnings before any output, as CRAM decoding can produce.
+    sys.stderr.write("[W::cram_decode] reference mismatch\\n" * 10000)
+if "{fail}" and "{fail}" in args[args.index("-r") + 1]:
+    sys.stderr.write("boom\\n")
+    sys.exit(1)
+with open(args[args.index("-l") + 1]) as fh:
+    for line in fh:
+        chrom, _, end = line.split()
+        if (chrom, int(end)) in PILEUP:
+            print(PILEUP[(chrom, int(end))])
+"""
+
+
+def _fake_samtools(tmp_path: Path, fail: str = "", noisy: bool = False) -> str:
+    script = tmp_path / "fake_samtools.py"
+    script.write_text(FAKE_SAMTOOLS.format(python=sys.executable, fail=fail, noisy=noisy), encoding="utf-8")
+    os.chmod(script, 0o755)
+    return str(script)
+
+
+def _locus(chrom: str, pos: int, ref: str = "A", alt: str = "G") -> Locus:
+    return Locus(f"{chrom}-{pos}-{ref}-{alt}", chrom, pos, ref, alt)
+
+
+def test_parse_pileup_bases_handles_markers_and_indels():
+    entries = parse_pileup_bases("^~.,$A+2ACt-1G*#")
+    assert entries == [
+        PileupEntry(".", False, ""),
+        PileupEntry(".", True, ""),
+        PileupEntry("A", False, "+2AC"),
+        PileupEntry("T", True, "-1G"),
+        PileupEntry("*", False, ""),
+        PileupEntry("*", True, ""),
+    ]
+
+
+def test_site_evidence_snv_excludes_duplicates():
+    ev = site_evidence(_locus("chr1", 100), "..GgGg", "IIII+I", "<<<<<(", "0,0,0,0,1024,0")
+    # One of the four alt reads is a duplicate: 2 forward, 1 reverse remain.
+    assert ev == BamEvidence(
+        dp=5, ad_ref=2, ad_alt=3, strand_balance=0.3333, mapping_quality=23.0, base_quality=40.0, duplicate_rate=0.1667
+    )
+
+
+def test_site_evidence_insertion_and_deletion():
+    ins = site_evidence(_locus("chr1", 150, "C", "CTT"), ".+2TT,+2tt.,+1T", "IIII", "<<<<", "0,0,0,0")
+    assert (ins.ad_ref, ins.ad_alt, ins.strand_balance) == (1, 2, 0.5)
+    dele = site_evidence(_locus("chr1", 150, "CAG", "C"), ".-2AG.-2AG,", "III", "<<<", "0,0,0")
+    assert (dele.ad_ref, dele.ad_alt, dele.strand_balance) == (1, 2, 0.0)
+
+
+def test_site_evidence_without_reads():
+    ev = site_evidence(_locus("chr1", 100), "*", "*", "*", "*")
+    assert ev == BamEvidence(0, 0, 0, None, None, None, None)
+
+
+def test_plan_pileup_shards_merges_neighbours():
+    loci = [_locus("chr2", 50), _locus("chr1", 150), _locus("chr1", 100), _locus("chr1", 50_000)]
+    shards = plan_pileup_shards(loci, max_gap=1000, max_loci=10)
+    assert [(s.chrom, s.start, s.end, len(s.loci)) for s in shards] == [
+        ("chr1", 100, 150, 2),
+        ("chr1", 50_000, 50_000, 1),
+        ("chr2", 50, 50, 1),
+    ]
+    assert len(plan_pileup_shards(loci, max_gap=10**9, max_loci=1)) == 4
+
+
+def test_extract_bam_evidence_runs_sharded_mpileup(tmp_path: Path):
+    params = BamEvidenceParams(bam_or_cram="sample.bam", samtools_path=_fake_samtools(tmp_path), max_gap=1000)
+    loci = [_locus("chr1", 100), _locus("chr1", 150, "C", "CTT"), _locus("chr2", 50, "T", "C"), _locus("chr3", 9)]
+    out = extract_bam_evidence(loci, params, workers=2)
+    assert set(out) == {x.variant_id for x in loci}
+    assert out["chr1-100-A-G"].ad_alt == 3
+    assert out["chr1-150-C-CTT"].ad_alt == 2
+    assert out["chr2-50-T-C"] == BamEvidence(2, 2, 0, None, 27.0, None, 0.0)
+    assert out["chr3-9-A-G"].dp == 0
+
+
+def test_extract_bam_evidence_without_reference_counts_literal_ref_bases(tmp_path: Path):
+    params = BamEvidenceParams(bam_or_cram="sample.bam", samtools_path=_fake_samtools(tmp_path))
+    out = extract_bam_evidence([_locus("chr4", 10)], params, workers=1)
+    ev = out["chr4-10-A-G"]
+    assert (ev.dp, ev.ad_ref, ev.ad_alt) == (6, 3, 3)
+
+
+def test_extract_bam_evidence_reports_failed_shards(tmp_path: Path):
+    params = BamEvidenceParams(bam_or_cram="sample.bam", samtools_path=_fake_samtools(tmp_path, fail="chr2"))
+    with pytest.raises(ExternalToolError, match="1 of 2 shard(.|\n)*boom"):
+        extract_bam_evidence([_locus("chr1", 100), _locus("chr2", 50)], params, workers=2)
+
+
+def test_extract_bam_evidence_tolerates_noisy_stderr(tmp_path: Path):
+    params = BamEvidenceParams(bam_or_cram="sample.bam", samtools_path=_fake_samtools(tmp_path, noisy=True))
+    out = extract_bam_evidence([_locus("chr1", 100)], params, workers=1)
+    assert out["chr1-100-A-G"].ad_alt == 3
@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from clinreport.exceptions import InputValidationError
+from clinreport.technical_review.bam_evidence import Locus
+from clinreport.technical_review.sequence_context import (
+    ReferenceFasta,
+    RepeatIndex,
+    annotate_sequence_context,
+    dust_scores,
+    homopolymer_runs,
+    index_fasta,
+)
+
+RANDOM = "ACGTTGCAGTCCATGAGCTAGGCTACGATCGTAGCATGCTAGTCAGTACGGATCCATGCAGTAC"
+
+
+def _fasta(tmp_path: Path, width: int = 10) -> Path:
+    contigs = {
+        "chr1": RANDOM + "A" * 12 + RANDOM,
+        "chr2": "ATATATATATATATATATATATATATATATATATATATATATATATATATAT" + "acgtNNgt",
+    }
+    path = tmp_path / "ref.fa"
+    with path.open("w", encoding="utf-8") as fh:
+        for name, seq in contigs.items():
+            fh.write(f">{name} description\n")
+            for i in range(0, len(seq), width):
+                fh.write(seq[i : i + width] + "\n")
+    index_fasta(path)
+    return path
+
+
+def _locus(chrom: str, pos: int) -> Locus:
+    return Locus(f"{chrom}-{pos}", chrom, pos, "A", "G")
+
+
+def test_fetch_spans_line_breaks_and_masks(tmp_path: Path):
+    with ReferenceFasta(_fasta(tmp_path, width=7)) as fasta:
+        assert fasta.index["chr1"].length == 2 * len(RANDOM) + 12
+        assert fasta.fetch("chr1", 5, 20) == RANDOM[4:20]
+        assert fasta.fetch("chr2", 53, 58) == "ACGTNN"
+        assert fasta.fetch("chr2", 55, 1000) == "GTNNGT"
+
+
+def test_missing_index_and_contig(tmp_path: Path):
+    path = _fasta(tmp_path)
+    with ReferenceFasta(path) as fasta, pytest.raises(InputValidationError):
+        fasta.fetch("chrZ", 1, 2)
+    path.with_name("ref.fa.fai").unlink()
+    with pytest.raises(InputValidationError, match="samtools faidx"):
+        ReferenceFasta(path)
+
+
+def test_windows_pad_contig_edges(tmp_path: Path):
+    with ReferenceFasta(_fasta(tmp_path)) as fasta:
+        w = fasta.windows([_locus("chr1", 2)], flank=3)
+    assert w.tolist() == [[4, 4, 0, 1, 2, 3, 3]]
+
+
+def test_dust_and_homopolymer_scores():
+    windows = np.array([[0] * 9, [0, 3] * 4 + [0], [0, 1, 2, 3, 3, 2, 1, 0, 4]], dtype=np.uint8)
+    dust = dust_scores(windows)
+    assert dust[0] == pytest.approx(7 * 6 / 2 / 6)
+    assert dust[2] == 0
+    assert homopolymer_runs(windows).tolist() == [9, 1, 2]
+
+
+def test_annotate_sequence_context(tmp_path: Path):
+    bed = tmp_path / "repeats.bed"
+    bed.write_text("chr1\t0\t3\nchr1\t2\t10\nchr2\t100\t200\n", encoding="utf-8")
+    loci = [_locus("chr1", 30), _locus("chr1", len(RANDOM) + 6), _locus("chr2", 20), _locus("chr1", 10)]
+    with ReferenceFasta(_fasta(tmp_path)) as fasta:
+        ctx = annotate_sequence_context(loci, fasta, RepeatIndex.from_bed(bed))
+    assert not ctx["chr1-30"].low_complexity
+    assert ctx["chr1-70"].homopolymer_run == 13 and ctx["chr1-70"].low_complexity
+    assert ctx["chr2-20"].dust_score > 2.0 and ctx["chr2-20"].low_complexity
+    assert ctx["chr1-10"].in_repeat and not ctx["chr1-30"].in_repeat
@@ -1,8 +1,44 @@
+import os
+import sys
 from pathlib import Path
 
-from clinreport.igv.batch import IgvBatchParams, write_igv_batch
+from clinreport.igv.batch import (
+    IgvBatchParams,
+    plan_snapshot_regions,
+    write_igv_batch,
+    write_igv_batch_shards,
+)
+from clinreport.igv.runner import run_igv_shards
 from clinreport.vcf.io import VariantRecord
 
+FAKE_IGV = """#!{python}
+import sys
+from pathlib import Path
+
+batch = Path(sys.argv[sys.argv.index("--batch") + 1])
+marker = batch.with_suffix(".attempted")
+if "{flaky}" in batch.name and not marker.exists():
+    marker.write_text("1")
+    sys.exit(1)
+snap_dir = None
+for line in batch.read_text().splitlines():
+    if line.startswith("snapshotDirectory "):
+        snap_dir = Path(line.split(" ", 1)[1])
+    elif line.startswith("snapshot "):
+        (snap_dir / line.split(" ", 1)[1]).write_bytes(b"png")
+"""
+
+
+def _variant(pos: int, chrom: str = "chr1", ref: str = "A") -> VariantRecord:
+    return VariantRecord(chrom, pos, ref, "G", None, 50.0, "PASS", {}, "S", "0/1", 20, 30, 10, 10)
+
+
+def _fake_igv(tmp_path: Path, flaky: str = "") -> str:
+    script = tmp_path / "fake_igv.py"
+    script.write_text(FAKE_IGV.format(python=sys.executable, flaky=flaky), encoding="utf-8")
+    os.chmod(script, 0o755)
+    return str(script)
+
 
 def test_igv_batch_contains_snapshot_commands(tmp_path: Path):
     v = VariantRecord("chr1", 100, "A", "G", None, 50.0, "PASS", {}, "S", "0/1", 20, 30, 10, 10)
@@ -13,3 +49,49 @@ def test_igv_batch_contains_snapshot_commands(tmp_path: Path):
     assert "snapshotDirectory" in txt
     assert "snapshot" in txt
     assert "goto" in txt
+
+
+def test_shards_keep_order_and_snapshot_names(tmp_path: Path):
+    variants = [_variant(100 * i) for i in range(1, 11)]
+    params = IgvBatchParams(genome="hg38", bam_or_cram="sample.bam", snapshot_dir=tmp_path / "snaps")
+    regions = plan_snapshot_regions(variants, params, "SAMPLE")
+    shards = write_igv_batch_shards(tmp_path / "batches", regions, params, n_shards=3)
+    assert [len(s.snapshots) for s in shards] == [4, 3, 3]
+    names = [fn for s in shards for fn in s.snapshots]
+    single = write_igv_batch(tmp_path / "single.igv", variants, params, sample_name="SAMPLE")
+    assert names == single
+    assert all(s.prefs_file.exists() for s in shards)
+
+
+def test_failed_shard_is_retried(tmp_path: Path):
+    variants = [_variant(100 * i) for i in range(1, 7)]
+    params = IgvBatchParams(genome="hg38", bam_or_cram="sample.bam", snapshot_dir=tmp_path / "snaps")
+    regions = plan_snapshot_regions(variants, params, "SAMPLE")
+    shards = write_igv_batch_shards(tmp_path / "batches", regions, params, n_shards=3)
+    run_igv_shards(shards, workers=3, retries=1, igv_sh_path=_fake_igv(tmp_path, flaky="shard_001"))
+    assert (tmp_path / "batches" / "shard_001.attempted").exists()
+    assert len(list((tmp_path / "snaps").glob("*.png"))) == 6
+
+
+def test_clustering_merges_overlapping_windows(tmp_path: Path):
+    params = IgvBatchParams(genome="hg38", bam_or_cram="sample.bam", snapshot_dir=tmp_path / "snaps")
+    variants = [_variant(1000), _variant(1150), _variant(1180, ref="AT"), _variant(5000), _variant(1100, "chr2")]
+
+    unclustered = plan_snapshot_regions(variants, params, "SAMPLE")
+    assert len(unclustered) == 5
+
+    regions = plan_snapshot_regions(variants, params, "SAMPLE", cluster_max_width=1000)
+    assert [(r.locus, len(r.variants)) for r in regions] == [
+        ("chr1:900-1430", 3),
+        ("chr1:4900-5100", 1),
+        ("chr2:1000-1200", 1),
+    ]
+    assert regions[0].filename == "SAMPLE_chr1_900-1430.png"
+    assert regions[1].filename == "SAMPLE_chr1_5000_A_G.png"
+
+
+def test_clustering_respects_max_width(tmp_path: Path):
+    params = IgvBatchParams(genome="hg38", bam_or_cram="sample.bam", snapshot_dir=tmp_path / "snaps")
+    variants = [_variant(1000), _variant(1150), _variant(1300)]
+    regions = plan_snapshot_regions(variants, params, "SAMPLE", cluster_max_width=400)
+    assert [len(r.variants) for r in regions] == [2, 1]
@@ -0,0 +1,50 @@
+import os
+from pathlib import Path
+
+from clinreport.igv.batch import IgvBatchParams, plan_snapshot_regions
+from clinreport.igv.cache import SnapshotCache, snapshot_inputs_fingerprint, snapshot_key
+from clinreport.vcf.io import VariantRecord
+
+
+def _setup(tmp_path: Path, window_bp_snv: int = 100):
+    bam = tmp_path / "sample.bam"
+    if not bam.exists():
+        bam.write_bytes(b"bam")
+        (tmp_path / "sample.bam.bai").write_bytes(b"index-v1")
+    params = IgvBatchParams(
+        genome="hg38", bam_or_cram=str(bam), snapshot_dir=tmp_path / "snaps", window_bp_snv=window_bp_snv
+    )
+    v = VariantRecord("chr1", 1000, "A", "G", None, 50.0, "PASS", {}, "S", "0/1", 20, 30, 10, 10)
+    region = plan_snapshot_regions([v], params, "SAMPLE")[0]
+    return params, region
+
+
+def test_snapshot_reused_only_for_identical_inputs(tmp_path: Path):
+    params, region = _setup(tmp_path)
+    key = snapshot_key(snapshot_inputs_fingerprint(params), region)
+
+    cache = SnapshotCache(params.snapshot_dir)
+    assert not cache.is_fresh(region.filename, key)
+    params.snapshot_dir.mkdir()
+    (params.snapshot_dir / region.filename).write_bytes(b"png")
+    cache.record(region.filename, key)
+    cache.save()
+
+    reloaded = SnapshotCache(params.snapshot_dir)
+    assert reloaded.is_fresh(region.filename, key)
+
+    wider_params, wider_region = _setup(tmp_path, window_bp_snv=150)
+    assert snapshot_key(snapshot_inputs_fingerprint(wider_params), wider_region) != key
+
+
+def test_alignment_index_change_invalidates_key(tmp_path: Path):
+    params, region = _setup(tmp_path)
+    before = snapshot_key(snapshot_inputs_fingerprint(params), region)
+    (tmp_path / "sample.bam.bai").write_bytes(b"index-v2")
+    assert snapshot_key(snapshot_inputs_fingerprint(params), region) != before
+
+    st = os.stat(tmp_path / "sample.bam")
+    os.utime(tmp_path / "sample.bam", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    changed = snapshot_key(snapshot_inputs_fingerprint(params), region)
+    (tmp_path / "sample.bam.bai").write_bytes(b"index-v1")
+    assert changed != before
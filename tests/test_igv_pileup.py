@@ -0,0 +1,98 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from clinreport.config import settings
+from clinreport.exceptions import ExternalToolError
+from clinreport.igv.batch import SnapshotRegion
+from clinreport.igv.pileup import (
+    BASE_COLORS,
+    PileupParams,
+    iter_region_reads,
+    pack_rows,
+    parse_sam_line,
+    render_reads_png,
+    render_regions,
+)
+
+# Fake `samtools view`: floods stderr before writing any SAM, emits a malformed
+# record for chr2, and for chr3 keeps streaming until it is killed.
+FAKE_SAMTOOLS = """#!{python}
+import sys, time
+locus = sys.argv[-1]
+sys.stderr.write("[W::cram] reference warning\\n" * 10000)
+sys.stderr.flush()
+line = "\\t".join(["r", "0", "chr1", "101", "60", "10M", "*", "0", "0", "ACGTACGTAC", "*"])
+if locus.startswith("chr2"):
+    line = line.replace("\\t101\\t", "\\tnot-a-number\\t")
+print(line, flush=True)
+while locus.startswith("chr3"):
+    print(line, flush=True)
+    time.sleep(0.01)
+"""
+
+
+def _sam(pos: int, cigar: str, seq: str, flag: int = 0, mapq: int = 60) -> str:
+    return "\t".join(["r", str(flag), "chr1", str(pos), str(mapq), cigar, "*", "0", "0", seq, "*"])
+
+
+def test_parse_sam_line_reads_strand_and_cigar():
+    read = parse_sam_line(_sam(100, "5M2D3M", "ACGTAACG", flag=16))
+    assert read.reverse
+    assert read.cigar == (("M", 5), ("D", 2), ("M", 3))
+    assert read.end == 109
+    assert parse_sam_line(_sam(100, "*", "ACGT")) is None
+
+
+def test_pack_rows_stacks_overlapping_reads():
+    reads = [parse_sam_line(_sam(p, "10M", "A" * 10)) for p in (100, 105, 111, 120)]
+    rows = pack_rows(reads, max_rows=10)
+    assert [[r.pos for r in row] for row in rows] == [[100, 111], [105, 120]]
+    assert len(pack_rows(reads, max_rows=1)) == 1
+
+
+def test_render_marks_mismatch_with_base_color(tmp_path: Path):
+    reference = "AAAAAAAAAA"
+    read = parse_sam_line(_sam(101, "10M", "AAAATAAAAA"))
+    params = PileupParams(bam_or_cram="x.bam", snapshot_dir=tmp_path, width_px=100, coverage_height_px=10)
+    out = tmp_path / "SAMPLE_chr1_105_A_T.png"
+    render_reads_png([read], 101, 110, out, params, reference=reference, marker_positions=[105])
+
+    img = Image.open(out).convert("RGB")
+    px = 100 // 10
+    y = params.coverage_height_px + 4 + 1
+    assert img.getpixel((4 * px + px // 2, y)) == BASE_COLORS["T"]
+    assert img.getpixel((1 * px + px // 2, y)) != BASE_COLORS["T"]
+
+
+@pytest.fixture
+def fake_samtools(tmp_path: Path, monkeypatch) -> Path:
+    script = tmp_path / "samtools"
+    script.write_text(FAKE_SAMTOOLS.format(python=sys.executable), encoding="utf-8")
+    script.chmod(0o755)
+    monkeypatch.setattr(settings, "samtools_path", str(script))
+    return script
+
+
+def test_region_reads_survive_noisy_stderr_and_early_stop(fake_samtools: Path):
+    reads = list(iter_region_reads("x.bam", "chr1:100-110"))
+    assert [r.pos for r in reads] == [101]
+
+    started = time.monotonic()
+    stream = iter_region_reads("x.bam", "chr3:100-110")
+    assert next(stream).pos == 101
+    stream.close()  # kills the still-running samtools
+    assert time.monotonic() - started < 10
+
+
+def test_render_regions_records_every_failure(fake_samtools: Path, tmp_path: Path):
+    regions = [
+        SnapshotRegion(chrom, 100, 110, f"SAMPLE_{chrom}_105_A_T.png", ()) for chrom in ("chr1", "chr2")
+    ]
+    params = PileupParams(bam_or_cram="x.bam", snapshot_dir=tmp_path / "snaps")
+    with pytest.raises(ExternalToolError, match=r"1 of 2 region\(s\):\nchr2:100-110: ValueError"):
+        render_regions(regions, params, workers=2)
+    assert (tmp_path / "snaps" / "SAMPLE_chr1_105_A_T.png").exists()
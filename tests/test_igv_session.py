@@ -0,0 +1,118 @@
+import socketserver
+import threading
+from pathlib import Path
+
+import pytest
+
+from clinreport.exceptions import ExternalToolError
+from clinreport.igv.batch import IgvBatchParams, write_igv_batch
+from clinreport.igv.session import IgvSession
+from clinreport.vcf.io import VariantRecord
+
+
+class FakeIgv(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, drop_on_first_goto: bool = False):
+        super().__init__(("127.0.0.1", 0), FakeIgvHandler)
+        self.commands: list[str] = []
+        self.connections = 0
+        self.active = 0
+        self.drop_on_first_goto = drop_on_first_goto
+
+
+class FakeIgvHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server: FakeIgv = self.server
+        if server.active:
+            return  # like IGV, serve one batch client at a time
+        server.connections += 1
+        server.active += 1
+        try:
+            self._serve(server)
+        finally:
+            server.active -= 1
+
+    def _serve(self, server: FakeIgv):
+        snap_dir = None
+        for raw in self.rfile:
+            cmd = raw.decode().strip()
+            if cmd == "echo":
+                self.wfile.write(b"echo\n")
+                continue
+            server.commands.append(cmd)
+            if cmd.startswith("goto") and server.drop_on_first_goto:
+                server.drop_on_first_goto = False
+                return
+            if cmd.startswith("snapshotDirectory "):
+                snap_dir = Path(cmd.split(" ", 1)[1])
+            elif cmd.startswith("snapshot "):
+                (snap_dir / cmd.split(" ", 1)[1]).write_bytes(b"png")
+            self.wfile.write(b"OK\n")
+
+
+@pytest.fixture
+def fake_igv():
+    servers = []
+
+    def start(**kwargs) -> FakeIgv:
+        server = FakeIgv(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _batch(tmp_path: Path, pos: int) -> Path:
+    v = VariantRecord("chr1", pos, "A", "G", None, 50.0, "PASS", {}, "S", "0/1", 20, 30, 10, 10)
+    params = IgvBatchParams(genome="hg38", bam_or_cram="sample.bam", snapshot_dir=tmp_path / "snaps")
+    bat = tmp_path / f"case_{pos}.igv"
+    write_igv_batch(bat, [v], params, sample_name="SAMPLE")
+    return bat
+
+
+def test_session_reuses_connection_and_genome_across_cases(tmp_path: Path, fake_igv):
+    server = fake_igv()
+    session = IgvSession(port=server.server_address[1], launch=False)
+    session.run_batch_file(_batch(tmp_path, 100))
+    session.run_batch_file(_batch(tmp_path, 200))
+    session.close()
+
+    assert server.commands.count("genome hg38") == 1
+    assert "exit" not in server.commands
+    assert sorted(p.name for p in (tmp_path / "snaps").glob("*.png")) == [
+        "SAMPLE_chr1_100_A_G.png",
+        "SAMPLE_chr1_200_A_G.png",
+    ]
+
+
+def test_session_health_checks_over_the_pooled_connection(tmp_path: Path, fake_igv):
+    server = fake_igv()
+    session = IgvSession(port=server.server_address[1], launch=False)
+    for pos in (100, 200, 300):
+        session.run_batch_file(_batch(tmp_path, pos), retries=0)
+    session.close()
+    assert server.connections == 1
+    assert len(list((tmp_path / "snaps").glob("*.png"))) == 3
+
+
+def test_session_reconnects_after_dropped_connection(tmp_path: Path, fake_igv):
+    server = fake_igv(drop_on_first_goto=True)
+    session = IgvSession(port=server.server_address[1], launch=False)
+    session.run_batch_file(_batch(tmp_path, 100), retries=1)
+    session.close()
+    assert (tmp_path / "snaps" / "SAMPLE_chr1_100_A_G.png").exists()
+
+
+def test_session_without_listener_and_launch_disabled_fails(tmp_path: Path, fake_igv):
+    server = fake_igv()
+    port = server.server_address[1]
+    server.shutdown()
+    server.server_close()
+    with pytest.raises(ExternalToolError):
+        IgvSession(port=port, launch=False).run_batch_file(_batch(tmp_path, 100))
@@ -0,0 +1,155 @@
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from clinreport.cli import app
+from clinreport.exceptions import InputValidationError
+from clinreport.pipeline import (
+    RunOptions,
+    read_sample_sheet,
+    run_batch,
+    shared_resources,
+    warm_resources,
+)
+from clinreport.vcf.clinvar import ClinVarIndex, ClinVarStreamMatcher
+from clinreport.vcf.io import iter_variants
+from clinreport.vcf.panels import GenePanel
+
+HEADER = """##fileformat=VCFv4.2
+##contig=<ID={chrom}>
+##INFO=<ID=CLNSIG,Number=.,Type=String,Description="sig">
+##INFO=<ID=GENEINFO,Number=1,Type=String,Description="gene">
+##FILTER=<ID=LowQual,Description="low">
+##FORMAT=<ID=GT,Number=1,Type=String,Description="Genotype">
+##FORMAT=<ID=DP,Number=1,Type=Integer,Description="Depth">
+##FORMAT=<ID=GQ,Number=1,Type=Integer,Description="Quality">
+#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\tS
+"""
+
+
+def _patient_vcf(path: Path) -> Path:
+    rows = [
+        "chr12\t102840474\t.\tT\tC\t50\tPASS\t.\tGT:DP:GQ\t1/1:40:99",
+        "chr12\t102840500\t.\tG\tA\t50\tLowQual\t.\tGT:DP:GQ\t0/1:5:10",
+        "chr12\t102840600\t.\tC\tT\t50\tPASS\t.\tGT:DP:GQ\t0/1:40:99",
+    ]
+    path.write_text(HEADER.format(chrom="chr12") + "\n".join(rows) + "\n", encoding="utf-8")
+    return path
+
+
+def _clinvar_vcf(path: Path) -> Path:
+    rows = [
+        "12\t102840474\t1\tT\tC\t.\t.\tCLNSIG=Pathogenic;GENEINFO=PAH:5053",
+        "12\t102840474\t2\tT\tG\t.\t.\tCLNSIG=Benign;GENEINFO=PAH:5053",
+        "12\t102840600\t3\tC\tT\t.\t.\tCLNSIG=Uncertain_significance;GENEINFO=PAH:5053",
+    ]
+    header = HEADER.format(chrom="12").replace("\tFORMAT\tS", "")
+    path.write_text(header + "\n".join(rows) + "\n", encoding="utf-8")
+    return path
+
+
+def test_clinvar_index_matches_stream_matcher(tmp_path: Path):
+    vcf = _patient_vcf(tmp_path / "p.vcf")
+    clinvar = _clinvar_vcf(tmp_path / "clinvar.vcf")
+    index = ClinVarIndex(str(clinvar))
+    stream = ClinVarStreamMatcher(str(clinvar))
+    variants = list(iter_variants(str(vcf)))
+    assert [index.match(v) for v in variants] == [stream.match(v) for v in variants]
+    assert index.match(variants[0]).clnsig == "Pathogenic"
+    assert index.match(variants[1]) is None
+
+
+def test_gene_panel(tmp_path: Path):
+    panel_file = tmp_path / "cardio.txt"
+    panel_file.write_text("# cardiac\nMYH7\nldlr  # lower case\n\n", encoding="utf-8")
+    panel = GenePanel.from_file(panel_file)
+    assert panel.name == "cardio"
+    assert panel.contains("LDLR") and panel.contains("ABC|MYH7")
+    assert not panel.contains("PAH") and not panel.contains("")
+
+
+def test_sample_sheet(tmp_path: Path):
+    sheet = tmp_path / "sheet.tsv"
+    sheet.write_text("sample_id\tvcf\tbam\nS1\tvcfs/s1.vcf\t\nS2\t/abs/s2.vcf\ts2.bam\n", encoding="utf-8")
+    samples = read_sample_sheet(sheet)
+    assert [s.sample_id for s in samples] == ["S1", "S2"]
+    assert samples[0].vcf == tmp_path / "vcfs" / "s1.vcf" and samples[0].bam is None
+    assert samples[1].vcf == Path("/abs/s2.vcf") and samples[1].bam == tmp_path / "s2.bam"
+
+    sheet.write_text("sample_id,vcf\nS1,a.vcf\nS1,b.vcf\n", encoding="utf-8")
+    with pytest.raises(InputValidationError):
+        read_sample_sheet(sheet.rename(tmp_path / "sheet.csv"))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch(tmp_path: Path, workers: int):
+    good = _patient_vcf(tmp_path / "good.vcf")
+    broken = tmp_path / "broken.vcf"
+    broken.write_text("not a vcf\n", encoding="utf-8")
+    sheet = tmp_path / "sheet.tsv"
+    sheet.write_text(f"sample_id\tvcf\nA\t{good.name}\nB\t{broken.name}\nC\t{good.name}\n", encoding="utf-8")
+    panel = tmp_path / "panel.txt"
+    panel.write_text("PAH\n", encoding="utf-8")
+    options = RunOptions(clinvar_vcf=_clinvar_vcf(tmp_path / "clinvar.vcf"), gene_panel=panel, pdf_mode="none")
+
+    out = tmp_path / "batch"
+    summary = run_batch(read_sample_sheet(sheet), out, options, workers=workers)
+
+    assert (summary["samples"], summary["succeeded"], summary["failed"]) == (3, 2, 1)
+    assert json.loads((out / "batch_summary.json").read_text(encoding="utf-8")) == summary
+    by_id = {r["sample_id"]: r for r in summary["results"]}
+    assert by_id["B"]["status"] == "failed" and by_id["B"]["error"]
+    assert set(by_id["A"]["timings"]) == {"variants", "render"}
+    report = json.loads((out / "C" / "report.json").read_text(encoding="utf-8"))
+    assert report["sample"] == "C"
+    assert report["gene_panel"] == "panel"
+    assert [(v["gene"], v["in_panel"]) for v in report["important_variants"]] == [("PAH", True)]
+    assert [v["pos"] for v in report["low_confidence"]] == [102840500]
+
+
+def test_run_cli_writes_report(tmp_path: Path):
+    vcf = _patient_vcf(tmp_path / "p.vcf")
+    out = tmp_path / "out"
+    result = CliRunner().invoke(app, ["run", "--vcf", str(vcf), "--out-dir", str(out), "--pdf-mode", "none"])
+    assert result.exit_code == 0, result.output
+    report = json.loads((out / "report.json").read_text(encoding="utf-8"))
+    assert report["sample"] == "SAMPLE" and "gene_panel" not in report
+    assert f"Wrote: {out / 'report.json'}" in result.output
+
+
+@pytest.mark.parametrize(
+    ("command", "option"),
+    [
+        ("run", "--pdf-timeout-s"),
+        ("run", "--pdf-max-memory-mb"),
+        ("batch", "--pdf-timeout-s"),
+        ("batch", "--pdf-max-memory-mb"),
+        ("igv", "--igv-timeout-s"),
+    ],
+)
+def test_worker_limits_reject_zero(tmp_path: Path, command: str, option: str):
+    vcf = _patient_vcf(tmp_path / "p.vcf")
+    sheet = tmp_path / "samples.tsv"
+    sheet.write_text(f"sample_id\tvcf\nA\t{vcf}\n", encoding="utf-8")
+    args = {
+        "run": ["--vcf", str(vcf)],
+        "batch": ["--sample-sheet", str(sheet)],
+        "igv": ["--vcf", str(vcf), "--bam", str(vcf), "--genome", "hg38"],
+    }[command]
+    result = CliRunner().invoke(app, [command, *args, "--out-dir", str(tmp_path / "out"), option, "0"])
+    assert result.exit_code == 2
+    assert option in result.output and not (tmp_path / "out").exists()
+
+
+def test_shared_resources_key_on_resolved_paths(tmp_path: Path, monkeypatch):
+    clinvar = _clinvar_vcf(tmp_path / "clinvar.vcf")
+    panel = tmp_path / "panel.txt"
+    panel.write_text("PAH\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    preloaded = shared_resources(RunOptions(clinvar_vcf=Path("clinvar.vcf")))
+    job = shared_resources(RunOptions(clinvar_vcf=clinvar.absolute(), gene_panel=panel.absolute()))
+    assert job.clinvar_index is preloaded.clinvar_index
+    assert job.gene_panel is not None and job.gene_panel.contains("PAH")
+    assert warm_resources()["clinvar_indexes"] == 1
@@ -1,6 +1,9 @@
 from pathlib import Path
 
-from clinreport.report.render import render_html
+import pytest
+
+from clinreport.exceptions import ExternalToolError
+from clinreport.report.render import render_html, start_pdf_job, summary_context
 
 
 def test_render_html(tmp_path: Path):
@@ -19,3 +22,37 @@ def test_render_html(tmp_path: Path):
     render_html(template_dir, context, out_html)
     assert out_html.exists()
     assert "Clinical Variant Report" in out_html.read_text(encoding="utf-8")
+
+
+def test_summary_context_truncates_tables(tmp_path: Path):
+    template_dir = Path(__file__).parent.parent / "src" / "clinreport" / "report" / "templates"
+    rows = [{"chrom": "chr1", "pos": i, "ref": "A", "alt": "G", "reasons": []} for i in range(30)]
+    context = {
+        "sample": "SAMPLE",
+        "assembly": "GRCh38",
+        "generated_at": "2026-01-01T00:00:00Z",
+        "provenance_json": "{}",
+        "qc": None,
+        "important_variants": [],
+        "fastq_detected_variants": rows,
+        "low_confidence": rows[:3],
+        "css": "",
+    }
+    summary = summary_context(context, top_n=5)
+    assert len(summary["fastq_detected_variants"]) == 5
+    assert summary["truncated_tables"] == {"fastq_detected_variants": 30}
+    assert len(context["fastq_detected_variants"]) == 30
+
+    out_html = tmp_path / "summary.html"
+    render_html(template_dir, summary, out_html)
+    html = out_html.read_text(encoding="utf-8")
+    assert "Showing the first 5 of 30 rows" in html
+    assert "tables/low_confidence.tsv" not in html
+
+
+def test_pdf_job_surfaces_worker_failure(tmp_path: Path):
+    out_pdf = tmp_path / "r.pdf"
+    job = start_pdf_job(tmp_path / "missing.html", out_pdf, timeout_s=60)
+    with pytest.raises(ExternalToolError):
+        job.wait()
+    assert not out_pdf.exists()
@@ -0,0 +1,119 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from clinreport.cli import app
+from clinreport.config import settings
+from clinreport.exceptions import InputValidationError
+from clinreport.server import JobServer, QueueFullError, ServerClient, make_server, server_url
+
+SIGNOFF = {"case_id": "case1", "variant_id": "chr1-10-A-G", "reviewer": "rev", "decision": "approve"}
+
+
+TOKEN = "s3cret"
+
+
+@pytest.fixture(params=["tcp", "unix"])
+def daemon(request, tmp_path: Path, monkeypatch):
+    jobs = JobServer(workers=2, queue_size=8)
+    socket_path = tmp_path / "clinreport.sock" if request.param == "unix" else None
+    token = TOKEN if socket_path is None else None
+    monkeypatch.setattr(settings, "server_token", token)
+    httpd = make_server(jobs, port=0, socket_path=socket_path, token=token)
+    port = httpd.server_address[1] if socket_path is None else 0
+    jobs.start()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield ServerClient(server_url("127.0.0.1", port, socket_path), token=token)
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        jobs.shutdown()
+
+
+def test_signoff_job(daemon: ServerClient, tmp_path: Path):
+    job = daemon.submit("signoff", {**SIGNOFF, "out_dir": str(tmp_path / "review")})
+    assert job["status"] in ("queued", "running", "done")
+    job = daemon.wait(job["id"])
+    assert job["status"] == "done", job
+    assert "Sign-off recorded." in job["output"]
+    lines = (tmp_path / "review" / "signoff_decisions.json").read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[0])["decision"] == "approve"
+    assert daemon.status()["jobs"]["done"] == 1
+
+
+def test_failed_and_rejected_jobs(daemon: ServerClient, tmp_path: Path):
+    job = daemon.wait(daemon.submit("signoff", {**SIGNOFF, "decision": "maybe", "out_dir": str(tmp_path)})["id"])
+    assert job["status"] == "failed" and job["error_type"] == "ValidationError"
+    with pytest.raises(InputValidationError, match="Unknown job kind"):
+        daemon.submit("final-export", {})
+    with pytest.raises(InputValidationError, match="reviewer"):
+        daemon.submit("signoff", {"case_id": "c", "variant_id": "v", "decision": "approve"})
+    with pytest.raises(InputValidationError, match="Unknown parameter"):
+        daemon.submit("signoff", {**SIGNOFF, "colour": "red"})
+
+
+def test_tcp_requires_token():
+    with pytest.raises(InputValidationError, match="token"):
+        make_server(JobServer(), port=0)
+    jobs = JobServer(workers=1, queue_size=4)
+    httpd = make_server(jobs, port=0, token=TOKEN)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = server_url("127.0.0.1", httpd.server_address[1], None)
+    try:
+        with pytest.raises(InputValidationError, match="rejected"):
+            ServerClient(url).status()
+        with pytest.raises(InputValidationError, match="rejected"):
+            ServerClient(url, token="wrong").submit("signoff", SIGNOFF)
+        assert ServerClient(url, token=TOKEN).status()["jobs"]["queued"] == 0
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_queue_is_bounded():
+    jobs = JobServer(workers=1, queue_size=1)
+    jobs.submit("signoff", SIGNOFF)
+    with pytest.raises(QueueFullError):
+        jobs.submit("signoff", SIGNOFF)
+
+
+def test_cli_forwards_to_daemon(daemon: ServerClient, tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(settings, "server_url", daemon.url)
+    monkeypatch.chdir(tmp_path)
+    args = ["signoff", "--out-dir", "review"] + [f"--{k.replace('_', '-')}={v}" for k, v in SIGNOFF.items()]
+    result = CliRunner().invoke(app, args)
+    assert result.exit_code == 0, result.output
+    assert "Sign-off recorded." in result.output
+    assert (tmp_path / "review" / "signoff_decisions.json").exists()
+    assert daemon.status()["jobs"]["done"] == 1
+
+
+def test_cli_runs_locally_without_daemon(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(settings, "server_url", f"unix:{tmp_path / 'missing.sock'}")
+    args = ["signoff", "--out-dir", str(tmp_path)] + [f"--{k.replace('_', '-')}={v}" for k, v in SIGNOFF.items()]
+    result = CliRunner().invoke(app, args)
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "signoff_decisions.json").exists()
+
+
+def test_run_jobs_share_warm_resources(daemon: ServerClient, tmp_path: Path):
+    header = "##fileformat=VCFv4.2\n##contig=<ID={c}>\n#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n"
+    vcf = tmp_path / "p.vcf"
+    vcf.write_text(header.format(c="chr12") + "chr12\t102840474\t.\tT\tC\t50\tPASS\t.\n", encoding="utf-8")
+    clinvar = tmp_path / "clinvar.vcf"
+    clinvar.write_text(
+        header.format(c="12") + "12\t102840474\t1\tT\tC\t.\t.\tCLNSIG=Pathogenic;GENEINFO=PAH:5053\n",
+        encoding="utf-8",
+    )
+    for name in ("a", "b"):
+        params = {"vcf": str(vcf), "clinvar_vcf": str(clinvar), "out_dir": str(tmp_path / name), "pdf_mode": "none"}
+        job = daemon.wait(daemon.submit("run", params)["id"])
+        assert job["status"] == "done", job
+        report = json.loads((tmp_path / name / "report.json").read_text(encoding="utf-8"))
+        assert [v["gene"] for v in report["important_variants"]] == ["PAH"]
+    assert daemon.status()["warm"]["clinvar_indexes"] == 1
@@ -0,0 +1,139 @@
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from clinreport import cli
+from clinreport.exceptions import InputValidationError
+from clinreport.igv.naming import index_snapshots
+from clinreport.llm import async_triage
+from clinreport.llm.schema import IgvTriageResult
+
+runner = CliRunner()
+
+
+def test_index_snapshots_lists_only_pngs(tmp_path: Path):
+    (tmp_path / "SAMPLE_chr1_100_A_G.png").write_bytes(b"png")
+    (tmp_path / ".snapshot_cache.json").write_text("{}")
+    assert list(index_snapshots(tmp_path)) == ["SAMPLE_chr1_100_A_G.png"]
+    assert index_snapshots(tmp_path / "missing") == {}
+
+
+def test_triage_uses_exact_snapshot_names(tmp_path: Path, monkeypatch):
+    snaps = tmp_path / "snapshots"
+    snaps.mkdir()
+    (snaps / "SAMPLE_chr1_100_A_G.png").write_bytes(b"png")
+    # Would have matched the old `*chr1*10*` fuzzy glob for the second entry.
+    (snaps / "SAMPLE_chr1_1000_A_G.png").write_bytes(b"png")
+    manifest = [
+        {"chrom": "chr1", "pos": 100, "ref": "A", "alt": "G", "locus": "chr1:100", "snapshot": "SAMPLE_chr1_100_A_G.png"},
+        {"chrom": "chr1", "pos": 10, "ref": "A", "alt": "G", "locus": "chr1:10"},
+    ]
+    (tmp_path / "low_confidence.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+    seen = []
+
+    async def fake_triage(client, path: Path, metadata: dict, *args, **kwargs) -> IgvTriageResult:
+        seen.append(path.name)
+        return IgvTriageResult(
+            locus=metadata["locus"],
+            snapshot_file=path.name,
+            triage="needs_human_review",
+            rationale="stub",
+            disclaimer="Human review required.",
+        )
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(async_triage, "triage_snapshot_async", fake_triage)
+    out = tmp_path / "triage.json"
+    result = runner.invoke(cli.app, ["triage", "--review-dir", str(tmp_path), "--out-json", str(out)])
+    assert result.exit_code == 0, result.output
+
+    results = json.loads(out.read_text(encoding="utf-8"))
+    assert seen == ["SAMPLE_chr1_100_A_G.png"]
+    assert results[1]["triage_error"] == "snapshot_not_found"
+
+
+def test_triage_checkpoint_follows_snapshot_content(tmp_path: Path, monkeypatch):
+    snaps = tmp_path / "snapshots"
+    snaps.mkdir()
+    manifest = []
+    for pos in (100, 200):
+        name = f"SAMPLE_chr1_{pos}_A_G.png"
+        (snaps / name).write_bytes(b"png")
+        manifest.append({"chrom": "chr1", "pos": pos, "ref": "A", "alt": "G", "locus": f"chr1:{pos}", "snapshot": name})
+    (tmp_path / "low_confidence.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+    seen = []
+    failing = {"chr1:200"}
+
+    async def fake_triage(client, path: Path, metadata: dict, *args, **kwargs) -> IgvTriageResult:
+        seen.append(path.name)
+        if metadata["locus"] in failing:
+            raise RuntimeError("provider down")
+        return IgvTriageResult(
+            locus=metadata["locus"],
+            snapshot_file=path.name,
+            triage="needs_human_review",
+            rationale=path.read_text(),
+            disclaimer="Human review required.",
+        )
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(async_triage, "triage_snapshot_async", fake_triage)
+    out = tmp_path / "triage.json"
+    args = ["triage", "--review-dir", str(tmp_path), "--out-json", str(out), "--no-prep-images"]
+    checkpoint = out.with_suffix(".partial.jsonl")
+
+    assert runner.invoke(cli.app, args).exit_code == 0
+    assert checkpoint.exists()
+
+    (snaps / "SAMPLE_chr1_100_A_G.png").write_bytes(b"re-rendered")
+    failing.clear()
+    seen.clear()
+    result = runner.invoke(cli.app, args)
+    assert result.exit_code == 0, result.output
+    assert sorted(seen) == ["SAMPLE_chr1_100_A_G.png", "SAMPLE_chr1_200_A_G.png"]
+    assert json.loads(out.read_text(encoding="utf-8"))[0]["rationale"] == "re-rendered"
+    assert not checkpoint.exists()
+
+
+def test_triage_checks_image_options_and_skips_checkpointed_images(tmp_path: Path, monkeypatch):
+    snaps = tmp_path / "snapshots"
+    snaps.mkdir()
+    manifest = []
+    for pos in (100, 200):
+        name = f"SAMPLE_chr1_{pos}_A_G.png"
+        (snaps / name).write_bytes(b"png")
+        manifest.append({"chrom": "chr1", "pos": pos, "ref": "A", "alt": "G", "locus": f"chr1:{pos}", "snapshot": name})
+    (tmp_path / "low_confidence.json").write_text(json.dumps(manifest), encoding="utf-8")
+    out = tmp_path / "triage.json"
+    args = ["triage", "--review-dir", str(tmp_path), "--out-json", str(out)]
+
+    result = runner.invoke(cli.app, [*args, "--image-format", "gif"])
+    assert isinstance(result.exception, InputValidationError)
+    assert not out.exists()
+
+    prepared = []
+
+    def fake_prepare(paths, params, workers=4):
+        prepared.extend(p.name for p in paths)
+        return [None] * len(paths)
+
+    async def fake_triage(client, path: Path, metadata: dict, *args, **kwargs) -> IgvTriageResult:
+        if metadata["locus"] == "chr1:200":
+            raise RuntimeError("provider down")
+        return IgvTriageResult(
+            locus=metadata["locus"],
+            snapshot_file=path.name,
+            triage="needs_human_review",
+            rationale="stub",
+            disclaimer="Human review required.",
+        )
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(cli, "prepare_snapshots", fake_prepare)
+    monkeypatch.setattr(async_triage, "triage_snapshot_async", fake_triage)
+    assert runner.invoke(cli.app, args).exit_code == 0
+    assert runner.invoke(cli.app, args).exit_code == 0
+    assert prepared == ["SAMPLE_chr1_100_A_G.png", "SAMPLE_chr1_200_A_G.png", "SAMPLE_chr1_200_A_G.png"]